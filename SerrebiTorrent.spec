@@ -46,9 +46,15 @@ local_modules = [
     'clients',
     'config_manager',
     'libtorrent_env',
+    'maindata_sync',
+    'metrics',
+    'profiler',
     'rss_manager',
     'session_manager',
+    'state_store',
+    'torrent_columns',
     'torrent_creator',
+    'torrent_snapshot',
     'updater',
     'web_server',
 ]
@@ -2,11 +2,14 @@
 
 import abc
 import binascii
+import inspect
 import os
+import time
 from urllib.parse import quote, urlparse, urlunparse
 
 import requests
 
+import metrics
 
 def safe_encode_url(url):
     """Encode special characters (like brackets) in URL path for requests compatibility."""
@@ -17,6 +20,13 @@ def safe_encode_url(url):
 
 from libtorrent_env import prepare_libtorrent_dlls
 
+# Hashes (or rTorrent calls) sent per request by the batch actions.
+BULK_CHUNK = 1000
+
+def _chunks(seq, n=BULK_CHUNK):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
 def _safe_tracker_domain(tracker_url):
     if not tracker_url:
         return ""
@@ -25,7 +35,23 @@ def _safe_tracker_domain(tracker_url):
     except Exception:
         return ""
 
+# Public client methods that aren't backend calls, left out of the RPC metrics.
+UNTIMED_METHODS = {"set_cold_refresh_interval", "get_transport_stats"}
+
 class BaseClient(abc.ABC):
+    # Slow-changing row fields (name, size, save path, tracker, swarm totals) are
+    # refetched this often; the rest is fetched on every get_torrents_full.
+    cold_refresh_interval = 30.0
+    _cold_at = 0.0
+
+    def __init_subclass__(cls, **kw):
+        super().__init_subclass__(**kw)
+        # Every public method a backend defines is timed per backend/method (metrics.py).
+        backend = cls.__name__.replace("Client", "").lower()
+        for name, fn in list(vars(cls).items()):
+            if not name.startswith("_") and name not in UNTIMED_METHODS and inspect.isfunction(fn):
+                setattr(cls, name, metrics.timed(fn, backend, name))
+
     @abc.abstractmethod
     def test_connection(self):
         pass
@@ -33,6 +59,16 @@ class BaseClient(abc.ABC):
     @abc.abstractmethod
     def get_torrents_full(self):
         pass
+
+    def set_cold_refresh_interval(self, seconds):
+        self.cold_refresh_interval = max(0.0, float(seconds))
+
+    def _cold_due(self, force=False):
+        now = time.monotonic()
+        if force or now - self._cold_at >= self.cold_refresh_interval:
+            self._cold_at = now
+            return True
+        return False
     
     @abc.abstractmethod
     def start_torrent(self, h):
@@ -150,6 +186,32 @@ class BaseClient(abc.ABC):
     def reannounce_torrent(self, h):
         raise NotImplementedError
 
+    # Batch actions take any iterable of hashes and return [(hash, error), ...]
+    # for torrents that failed; errors affecting the whole request are raised.
+    # Backends override them with native multi-hash calls.
+    def start_torrents(self, hs):
+        return self._each(self.start_torrent, hs)
+
+    def stop_torrents(self, hs):
+        return self._each(self.stop_torrent, hs)
+
+    def recheck_torrents(self, hs):
+        return self._each(self.recheck_torrent, hs)
+
+    def reannounce_torrents(self, hs):
+        return self._each(self.reannounce_torrent, hs)
+
+    def _each(self, action, hs):
+        failed = []
+        for h in self._normalize_hashes(hs):
+            try:
+                action(h)
+            except NotImplementedError:
+                raise
+            except Exception as e:
+                failed.append((h, e))
+        return failed
+
     @abc.abstractmethod
     def get_torrent_save_path(self, h):
         return None
@@ -176,9 +238,13 @@ from defusedxml.xmlrpc import monkey_patch as _defusedxml_xmlrpc_monkey_patch
 _defusedxml_xmlrpc_monkey_patch()
 
 import xmlrpc.client  # nosec B411
-import io
+import itertools
+import json
 import socket
 import ssl
+import threading
+
+import requests.adapters
 
 class CookieTransport(xmlrpc.client.SafeTransport):
     def __init__(self, c=None, ck=None):
@@ -190,55 +256,366 @@ class CookieTransport(xmlrpc.client.SafeTransport):
             cn.putheader("Cookie", "; ".join([f"{k}={v}" for k, v in self.cookies.items()]))
         super().send_user_agent(cn)
 
-class SCGITransport(xmlrpc.client.Transport):
-    def __init__(self, h, p):
+class TransportStats:
+    """Connection counters for an rTorrent transport."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connects = 0
+        self.connect_time = 0.0
+        self.errors = 0
+
+    def record_connect(self, seconds):
+        with self.lock:
+            self.connects += 1
+            self.connect_time += seconds
+
+    def record_request(self, ok=True):
+        with self.lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "connects": self.connects,
+                "reused": max(0, self.requests - self.connects),
+                "errors": self.errors,
+                "connect_time_total": self.connect_time,
+                "connect_time_avg": self.connect_time / self.connects if self.connects else 0.0,
+            }
+
+def _parse_xmlrpc(transport, data):
+    p, u = transport.getparser()
+    p.feed(data)
+    p.close()
+    return u.close()
+
+def _timed_pool_classes(stats):
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def timed(base):
+        class TimedConnection(base):
+            def connect(self):
+                t0 = time.perf_counter()
+                super().connect()
+                stats.record_connect(time.perf_counter() - t0)
+        return TimedConnection
+
+    class TimedPool(HTTPConnectionPool):
+        ConnectionCls = timed(HTTPConnection)
+
+    class TimedHTTPSPool(HTTPSConnectionPool):
+        ConnectionCls = timed(HTTPSConnection)
+
+    return {"http": TimedPool, "https": TimedHTTPSPool}
+
+class _TimedHTTPAdapter(requests.adapters.HTTPAdapter):
+    def __init__(self, stats, **kw):
+        self.stats = stats
+        super().__init__(**kw)
+
+    def init_poolmanager(self, *a, **kw):
+        super().init_poolmanager(*a, **kw)
+        self.poolmanager.pool_classes_by_scheme = _timed_pool_classes(self.stats)
+
+class PooledHTTPTransport(xmlrpc.client.Transport):
+    """XML-RPC over a shared keep-alive requests.Session (thread-safe, bounded pool)."""
+
+    def __init__(self, url, verify=True, pool_size=8):
         super().__init__()
-        self.sh, self.sp = h, p
+        self.url = url
+        p = urlparse(url)
+        self.safe_url = p._replace(netloc=p.hostname + (f":{p.port}" if p.port else "")).geturl() if p.hostname else url
+        self.verify = verify
+        self.stats = TransportStats()
+        self.session = requests.Session()
+        adapter = _TimedHTTPAdapter(self.stats, pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, body, content_type="text/xml"):
+        try:
+            r = self.session.post(self.url, data=body, timeout=30, verify=self.verify,
+                                  headers={"Content-Type": content_type, "User-Agent": self.user_agent})
+        except requests.RequestException as e:
+            self.stats.record_request(False)
+            raise xmlrpc.client.ProtocolError(self.safe_url, 500, str(e), {})
+        self.stats.record_request(r.status_code == 200)
+        if r.status_code != 200:
+            raise xmlrpc.client.ProtocolError(self.safe_url, r.status_code, r.reason, dict(r.headers))
+        return r.content
+
+    def request(self, h, hn, rb, verbose=False):
+        return _parse_xmlrpc(self, self.post(rb))
+
+    def close(self):
+        self.session.close()
+
+class _StaleSocket(Exception):
+    pass
+
+class SCGITransport(xmlrpc.client.Transport):
+    """XML-RPC over SCGI (TCP or Unix socket).
+
+    rTorrent closes the connection after every reply, so in practice each
+    request connects anew; sockets are only pooled when the server leaves
+    them open after a Content-Length delimited reply.
+    """
 
-    def request(self, h, hn, rb, v=False):
+    def __init__(self, h, p, path=None, pool_size=4):
+        super().__init__()
+        self.sh, self.sp, self.path = h, p, path
+        self.pool, self.pool_size = [], pool_size
+        self.pool_lock = threading.Lock()
+        self.stats = TransportStats()
+
+    def _connect(self):
+        t0 = time.perf_counter()
+        if self.path:
+            s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            s.settimeout(10)
+            try:
+                s.connect(self.path)
+            except Exception:
+                s.close()
+                raise
+        else:
+            s = socket.create_connection((self.sh, self.sp), timeout=10)
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stats.record_connect(time.perf_counter() - t0)
+        return s
+
+    def _checkout(self):
+        with self.pool_lock:
+            if self.pool:
+                return self.pool.pop(), True
+        return self._connect(), False
+
+    def _checkin(self, s):
+        try:
+            s.setblocking(False)
+            try:
+                # EOF (or stray bytes) means the server is done with this socket.
+                s.recv(1, socket.MSG_PEEK)
+                s.close()
+                return
+            except BlockingIOError:
+                pass
+            s.settimeout(10)
+        except OSError:
+            s.close()
+            return
+        with self.pool_lock:
+            if len(self.pool) < self.pool_size:
+                self.pool.append(s)
+                return
+        s.close()
+
+    def _exchange(self, s, payload):
+        s.sendall(payload)
+        buf = bytearray()
+        head_end = -1
+        length = None
+        while True:
+            ch = s.recv(65536)
+            if not ch:
+                break
+            buf += ch
+            if head_end < 0:
+                head_end = buf.find(b"\r\n\r\n")
+                if head_end >= 0:
+                    for line in bytes(buf[:head_end]).split(b"\r\n"):
+                        k, _, v = line.partition(b":")
+                        if k.strip().lower() == b"content-length":
+                            try:
+                                length = int(v.strip())
+                            except ValueError:
+                                pass
+                    head_end += 4
+            if length is not None and len(buf) - head_end >= length:
+                return bytes(buf[head_end:head_end + length]), True
+        if not buf:
+            raise _StaleSocket()
+        rs = bytes(buf)
+        if head_end >= 0:
+            return rs[head_end:], False
+        if b"\n\n" in rs:
+            return rs.split(b"\n\n", 1)[1], False
+        return rs, False
+
+    def post(self, body, content_type="text/xml"):
         hd = {
-            "CONTENT_LENGTH": str(len(rb)),
+            "CONTENT_LENGTH": str(len(body)),
             "SCGI": "1",
             "REQUEST_METHOD": "POST",
-            "REQUEST_URI": hn if hn else "/"
+            "REQUEST_URI": "/",
+            "CONTENT_TYPE": content_type,
         }
         c = b"".join([k.encode('ascii')+b'\0'+v.encode('ascii')+b'\0' for k,v in hd.items()])
-        p = str(len(c)).encode('ascii')+b':'+c+b','+rb
-        
+        payload = str(len(c)).encode('ascii')+b':'+c+b','+body
+        for _ in range(2):
+            try:
+                s, reused = self._checkout()
+            except Exception as e:
+                self.stats.record_request(False)
+                raise xmlrpc.client.ProtocolError(self._where(), 500, str(e), {})
+            try:
+                data, keep = self._exchange(s, payload)
+            except (_StaleSocket, ConnectionError) as e:
+                s.close()
+                if reused:
+                    continue  # pooled socket was closed by the server before our request
+                self.stats.record_request(False)
+                raise xmlrpc.client.ProtocolError(self._where(), 500, str(e) or "empty response", {})
+            except Exception as e:
+                s.close()
+                self.stats.record_request(False)
+                raise xmlrpc.client.ProtocolError(self._where(), 500, str(e), {})
+            self.stats.record_request()
+            if keep:
+                self._checkin(s)
+            else:
+                s.close()
+            return data
+        raise xmlrpc.client.ProtocolError(self._where(), 500, "connection closed", {})
+
+    def _where(self):
+        return self.path or f"{self.sh}:{self.sp}"
+
+    def request(self, h, hn, rb, verbose=False):
+        return _parse_xmlrpc(self, self.post(rb))
+
+    def close(self):
+        with self.pool_lock:
+            pool, self.pool = self.pool, []
+        for s in pool:
+            s.close()
+
+class _RPCMethod:
+    def __init__(self, send, name):
+        self._send, self._name = send, name
+
+    def __getattr__(self, name):
+        return _RPCMethod(self._send, f"{self._name}.{name}")
+
+    def __call__(self, *args):
+        return self._send(self._name, args)
+
+class JSONRPCProxy:
+    """ServerProxy look-alike speaking JSON-RPC 2.0 over an rTorrent transport.
+
+    system.multicall is sent as one JSON-RPC batch and returned in the
+    XML-RPC multicall shape ([value] or {faultCode, faultString}). Calls with
+    xmlrpc Binary arguments (load.raw*) go through the XML-RPC ``fallback``.
+    """
+
+    def __init__(self, transport, fallback):
+        self.transport = transport
+        self.fallback = fallback
+        self.ids = itertools.count(1)
+
+    def __getattr__(self, name):
+        return _RPCMethod(self._call, name)
+
+    def _post(self, payload):
+        data = self.transport.post(json.dumps(payload).encode("utf-8"), "application/json")
         try:
-            with socket.create_connection((self.sh, self.sp), timeout=10) as s:
-                s.sendall(p)
-                rd = b""
-                while True:
-                    ch = s.recv(4096)
-                    if not ch:
-                        break
-                    rd += ch
-        except Exception as e:
-            raise xmlrpc.client.ProtocolError(h+hn, 500, str(e), {})
+            return json.loads(data)
+        except ValueError as e:
+            raise xmlrpc.client.ProtocolError("json-rpc", 500, f"invalid JSON-RPC response: {e}", {})
+
+    def _call(self, method, params):
+        if any(isinstance(a, xmlrpc.client.Binary) for a in params):
+            return getattr(self.fallback, method)(*params)
+        if method == "system.multicall":
+            return self._batch(params[0])
+        r = self._post({"jsonrpc": "2.0", "method": method, "params": list(params), "id": next(self.ids)})
+        if not isinstance(r, dict):
+            raise xmlrpc.client.ProtocolError("json-rpc", 500, "invalid JSON-RPC response", {})
+        if r.get("error"):
+            e = r["error"]
+            raise xmlrpc.client.Fault(e.get("code", -1), e.get("message", ""))
+        return r.get("result")
+
+    def _batch(self, calls):
+        if not calls:
+            return []
+        first = next(self.ids)
+        self.ids = itertools.count(first + len(calls))
+        rs = self._post([{"jsonrpc": "2.0", "method": c["methodName"], "params": list(c["params"]), "id": first + i}
+                         for i, c in enumerate(calls)])
+        if not isinstance(rs, list):
+            raise xmlrpc.client.ProtocolError("json-rpc", 500, "invalid JSON-RPC batch response", {})
+        by_id = {r.get("id"): r for r in rs if isinstance(r, dict)}
+        out = []
+        for i in range(len(calls)):
+            r = by_id.get(first + i)
+            if r is None:
+                out.append({"faultCode": -32603, "faultString": "missing response"})
+            elif r.get("error"):
+                out.append({"faultCode": r["error"].get("code", -1), "faultString": r["error"].get("message", "")})
+            else:
+                out.append([r.get("result")])
+        return out
 
-        rs = rd.decode('utf-8', errors='replace')
-        if "\r\n\r\n" in rs:
-            b = rs.split("\r\n\r\n", 1)[1]
-        elif "\n\n" in rs:
-            b = rs.split("\n\n", 1)[1]
-        else:
-            b = rs
-        return self.parse_response(io.BytesIO(b.encode('utf-8')))
+class _AutoRPCProxy:
+    """Probe for JSON-RPC on first use and settle on it, or on XML-RPC.
 
-    def parse_response(self, response_file):
-        p, u = self.getparser()
-        while True:
-            data = response_file.read(1024)
-            if not data:
-                break
-            p.feed(data)
-        response_file.close()
-        p.close()
-        return u.close()
+    The choice is only remembered once a call succeeds, so a server that is
+    down during the first probe gets probed again later.
+    """
+
+    def __init__(self, json_proxy, xml_proxy):
+        self.json, self.xml = json_proxy, xml_proxy
+        self.proxy = None
+        self.protocol = None
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return _RPCMethod(self._call, name)
+
+    def _probe(self):
+        try:
+            self.json._call("system.client_version", ())
+        except (xmlrpc.client.ProtocolError, xmlrpc.client.Fault):
+            return False
+        self.proxy, self.protocol = self.json, "json"
+        return True
+
+    def _call(self, method, params):
+        proxy = self.proxy
+        if proxy is None:
+            with self.lock:
+                if self.proxy is None and self._probe():
+                    proxy = self.proxy
+        if proxy is not None:
+            return getattr(proxy, method)(*params)
+        result = getattr(self.xml, method)(*params)
+        self.proxy, self.protocol = self.xml, "xml"
+        return result
+
+# d.multicall2 field lists for the hot (every refresh) and cold tiers.
+RT_HOT_FIELDS = ("d.hash=", "d.bytes_done=", "d.up.total=", "d.ratio=", "d.state=", "d.is_active=", "d.is_hash_checking=",
+                 "d.message=", "d.down.rate=", "d.up.rate=", "d.left_bytes=", "d.connection_seed=", "d.connection_leech=")
+RT_COLD_FIELDS = ("d.hash=", "d.name=", "d.size_bytes=", "d.directory=", "d.peers_complete=", "d.peers_accounted=")
+# Nested per-torrent tracker list, appended to the cold tier: [[url, enabled], ...] per torrent.
+RT_TRACKER_FIELD = "t.multicall=,t.url=,t.is_enabled="
+
+def _rt_tracker_domain(trackers):
+    """Domain of the first enabled tracker from a t.multicall result (DHT pseudo-trackers skipped)."""
+    for t in trackers or ():
+        if isinstance(t, (list, tuple)) and t and (len(t) < 2 or t[1]) and not str(t[0]).startswith("dht:"):
+            return _safe_tracker_domain(str(t[0]))
+    return ""
 
 class RTorrentClient(BaseClient):
-    def __init__(self, u, us=None, pw=None):
+    def __init__(self, u, us=None, pw=None, rpc="auto"):
+        # rpc: "auto" prefers JSON-RPC (rTorrent 0.9.8+/0.15, rtorrent-ps, jesec) and falls back to XML-RPC.
         if not u.startswith(('http://', 'https://', 'scgi://')):
             u = 'http://' + u
         p = urlparse(u)
@@ -253,6 +630,9 @@ class RTorrentClient(BaseClient):
             p = urlparse(u)
 
         self.u, self.us, self.pw, self.ck, self.tc = u, us, pw, {}, {}
+        self.cold, self._rows = {}, {}
+        # Whether the server accepts t.multicall nested in d.multicall2.
+        self.nested_trackers = True
         self.ctx = None
         if p.scheme == "https":
             self.ctx = ssl.create_default_context()
@@ -261,19 +641,31 @@ class RTorrentClient(BaseClient):
                 self.ctx.verify_mode = ssl.CERT_NONE
 
         if p.scheme == "scgi":
-            self.srv = xmlrpc.client.ServerProxy("http://d", transport=SCGITransport(p.hostname, p.port))
+            # scgi://host:port, or scgi:///path/to/rpc.socket for a Unix socket
+            if not p.hostname and p.path:
+                self.transport = SCGITransport(None, None, path=p.path)
+            else:
+                self.transport = SCGITransport(p.hostname, p.port)
         else:
-            self.srv = xmlrpc.client.ServerProxy(u, context=self.ctx)
+            insecure = self.ctx is not None and self.ctx.verify_mode == ssl.CERT_NONE
+            self.transport = PooledHTTPTransport(u, verify=not insecure)
+        xml = xmlrpc.client.ServerProxy("http://d" if p.scheme == "scgi" else u, transport=self.transport)
+        if rpc == "xml":
+            self.srv = xml
+        elif rpc == "json":
+            self.srv = JSONRPCProxy(self.transport, xml)
+        else:
+            self.srv = _AutoRPCProxy(JSONRPCProxy(self.transport, xml), xml)
 
-    def _rpc(self, name, *args, default=None):
-        try:
-            return getattr(self.srv, name)(*args)
-        except xmlrpc.client.Fault as e:
-            # Re-raise faults as they often contain useful error messages from rTorrent
-            print(f"rTorrent RPC Fault in {name}: {e}")
-            raise
-        except Exception:
-            return default
+    @property
+    def rpc_protocol(self):
+        """"json" or "xml"; None while auto-detection has not completed."""
+        if isinstance(self.srv, _AutoRPCProxy):
+            return self.srv.protocol
+        return "json" if isinstance(self.srv, JSONRPCProxy) else "xml"
+
+    def get_transport_stats(self):
+        return self.transport.stats.as_dict()
 
     def test_connection(self):
         return self.srv.system.client_version()
@@ -293,33 +685,111 @@ class RTorrentClient(BaseClient):
 
     def get_torrents_full(self):
         try:
-            raw = self.srv.d.multicall2("", "main", "d.hash=", "d.bytes_done=", "d.up.total=", "d.ratio=", "d.state=", "d.is_active=", "d.is_hash_checking=", "d.message=", "d.down.rate=", "d.up.rate=", "d.name=", "d.size_bytes=", "d.left_bytes=", "d.connection_seed=", "d.connection_leech=", "d.peers_complete=", "d.peers_accounted=", "d.directory=")
-            if not raw:
+            t0 = self.srv.d.multicall2("", "main", *RT_HOT_FIELDS)
+            if not t0:
                 return []
-            res = []
-            for t in raw:
-                h, dr, lb = t[0], self._si(t[8]), self._si(t[12])
-                res.append({
-                    "hash": h, "name": self._ss(t[10]), "size": self._si(t[11]), "done": self._si(t[1]), "up_total": self._si(t[2]), "ratio": self._si(t[3]), "state": self._si(t[4]), "active": self._si(t[5]), "hashing": self._si(t[6]), "message": self._ss(t[7]), "down_rate": dr, "up_rate": self._si(t[9]), "tracker_domain": self.tc.get(h, ""), "save_path": self._ss(t[17]) if len(t)>17 else None, "eta": int(lb/dr) if dr>0 and lb>0 else -1, "seeds_connected": self._si(t[13]), "seeds_total": self._si(t[15]), "leechers_connected": self._si(t[14]), "leechers_total": self._si(t[16])
-                })
+            if self._cold_due(force=any(t[0] not in self.cold for t in t0)):
+                try:
+                    self._fetch_cold()
+                except Exception as e:
+                    # Keep last pass's cold values (defaults for new torrents); the hot rows are still good.
+                    print(f"RTorrent cold refresh error: {e}")
+            res, rows = [], {}
+            for t in t0:
+                h, dr, lb = t[0], self._si(t[8]), self._si(t[10])
+                c = self.cold.get(h, {})
+                # Unchanged hot values and the same cold entry: reuse last refresh's row.
+                prev = self._rows.get(h)
+                if prev and prev[1] is c and prev[0] == t and prev[2]["tracker_domain"] == self.tc.get(h, ""):
+                    rows[h] = prev
+                    res.append(prev[2])
+                    continue
+                row = {
+                    "hash": h, "name": c.get("name", h), "size": c.get("size", 0), "done": self._si(t[1]), "up_total": self._si(t[2]), "ratio": self._si(t[3]), "state": self._si(t[4]), "active": self._si(t[5]), "hashing": self._si(t[6]), "message": self._ss(t[7]), "down_rate": dr, "up_rate": self._si(t[9]), "tracker_domain": self.tc.get(h, ""), "save_path": c.get("save_path"), "eta": int(lb/dr) if dr>0 and lb>0 else -1, "seeds_connected": self._si(t[11]), "seeds_total": c.get("seeds_total", 0), "leechers_connected": self._si(t[12]), "leechers_total": c.get("leechers_total", 0)
+                }
+                rows[h] = (t, c, row)
+                res.append(row)
+            self._rows = rows
             return res
         except Exception as e:
             print(f"RTorrent error: {e}")
             return []
 
-    def start_torrent(self, h):
-        self.srv.d.open(h)
-        self.srv.d.start(h)
-
-    def stop_torrent(self, h):
-        self.srv.d.stop(h)
-        self.srv.d.close(h)
+    def _fetch_cold(self):
+        rows = None
+        if self.nested_trackers:
+            try:
+                rows = self.srv.d.multicall2("", "main", *RT_COLD_FIELDS, RT_TRACKER_FIELD)
+            except xmlrpc.client.Fault:
+                self.nested_trackers = False
+        if rows is None:
+            rows = self.srv.d.multicall2("", "main", *RT_COLD_FIELDS)
+        self.cold = {t[0]: {"name": self._ss(t[1]), "size": self._si(t[2]), "save_path": self._ss(t[3]), "seeds_total": self._si(t[4]), "leechers_total": self._si(t[5])} for t in rows}
+        if self.nested_trackers:
+            self.tc = {t[0]: _rt_tracker_domain(t[6]) for t in rows if len(t) > 6}
+            return
+        # Fallback: one batched t.multicall per torrent we have no domain for yet.
+        # Built aside and swapped in whole; GUI/web threads read self.tc.
+        tc = {h: d for h, d in self.tc.items() if h in self.cold}
+        missing = [h for h in self.cold if h not in tc]
+        for h, r in zip(missing, self._multicall([("t.multicall", (h, "", "t.url=", "t.is_enabled=")) for h in missing])):
+            if not isinstance(r, xmlrpc.client.Fault):
+                tc[h] = _rt_tracker_domain(r)
+        self.tc = tc
+
+    def start_torrent(self, h): self._raise_first(self.start_torrents([h]))
+    def stop_torrent(self, h): self._raise_first(self.stop_torrents([h]))
+
+    def _forget(self, hs):
+        hs = set(hs)
+        self.tc = {h: d for h, d in self.tc.items() if h not in hs}
+        self.cold = {h: c for h, c in self.cold.items() if h not in hs}
 
     def remove_torrent(self, h):
         self.srv.d.erase(h)
+        self._forget([h])
 
     def remove_torrent_with_data(self, h):
         self.srv.d.erase(h)
+        self._forget([h])
+
+    def _multicall(self, calls):
+        """Run [(method, args), ...] through system.multicall.
+
+        Returns one entry per call, in order: the call's result, or an
+        xmlrpc.client.Fault for calls rTorrent rejected.
+        """
+        out = []
+        for chunk in _chunks(calls):
+            raw = self.srv.system.multicall([{"methodName": m, "params": list(a)} for m, a in chunk])
+            for r in raw:
+                if isinstance(r, dict):
+                    out.append(xmlrpc.client.Fault(r.get("faultCode", -1), r.get("faultString", "")))
+                else:
+                    out.append(r[0] if isinstance(r, list) and len(r) == 1 else r)
+        return out
+
+    def _bulk(self, methods, hs):
+        calls = [(m, (h,)) for h in self._normalize_hashes(hs) for m in methods]
+        failed = {}
+        for (m, (h,)), r in zip(calls, self._multicall(calls)):
+            if isinstance(r, xmlrpc.client.Fault) and h not in failed:
+                failed[h] = r
+        return list(failed.items())
+
+    def _raise_first(self, failed):
+        if failed:
+            raise failed[0][1]
+
+    def remove_torrents(self, hs, df=False):
+        failed = self._bulk(("d.erase",), hs)
+        failed_set = {h for h, _ in failed}
+        self._forget(h for h in self._normalize_hashes(hs) if h not in failed_set)
+        self._raise_first(failed)
+    def start_torrents(self, hs): return self._bulk(("d.open", "d.start"), hs)
+    def stop_torrents(self, hs): return self._bulk(("d.stop", "d.close"), hs)
+    def recheck_torrents(self, hs): return self._bulk(("d.check_hash",), hs)
+    def reannounce_torrents(self, hs): return self._bulk(("d.tracker_announce",), hs)
 
     def add_torrent_url(self, u, sp=None):
         self.srv.load.start("", u)
@@ -329,27 +799,35 @@ class RTorrentClient(BaseClient):
 
     def get_global_stats(self):
         try:
-            return self.srv.throttle.global_down.rate(), self.srv.throttle.global_up.rate()
+            down, up = self._multicall([("throttle.global_down.rate", ()), ("throttle.global_up.rate", ())])
+            return (0 if isinstance(down, xmlrpc.client.Fault) else down), (0 if isinstance(up, xmlrpc.client.Fault) else up)
         except Exception:
             return 0, 0
 
     def get_app_preferences(self):
-        prefs = {
-            "dl_limit": self._rpc("throttle.global_down.max_rate"),
-            "ul_limit": self._rpc("throttle.global_up.max_rate"),
-            "port_range": self._rpc("network.port_range"),
-            "dht_mode": self._rpc("dht.mode"),
-            "pex_enabled": self._rpc("protocol.pex"),
-            "use_udp_trackers": self._rpc("trackers.use_udp"),
-            "encryption": self._rpc("protocol.encryption"),
-            "proxy_address": self._rpc("network.proxy_address"),
-            "max_peers": self._rpc("throttle.max_peers.normal"),
-            "min_peers": self._rpc("throttle.min_peers.normal"),
-            "max_uploads": self._rpc("throttle.max_uploads"),
-            "directory_default": self._rpc("directory.default"),
-            "check_hash": self._rpc("pieces.hash.on_completion"),
+        getters = {
+            "dl_limit": "throttle.global_down.max_rate",
+            "ul_limit": "throttle.global_up.max_rate",
+            "port_range": "network.port_range",
+            "dht_mode": "dht.mode",
+            "pex_enabled": "protocol.pex",
+            "use_udp_trackers": "trackers.use_udp",
+            "encryption": "protocol.encryption",
+            "proxy_address": "network.proxy_address",
+            "max_peers": "throttle.max_peers.normal",
+            "min_peers": "throttle.min_peers.normal",
+            "max_uploads": "throttle.max_uploads",
+            "directory_default": "directory.default",
+            "check_hash": "pieces.hash.on_completion",
         }
-        res = {k: v for k, v in prefs.items() if v is not None}
+        try:
+            values = self._multicall([(m, ()) for m in getters.values()])
+        except xmlrpc.client.Fault:
+            raise
+        except Exception:
+            return None
+        # Methods an older/forked rTorrent doesn't know just drop out.
+        res = {k: v for k, v in zip(getters, values) if v is not None and not isinstance(v, xmlrpc.client.Fault)}
         return res if res else None
 
     def get_default_save_path(self):
@@ -374,6 +852,7 @@ class RTorrentClient(BaseClient):
             "directory_default": "directory.default.set",
             "check_hash": "pieces.hash.on_completion.set",
         }
+        calls = []
         for key, method in setters.items():
             if key not in p:
                 continue
@@ -382,7 +861,15 @@ class RTorrentClient(BaseClient):
                 continue
             if key in ("pex_enabled", "use_udp_trackers", "check_hash"):
                 val = 1 if bool(val) else 0
-            self._rpc(method, val)
+            calls.append((method, (val,)))
+        if not calls:
+            return
+        # One request; a rejected setting doesn't stop the others from applying.
+        faults = [(m, r) for (m, _), r in zip(calls, self._multicall(calls)) if isinstance(r, xmlrpc.client.Fault)]
+        for m, f in faults:
+            print(f"rTorrent RPC Fault in {m}: {f}")
+        if faults:
+            raise faults[0][1]
 
     def recheck_torrent(self, h):
         self.srv.d.check_hash(h)
@@ -401,8 +888,9 @@ class RTorrentClient(BaseClient):
             return []
 
     def set_file_priority(self, h, i, p):
-        self.srv.f.priority.set(h, i, p)
-        self.srv.d.update_priorities(h)
+        for r in self._multicall([("f.priority.set", (h, i, p)), ("d.update_priorities", (h,))]):
+            if isinstance(r, xmlrpc.client.Fault):
+                raise r
 
     def get_peers(self, h):
         try:
@@ -420,30 +908,63 @@ class RTorrentClient(BaseClient):
 
 # --- qBit ---
 import qbittorrentapi
+
+# Force a full sync/maindata (rid=0) this often to heal any drift in the mirror.
+QBIT_FULL_RESYNC_INTERVAL = 300.0
+
 class QBittorrentClient(BaseClient):
     def __init__(self, u, us, pw):
         if not u.startswith(('http://', 'https://')):
             u = 'http://' + u
         self.c = qbittorrentapi.Client(host=u, username=us, password=pw)
         self.c.auth_log_in()
+        # Local mirror of sync/maindata: raw torrent dicts plus the rows built from them.
+        self.rid, self.raw, self.rows, self.last_full = 0, {}, {}, 0.0
+        self.server_state, self.server_state_at = {}, 0.0
+        self.use_sync, self.sync_lock = hasattr(self.c, "sync_maindata"), threading.Lock()
 
     def test_connection(self): return self.c.app_version()
+    def _row(self, t):
+        sv, av, hv = 0, 0, 0
+        s = t.get("state") or ""
+        if s in ['downloading', 'uploading', 'stalledDL', 'stalledUP', 'metaDL', 'forcedDL', 'forcedUP', 'queuedDL', 'queuedUP']:
+            sv, av = 1, 1
+        elif s in ['pausedDL', 'pausedUP']:
+            sv = 0
+        elif 'checking' in s:
+            hv, sv = 1, 1
+        tracker_domain = _safe_tracker_domain(t.get("tracker") or "")
+        return {"hash": t.get("hash"), "name": t.get("name"), "size": t.get("total_size"), "done": t.get("completed"), "up_total": t.get("uploaded"), "ratio": (t.get("ratio") or 0) * 1000, "state": sv, "active": av, "hashing": hv, "message": "", "down_rate": t.get("dlspeed"), "up_rate": t.get("upspeed"), "tracker_domain": tracker_domain, "eta": int(t.get("eta", -1) or -1), "seeds_connected": int(t.get("num_seeds", 0) or 0), "seeds_total": int(t.get("num_complete", 0) or 0), "leechers_connected": int(t.get("num_leechs", 0) or 0), "leechers_total": int(t.get("num_incomplete", 0) or 0), "availability": t.get("availability"), "save_path": t.get("save_path")}
+    def _sync(self):
+        """Apply one sync/maindata delta to the mirror; rows are rebuilt only for torrents that changed."""
+        if time.monotonic() - self.last_full > QBIT_FULL_RESYNC_INTERVAL:
+            self.rid = 0
+        md = self.c.sync_maindata(rid=self.rid)
+        if md.get("full_update") or not self.rid:
+            self.raw, self.rows = {}, {}
+            self.last_full = time.monotonic()
+        for h in md.get("torrents_removed") or ():
+            self.raw.pop(h, None)
+            self.rows.pop(h, None)
+        for h, delta in (md.get("torrents") or {}).items():
+            t = self.raw.setdefault(h, {"hash": h})
+            t.update(delta)
+            self.rows[h] = self._row(t)
+        if md.get("server_state"):
+            self.server_state.update(md["server_state"])
+            self.server_state_at = time.monotonic()
+        self.rid = md.get("rid", 0)
+        return list(self.rows.values())
     def get_torrents_full(self):
         try:
-            ts = self.c.torrents_info()
-            res = []
-            for t in ts:
-                sv, av, hv = 0, 0, 0
-                s = t.state
-                if s in ['downloading', 'uploading', 'stalledDL', 'stalledUP', 'metaDL', 'forcedDL', 'forcedUP', 'queuedDL', 'queuedUP']:
-                    sv, av = 1, 1
-                elif s in ['pausedDL', 'pausedUP']:
-                    sv = 0
-                elif 'checking' in s:
-                    hv, sv = 1, 1
-                tracker_domain = _safe_tracker_domain(getattr(t, "tracker", "") or "")
-                res.append({"hash": t.hash, "name": t.name, "size": t.total_size, "done": t.completed, "up_total": t.uploaded, "ratio": t.ratio * 1000, "state": sv, "active": av, "hashing": hv, "message": "", "down_rate": t.dlspeed, "up_rate": t.upspeed, "tracker_domain": tracker_domain, "eta": int(getattr(t, "eta", -1) or -1), "seeds_connected": int(getattr(t, "num_seeds", 0) or 0), "seeds_total": int(getattr(t, "num_complete", 0) or 0), "leechers_connected": int(getattr(t, "num_leechs", 0) or 0), "leechers_total": int(getattr(t, "num_incomplete", 0) or 0), "availability": getattr(t, "availability", None), "save_path": getattr(t, "save_path", None)})
-            return res
+            with self.sync_lock:
+                if self.use_sync:
+                    try:
+                        return self._sync()
+                    except Exception as e:
+                        self.rid = 0
+                        print(f"qBittorrent sync error, falling back to full list: {e}")
+            return [self._row(t if isinstance(t, dict) else vars(t)) for t in self.c.torrents_info()]
         except Exception as e:
             print(f"qBittorrent error: {e}")
             return []
@@ -460,7 +981,18 @@ class QBittorrentClient(BaseClient):
     def add_torrent_file(self, c, sp=None, p=None): self.c.torrents_add(torrent_files=c, save_path=sp)
     def recheck_torrent(self, h): self.c.torrents_recheck(torrent_hashes=h)
     def reannounce_torrent(self, h): self.c.torrents_reannounce(torrent_hashes=h)
+    def _bulk(self, action, hs):
+        for chunk in _chunks(self._normalize_hashes(hs)):
+            action(torrent_hashes=chunk)
+        return []
+    def start_torrents(self, hs): return self._bulk(self.c.torrents_resume, hs)
+    def stop_torrents(self, hs): return self._bulk(self.c.torrents_pause, hs)
+    def recheck_torrents(self, hs): return self._bulk(self.c.torrents_recheck, hs)
+    def reannounce_torrents(self, hs): return self._bulk(self.c.torrents_reannounce, hs)
     def get_global_stats(self):
+        ss = self.server_state
+        if ss and time.monotonic() - self.server_state_at < 1.0:
+            return ss.get("dl_info_speed", 0), ss.get("up_info_speed", 0)
         i = self.c.transfer_info()
         return i.dl_info_speed, i.up_info_speed
     def get_app_preferences(self):
@@ -492,32 +1024,77 @@ class QBittorrentClient(BaseClient):
 
 # --- Trans ---
 from transmission_rpc import Client as TransClient
+
+# Only what the row schema needs, split into hot (every refresh) and cold tiers;
+# trackerStats covers both the tracker domain and swarm counts.
+TRANS_HOT_FIELDS = ["id", "hashString", "downloadedEver", "uploadedEver", "uploadRatio", "status", "errorString",
+                    "rateDownload", "rateUpload", "eta", "peersSendingToUs", "peersGettingFromUs"]
+TRANS_COLD_FIELDS = ["id", "hashString", "name", "totalSize", "trackerStats", "downloadDir"]
+TRANS_TORRENT_FIELDS = TRANS_HOT_FIELDS + TRANS_COLD_FIELDS[2:]
+TRANS_FULL_RESYNC_INTERVAL = 300.0
+
 class TransmissionClient(BaseClient):
     def __init__(self, u, us, pw):
         if not u.startswith(('http://', 'https://')):
             u = 'http://' + u
         p = urlparse(u)
         self.c = TransClient(host=p.hostname, port=p.port, username=us, password=pw, protocol=p.scheme)
+        # Mirror of raw fields and rows keyed by Transmission's torrent id.
+        self.raw, self.rows, self.last_full, self.sync_lock = {}, {}, 0.0, threading.Lock()
     def test_connection(self): return self.c.server_version
+    def _row(self, f):
+        sv, av, hv = 0, 0, 0
+        st = f.get("status", 0)
+        if st == 0:
+            sv = 0
+        elif st in (1, 2):
+            hv, sv = 1, 1
+        else:
+            sv, av = 1, 1
+        ts = f.get("trackerStats") or []
+        tracker_domain = _safe_tracker_domain(ts[0].get("announce", "") if ts else "")
+        seeds = max([x.get("seederCount", 0) for x in ts] or [0])
+        leechers = max([x.get("leecherCount", 0) for x in ts] or [0])
+        return {"hash": f.get("hashString"), "name": f.get("name"), "size": f.get("totalSize"), "done": f.get("downloadedEver"), "up_total": f.get("uploadedEver"), "ratio": max(0.0, float(f.get("uploadRatio") or 0)) * 1000, "state": sv, "active": av, "hashing": hv, "message": f.get("errorString") or "", "down_rate": f.get("rateDownload"), "up_rate": f.get("rateUpload"), "tracker_domain": tracker_domain, "eta": int(f.get("eta", -1)), "seeds_connected": f.get("peersSendingToUs", 0), "seeds_total": max(0, seeds), "leechers_connected": f.get("peersGettingFromUs", 0), "leechers_total": max(0, leechers), "availability": None, "save_path": f.get("downloadDir")}
+    def _merge(self, ts):
+        for t in ts:
+            f = t.fields
+            raw = self.raw.setdefault(f["id"], {})
+            if any(k not in raw or raw[k] != v for k, v in f.items()):
+                raw.update(f)
+                self.rows[f["id"]] = self._row(raw)
     def get_torrents_full(self):
-        try:
-            ts = self.c.get_torrents()
-            res = []
-            for t in ts:
-                sv, av, hv = 0, 0, 0
-                if t.status == 'stopped':
-                    sv = 0
-                elif t.status in ['checking', 'check pending']:
-                    hv, sv = 1, 1
-                else:
-                    sv, av = 1, 1
-                tracker_url = t.trackers[0].announce if t.trackers else ""
-                tracker_domain = _safe_tracker_domain(tracker_url)
-                res.append({"hash": t.hashString, "name": t.name, "size": t.total_size, "done": t.downloaded_ever, "up_total": t.uploaded_ever, "ratio": t.ratio * 1000, "state": sv, "active": av, "hashing": hv, "message": t.error_string, "down_rate": t.rate_download, "up_rate": t.rate_upload, "tracker_domain": tracker_domain, "eta": int(getattr(t, "eta", -1)), "seeds_connected": t.peersSendingToUs, "seeds_total": t.seeders, "leechers_connected": t.peersGettingFromUs, "leechers_total": t.leechers, "availability": None, "save_path": getattr(t, "download_dir", None)})
-            return res
-        except Exception as e:
-            print(f"Transmission error: {e}")
-            return []
+        """Full field-limited torrent-get first; then "recently-active" hot fields every call and cold fields for
+        every torrent once per cold_refresh_interval, merged into the mirror."""
+        with self.sync_lock:
+            try:
+                if not self.rows or time.monotonic() - self.last_full > TRANS_FULL_RESYNC_INTERVAL:
+                    ts = self.c.get_torrents(arguments=TRANS_TORRENT_FIELDS)
+                    self.raw, self.rows = {}, {}
+                    self._merge(ts)
+                    self.last_full = time.monotonic()
+                    self._cold_due(force=True)
+                    return list(self.rows.values())
+                if self._cold_due():
+                    ts = self.c.get_torrents(arguments=TRANS_COLD_FIELDS)
+                    for i in set(self.raw) - {t.fields["id"] for t in ts}:
+                        self.raw.pop(i, None)
+                        self.rows.pop(i, None)
+                    self._merge(ts)
+                ts, removed = self.c.get_recently_active_torrents(arguments=TRANS_HOT_FIELDS)
+                for i in removed or ():
+                    self.raw.pop(i, None)
+                    self.rows.pop(i, None)
+                self._merge(ts)
+                new = [i for i, raw in self.raw.items() if "name" not in raw]
+                if new:
+                    self._merge(self.c.get_torrents(ids=new, arguments=TRANS_COLD_FIELDS))
+                return list(self.rows.values())
+            except Exception as e:
+                # Still under the lock, so the reset can't land in the middle of another refresh's merge.
+                self.rows = {}
+                print(f"Transmission error: {e}")
+                return []
     def start_torrent(self, h): self.c.start_torrent(h)
     def stop_torrent(self, h): self.c.stop_torrent(h)
     def remove_torrent(self, h): self.c.remove_torrent(h, delete_data=False)
@@ -528,6 +1105,14 @@ class TransmissionClient(BaseClient):
         self.c.add_torrent(base64.b64encode(c).decode('utf-8'), download_dir=sp)
     def recheck_torrent(self, h): self.c.verify_torrent(h)
     def reannounce_torrent(self, h): self.c.reannounce_torrent(h)
+    def _bulk(self, action, hs):
+        for chunk in _chunks(self._normalize_hashes(hs)):
+            action(chunk)
+        return []
+    def start_torrents(self, hs): return self._bulk(self.c.start_torrent, hs)
+    def stop_torrents(self, hs): return self._bulk(self.c.stop_torrent, hs)
+    def recheck_torrents(self, hs): return self._bulk(self.c.verify_torrent, hs)
+    def reannounce_torrents(self, hs): return self._bulk(self.c.reannounce_torrent, hs)
     def get_global_stats(self):
         s = self.c.session_stats()
         return s.download_speed, s.upload_speed
@@ -635,49 +1220,60 @@ class LocalClient(BaseClient):
             raise RuntimeError("libtorrent not found.")
         self.m = SessionManager.get_instance()
         self.dp = dp if dp and os.path.isdir(dp) else os.getcwd()
+        self._rows = {}
     def _edp(self):
         from config_manager import ConfigManager
         p = ConfigManager().get_preferences().get('download_path')
         return p if p and os.path.isdir(p) else self.dp
     def test_connection(self): return f"libtorrent {lt.version}"
+    def set_cold_refresh_interval(self, seconds):
+        super().set_cold_refresh_interval(seconds)
+        self.m.cold_interval = self.cold_refresh_interval
     def get_torrents_full(self):
         try:
-            hs = self.m.get_torrents()
+            ss = self.m.get_torrent_status_pairs()
         except Exception:
             return []
-        res = []
-        for h in hs:
+        # Statuses are replaced (not mutated) when libtorrent reports a change,
+        # so an unchanged (hot, cold) status pair can reuse the row built from it last time.
+        rows, res = {}, []
+        for s, cs in ss:
             try:
-                if not h.is_valid():
-                    continue
-                s = h.status()
-                sv = 0 if (s.paused and not s.auto_managed) else 1
-                if sv == 1 and s.state not in [lt.torrent_status.seeding, lt.torrent_status.finished]:
-                    av = 1
-                elif s.state == lt.torrent_status.seeding:
-                    av = 1
-                else:
-                    av = 0
-                hv = 1 if s.state in [lt.torrent_status.checking_files, lt.torrent_status.queued_for_checking] else 0
-                ih = h.info_hash()
-                ihs = str(ih)
-                if len(ihs) != 40:
-                    ihs = binascii.hexlify(ih.to_string()).decode('ascii')
-                ratio = (s.all_time_upload / s.all_time_download * 1000) if s.all_time_download > 0 else 0
-                eta = int((s.total_wanted - s.total_wanted_done) / s.download_payload_rate) if s.download_payload_rate > 0 else -1
-                ac = None
-                try:
-                    if hasattr(s, "distributed_copies"):
-                        ac = float(s.distributed_copies)
-                    elif hasattr(s, "distributed_full_copies"):
-                        ac = float(s.distributed_full_copies) + (float(getattr(s, "distributed_fraction", 0)) / 1000.0)
-                except Exception:
-                    pass
-                tracker_domain = _safe_tracker_domain(getattr(s, "current_tracker", "") or "")
-                res.append({"hash": str(ihs), "name": str(s.name if s.name else ihs), "size": int(s.total_wanted), "done": int(s.total_wanted_done), "up_total": int(s.all_time_upload), "ratio": int(ratio), "state": int(sv), "active": int(av), "hashing": int(hv), "message": str(s.errc.message() if s.errc else ""), "down_rate": int(s.download_payload_rate), "up_rate": int(s.upload_payload_rate), "tracker_domain": tracker_domain, "save_path": str(getattr(s, 'save_path', None) or self._edp()), "eta": int(eta), "seeds_connected": int(getattr(s, 'num_seeds', 0)), "seeds_total": int(s.num_complete), "leechers_connected": int(max(0, int(getattr(s, 'num_peers', s.num_connections)) - int(getattr(s, 'num_seeds', 0)))), "leechers_total": int(s.num_incomplete), "availability": ac})
+                c = self._rows.get(id(s))
+                r = c[2] if c and c[0] is s and c[1] is cs else self._row(s, cs)
+                rows[id(s)] = (s, cs, r)
+                res.append(r)
             except Exception:
                 continue
+        self._rows = rows
         return res
+    def _row(self, s, cs=None):
+        # name, save_path and distributed copies come from cs, the last status queried with them.
+        cs = cs or s
+        sv = 0 if (s.paused and not s.auto_managed) else 1
+        if sv == 1 and s.state not in [lt.torrent_status.seeding, lt.torrent_status.finished]:
+            av = 1
+        elif s.state == lt.torrent_status.seeding:
+            av = 1
+        else:
+            av = 0
+        hv = 1 if s.state in [lt.torrent_status.checking_files, lt.torrent_status.queued_for_checking] else 0
+        ih = s.info_hash if hasattr(s, "info_hash") else s.handle.info_hash()
+        ihs = str(ih)
+        if len(ihs) != 40:
+            ihs = binascii.hexlify(ih.to_string()).decode('ascii')
+        ratio = (s.all_time_upload / s.all_time_download * 1000) if s.all_time_download > 0 else 0
+        eta = int((s.total_wanted - s.total_wanted_done) / s.download_payload_rate) if s.download_payload_rate > 0 else -1
+        ac = None
+        try:
+            if hasattr(cs, "distributed_copies"):
+                ac = float(cs.distributed_copies)
+            elif hasattr(cs, "distributed_full_copies"):
+                ac = float(cs.distributed_full_copies) + (float(getattr(cs, "distributed_fraction", 0)) / 1000.0)
+        except Exception:
+            pass
+        tracker_domain = _safe_tracker_domain(getattr(s, "current_tracker", "") or "")
+        return {"hash": str(ihs), "name": str(cs.name if cs.name else ihs), "size": int(s.total_wanted), "done": int(s.total_wanted_done), "up_total": int(s.all_time_upload), "ratio": int(ratio), "state": int(sv), "active": int(av), "hashing": int(hv), "message": str(s.errc.message() if s.errc else ""), "down_rate": int(s.download_payload_rate), "up_rate": int(s.upload_payload_rate), "tracker_domain": tracker_domain, "save_path": str(getattr(cs, 'save_path', None) or self._edp()), "eta": int(eta), "seeds_connected": int(getattr(s, 'num_seeds', 0)), "seeds_total": int(s.num_complete), "leechers_connected": int(max(0, int(getattr(s, 'num_peers', s.num_connections)) - int(getattr(s, 'num_seeds', 0)))), "leechers_total": int(s.num_incomplete), "availability": ac}
     def start_torrent(self, h):
         x = self._gh(h)
         if x:
@@ -700,15 +1296,7 @@ class LocalClient(BaseClient):
     def get_global_stats(self):
         st = self.m.get_status()
         return st.payload_download_rate, st.payload_upload_rate
-    def _gh(self, i):
-        for h in self.m.get_torrents():
-            ih = h.info_hash()
-            ihs = str(ih)
-            if len(ihs) != 40:
-                ihs = binascii.hexlify(ih.to_string()).decode('ascii')
-            if ihs == i:
-                return h
-        return None
+    def _gh(self, i): return self.m.get_handle(i)
     def recheck_torrent(self, h):
         x = self._gh(h)
         if x:
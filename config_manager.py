@@ -49,6 +49,8 @@ DEFAULT_PREFERENCES: Dict[str, Any] = {
     "enable_trackers": True,
     "tracker_url": "https://raw.githubusercontent.com/scriptzteam/BitTorrent-Tracker-List/refs/heads/main/trackers_best.txt",
     "rss_update_interval": 300,  # Default 5 minutes
+    "snapshot_ttl": 1.5,  # Seconds a torrent list snapshot is shared between GUI/Web UI
+    "cold_refresh_interval": 30.0,  # Seconds between refetches of slow-changing torrent fields (name, size, path...)
     "web_ui_enabled": False,
     "web_ui_host": "127.0.0.1",
     "web_ui_port": 8080,
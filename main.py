@@ -22,6 +22,10 @@ from clients import RTorrentClient, QBittorrentClient, TransmissionClient, Local
 from config_manager import ConfigManager
 from session_manager import SessionManager
 from rss_manager import RSSManager
+from torrent_snapshot import SnapshotService, DEFAULT_TTL
+from torrent_columns import TorrentColumns
+import metrics
+import profiler
 import web_server
 import updater
 from torrent_creator import CreateTorrentDialog, create_torrent_bytes
@@ -41,6 +45,8 @@ COL_AVAILABILITY = 7
 # Rows in the torrent list carry an extra hidden value at the end (info hash).
 ROW_HASH_INDEX = -1
 APP_NAME = "SerrebiTorrent"
+# Length of a profile recorded from Tools > Diagnostics.
+PROFILE_SECONDS = 10.0
 
 
 def get_app_icon():
@@ -570,16 +576,8 @@ class TorrentListCtrl(wx.ListCtrl):
         if not key:
             return
 
-        def sort_key(item):
-            val = item.get(key)
-            if val is None:
-                if key in ('size', 'eta', 'seeds_connected', 'leechers_connected', 'ratio', 'availability'):
-                    return -1
-                return ""
-            return val
-
         try:
-            self.data.sort(key=sort_key, reverse=not self.sort_asc)
+            self.data = TorrentColumns(self.data).sorted_rows(key, reverse=not self.sort_asc)
         except Exception:
             pass
 
@@ -2253,6 +2251,9 @@ class MainFrame(wx.Frame):
     def __init__(self):
         super().__init__(None, title=APP_NAME, size=(1200, 800))
         
+        self.started_at = time.monotonic()
+        self.first_paint_s = None
+        self.restore_reported = False
         self.config_manager = ConfigManager()
         
         # Start Global Session (Background Local Mode)
@@ -2275,11 +2276,15 @@ class MainFrame(wx.Frame):
         self.pending_auto_start_attempts = 0
         self.pending_hash_starts = set()
         self.pending_cli_arg = None
-        self.thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        self.thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="gui-pool")
+        # One backend poller shared by the GUI refresh timer and the Web UI.
+        self.snapshots = SnapshotService(ttl=self.config_manager.get_preferences().get('snapshot_ttl', DEFAULT_TTL))
         self.update_check_in_progress = False
         self.update_install_in_progress = False
         self._auto_update_calllater = None
         self.refreshing = False
+        self.refresh_started = 0.0
+        metrics.REGISTRY.register_collector(self._collect_metrics)
         self.timer = wx.Timer(self)
         self.Bind(wx.EVT_TIMER, self.on_timer, self.timer)
         
@@ -2466,6 +2471,20 @@ class MainFrame(wx.Frame):
             "Local Session &Settings...\tCtrl+,",
             "Configure local session and application settings",
         )
+        tools_menu.AppendSeparator()
+        diagnostics_menu = wx.Menu()
+        profile_item = diagnostics_menu.Append(
+            wx.ID_ANY,
+            f"Record &Profile ({PROFILE_SECONDS:g} seconds)...",
+            "Sample all threads and save a flamegraph-compatible stack file",
+        )
+        memory_item = diagnostics_menu.Append(
+            wx.ID_ANY, "Take &Memory Snapshot...", "Save the top memory allocators and their growth since the last snapshot"
+        )
+        memory_stop_item = diagnostics_menu.Append(
+            wx.ID_ANY, "&Stop Memory Tracing", "Turn off allocation tracing started by a memory snapshot"
+        )
+        tools_menu.AppendSubMenu(diagnostics_menu, "&Diagnostics", "Profiling and memory diagnostics")
         
         self.qbit_remote_prefs_item.Enable(False)
         self.trans_remote_prefs_item.Enable(False)
@@ -2503,6 +2522,9 @@ class MainFrame(wx.Frame):
         # Tools menu extras.
         self.Bind(wx.EVT_MENU, lambda e: register_associations(), assoc_item)
         self.Bind(wx.EVT_MENU, self.on_check_updates, update_item)
+        self.Bind(wx.EVT_MENU, self.on_record_profile, profile_item)
+        self.Bind(wx.EVT_MENU, self.on_memory_snapshot, memory_item)
+        self.Bind(wx.EVT_MENU, lambda e: profiler.MEMORY.stop(), memory_stop_item)
         self.Bind(wx.EVT_MENU, self.on_remote_preferences, self.qbit_remote_prefs_item)
         self.Bind(wx.EVT_MENU, self.on_remote_preferences, self.trans_remote_prefs_item)
         self.Bind(wx.EVT_MENU, self.on_remote_preferences, self.rtorrent_remote_prefs_item)
@@ -2567,6 +2589,7 @@ class MainFrame(wx.Frame):
         prefs = self.config_manager.get_preferences()
         web_server.WEB_CONFIG['app'] = self
         web_server.WEB_CONFIG['client'] = self.client
+        web_server.WEB_CONFIG['snapshots'] = self.snapshots
         web_server.WEB_CONFIG['enabled'] = prefs.get('web_ui_enabled', False)
         web_server.WEB_CONFIG['host'] = prefs.get('web_ui_host', '127.0.0.1')
         web_server.WEB_CONFIG['port'] = prefs.get('web_ui_port', 8080)
@@ -2578,6 +2601,8 @@ class MainFrame(wx.Frame):
                 web_server.start_web_ui()
             except Exception as e:
                 wx.LogMessage(f"Error starting Web UI: {e}")
+        else:
+            web_server.stop_web_ui()
 
     def _schedule_auto_update_check(self):
         prefs = self.config_manager.get_preferences()
@@ -2593,6 +2618,68 @@ class MainFrame(wx.Frame):
     def on_check_updates(self, event):
         self.check_for_updates(True)
     
+    def on_record_profile(self, event):
+        if profiler.is_profiling():
+            wx.MessageBox("A profile is already being recorded.", "Profile", wx.OK | wx.ICON_INFORMATION)
+            return
+        self.statusbar.SetStatusText(f"Recording profile for {PROFILE_SECONDS:g} seconds...", 0)
+        # Not on thread_pool: the profile would occupy a worker for the whole run.
+        threading.Thread(target=self._record_profile_background, daemon=True, name="profiler").start()
+
+    def _record_profile_background(self):
+        try:
+            profile = profiler.sample(PROFILE_SECONDS)
+        except Exception as e:
+            wx.CallAfter(self._on_diagnostics_error, f"Profiling failed: {e}", "Profile")
+            return
+        wx.CallAfter(self._save_diagnostics, "Save Profile", "serrebitorrent-profile",
+                     profile.collapsed(), f"Profile recorded ({profile.samples} samples).")
+
+    def on_memory_snapshot(self, event):
+        self.statusbar.SetStatusText("Taking memory snapshot...", 0)
+        # Snapshotting and grouping every traced block can take seconds.
+        self.thread_pool.submit(self._memory_snapshot_background)
+
+    def _memory_snapshot_background(self):
+        first = not profiler.MEMORY.tracing
+        try:
+            report = profiler.MEMORY.snapshot()
+        except Exception as e:
+            wx.CallAfter(self._on_diagnostics_error, f"Memory snapshot failed: {e}", "Memory Snapshot")
+            return
+        if first:
+            wx.CallAfter(self._on_memory_tracing_started)
+            return
+        wx.CallAfter(self._save_diagnostics, "Save Memory Snapshot", "serrebitorrent-memory",
+                     profiler.format_memory_report(report), "Memory snapshot saved.")
+
+    def _on_memory_tracing_started(self):
+        self.statusbar.SetStatusText("Memory tracing started.", 0)
+        wx.MessageBox(
+            "Memory tracing is now on. Take another snapshot later to see which allocations grew.",
+            "Memory Snapshot", wx.OK | wx.ICON_INFORMATION,
+        )
+
+    def _on_diagnostics_error(self, message, title):
+        self.statusbar.SetStatusText("", 0)
+        wx.MessageBox(message, title, wx.OK | wx.ICON_ERROR)
+
+    def _save_diagnostics(self, title, prefix, text, status):
+        default = f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}.txt"
+        with wx.FileDialog(self, title, defaultFile=default, wildcard="Text files (*.txt)|*.txt",
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dlg:
+            if dlg.ShowModal() != wx.ID_OK:
+                self.statusbar.SetStatusText("", 0)
+                return
+            path = dlg.GetPath()
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except OSError as e:
+            wx.MessageBox(f"Could not save {path}: {e}", title, wx.OK | wx.ICON_ERROR)
+            return
+        self.statusbar.SetStatusText(status, 0)
+
     def on_about(self, event):
         from app_version import APP_VERSION
         info = wx.adv.AboutDialogInfo()
@@ -2847,11 +2934,12 @@ class MainFrame(wx.Frame):
         try:
             import time
             time.sleep(0.3)
-            for h in hashes:
-                if generation != self.client_generation:
-                    return
-                if self.client:
-                    self.client.start_torrent(h)
+            if generation != self.client_generation:
+                return
+            if self.client:
+                failed = self.client.start_torrents(list(hashes))
+                if failed:
+                    raise failed[0][1]
             wx.CallAfter(self.statusbar.SetStatusText, "Auto-started new torrent(s)", 0)
             wx.CallAfter(self.refresh_data)
         except Exception as e:
@@ -2903,7 +2991,7 @@ class MainFrame(wx.Frame):
 
     def _fetch_remote_preferences(self):
         try:
-            prefs = self.client.get_app_preferences()
+            prefs = self.snapshots.get_app_preferences('gui')
             if prefs is None:
                 wx.CallAfter(wx.MessageBox, "Failed to retrieve preferences from remote client. The client might not support this feature or there is a connection issue.", "Error", wx.OK | wx.ICON_ERROR)
                 wx.CallAfter(self.statusbar.SetStatusText, "Failed to fetch preferences", 0)
@@ -2940,6 +3028,7 @@ class MainFrame(wx.Frame):
     def _apply_remote_preferences(self, prefs):
         try:
             self.client.set_app_preferences(prefs)
+            self.snapshots.invalidate_preferences()
             name = "Remote"
             if isinstance(self.client, QBittorrentClient):
                 name = "qBittorrent"
@@ -2976,6 +3065,10 @@ class MainFrame(wx.Frame):
         # Save local state
         self.tb_icon.RemoveIcon()
         self.tb_icon.Destroy()
+        try:
+            web_server.stop_web_ui()
+        except Exception:
+            pass
         try:
             # Provide visual feedback since save_state can take a few seconds
             wx.BeginBusyCursor()
@@ -3001,6 +3094,7 @@ class MainFrame(wx.Frame):
         self.timer.Stop()
         self.connected = False
         self.client = None
+        self.snapshots.set_client(None)
         self.all_torrents = []
         self.torrent_list.update_data([])
         self.statusbar.SetStatusText("Connecting...", 0)
@@ -3048,7 +3142,9 @@ class MainFrame(wx.Frame):
             self._update_remote_prefs_menu_state()
             return
 
+        client.set_cold_refresh_interval(self.config_manager.get_preferences().get('cold_refresh_interval', 30.0))
         self.client = client
+        self.snapshots.set_client(client)
         self.connected = True
         self._update_client_default_save_path()
         self._update_web_ui()
@@ -3087,10 +3183,14 @@ class MainFrame(wx.Frame):
             self.rss_panel.on_refresh_all(None)
 
     def refresh_data(self):
-        if not self.client or self.refreshing:
+        if not self.client:
+            return
+        if self.refreshing:
+            metrics.REFRESH_OVERRUNS.inc()
             return
         
         self.refreshing = True
+        self.refresh_started = time.perf_counter()
         filter_mode = self.current_filter
         generation = self.client_generation
         self.thread_pool.submit(self._fetch_and_process_data, filter_mode, generation)
@@ -3099,82 +3199,65 @@ class MainFrame(wx.Frame):
         with self.data_lock:
             return list(self.all_torrents)
 
+    def _collect_metrics(self):
+        queue = getattr(self.thread_pool, '_work_queue', None)
+        return [
+            metrics.gauge_family("thread_pool_queue_depth", "Tasks waiting for a GUI worker thread.",
+                                 queue.qsize() if queue is not None else None),
+            # Left out of the scrape until the first non-empty list is painted.
+            metrics.gauge_family("startup_first_paint_seconds", "Time from launch to the first painted torrent list.",
+                                 self.first_paint_s),
+        ]
+
     def _fetch_and_process_data(self, filter_mode, generation):
         try:
-            torrents = self.client.get_torrents_full()
+            fetch_start = time.perf_counter()
+            snap = self.snapshots.get('gui')
+            torrents = snap.torrents
+            # Counts and filter membership come from the snapshot's shared columnar view.
+            cols = snap.columns
+            stats, tracker_counts = cols.summary(clean_status_message)
+            display_data = cols.select(filter_mode, clean_status_message)
             
-            display_data = []
-            stats = {"All": 0, "Downloading": 0, "Finished": 0, "Seeding": 0, "Stopped": 0, "Failed": 0}
-            tracker_counts = {}
-            
-            for t in torrents:
-                # Fast pre-calculation for filtering and stats
-                size = t.get('size', 0)
-                done = t.get('done', 0)
-                pct = (done / size * 100) if size > 0 else 0
-                state = t.get('state', 0)
-                msg = t.get('message', '')
-                tracker_domain = t.get('tracker_domain', 'Unknown') or 'Unknown'
-                
-                is_seeding = (state == 1 and pct >= 100)
-                is_stopped = (state == 0)
-                is_error = bool(msg and clean_status_message(msg))
-                
-                stats["All"] += 1
-                if state == 1 and pct < 100:
-                    stats["Downloading"] += 1
-                if pct >= 100:
-                    stats["Finished"] += 1
-                if is_seeding:
-                    stats["Seeding"] += 1
-                if is_stopped:
-                    stats["Stopped"] += 1
-                if is_error:
-                    stats["Failed"] += 1
-                
-                tracker_counts[tracker_domain] = tracker_counts.get(tracker_domain, 0) + 1
-                    
-                include = False
-                if filter_mode == "All":
-                    include = True
-                elif filter_mode == "Downloading" and state == 1 and pct < 100:
-                    include = True
-                elif filter_mode == "Finished" and pct >= 100:
-                    include = True
-                elif filter_mode == "Seeding" and is_seeding:
-                    include = True
-                elif filter_mode == "Stopped" and is_stopped:
-                    include = True
-                elif filter_mode == "Failed" and is_error:
-                    include = True
-                elif filter_mode == tracker_domain:
-                    include = True
-                
-                if include:
-                    # Keep raw data for virtual list formatting
-                    display_data.append(t)
-            
-            g_down, g_up = 0, 0
-            try:
-                g_down, g_up = self.client.get_global_stats()
-            except Exception:
-                pass
+            g_down, g_up = snap.global_stats
+            metrics.REFRESH_SECONDS.observe(time.perf_counter() - fetch_start, ("fetch",))
             
             wx.CallAfter(self._on_refresh_complete, generation, torrents, display_data, stats, tracker_counts, g_down, g_up)
             
         except Exception as e:
             wx.CallAfter(self._on_refresh_error, generation, e)
 
+    def _show_restore_progress(self):
+        try:
+            progress = SessionManager.get_instance().get_restore_progress()
+        except Exception:
+            return
+        if not progress['done']:
+            self.statusbar.SetStatusText(f"Restoring torrents: {progress['loaded'] + progress['failed']}/{progress['total']}", 0)
+            return
+        self.restore_reported = True
+        if progress['total']:
+            self.statusbar.SetStatusText(f"Restored {progress['loaded']} torrents in {progress['restored_s']:.1f}s", 0)
+
     def _on_refresh_complete(self, generation, torrents, display_data, stats, tracker_counts, g_down, g_up):
         self.refreshing = False
         if not self.connected or generation != self.client_generation:
             return
+        with metrics.REFRESH_SECONDS.time(("paint",)):
+            self._apply_refresh(generation, torrents, display_data, stats, tracker_counts, g_down, g_up)
+        metrics.REFRESH_SECONDS.observe(time.perf_counter() - self.refresh_started, ("total",))
+
+    def _apply_refresh(self, generation, torrents, display_data, stats, tracker_counts, g_down, g_up):
 
         with self.data_lock:
             self.all_torrents = torrents
         self.torrent_list.update_data(display_data)
         current_hashes = {t.get('hash') for t in torrents if t.get('hash')}
         self.known_hashes = current_hashes
+        if torrents and self.first_paint_s is None:
+            self.first_paint_s = time.monotonic() - self.started_at
+        if isinstance(self.client, LocalClient) and not self.restore_reported:
+            self._show_restore_progress()
         
         for key, item_id in self.cat_ids.items():
             self.sidebar.SetItemText(item_id, f"{key} ({stats[key]})")
@@ -3417,8 +3500,9 @@ class MainFrame(wx.Frame):
 
     def _apply_background(self, action, hashes, label):
         try:
-            for h in hashes:
-                action(h)
+            failed = action(hashes)
+            if failed:
+                raise failed[0][1]
             wx.CallAfter(self._on_action_complete, f"{label} complete")
         except Exception as e:
             wx.CallAfter(self._on_action_error, f"Failed to {label.lower()} torrent: {e}")
@@ -3447,25 +3531,21 @@ class MainFrame(wx.Frame):
         return out
 
     def _apply_background_bulk(self, action, hashes, label):
-        failed = 0
-        last_error = None
         try:
-            for h in hashes:
-                try:
-                    action(h)
-                except Exception as e:
-                    failed += 1
-                    last_error = e
+            errors = action(hashes)
+            failed = len(errors)
+            last_error = errors[-1][1] if errors else None
             if failed == 0:
                 wx.CallAfter(self._on_action_complete, f"{label} complete")
             else:
                 wx.CallAfter(self.statusbar.SetStatusText, f"{label} complete ({failed} failed). Last error: {last_error}", 0)
+                self.snapshots.invalidate()
                 wx.CallAfter(self.refresh_data)
         except Exception as e:
             wx.CallAfter(self._on_action_error, f"Failed to {label.lower()}: {e}")
 
     def start_all_torrents(self):
-        if not self.client or not hasattr(self.client, 'start_torrent'):
+        if not self.client or not hasattr(self.client, 'start_torrents'):
             if hasattr(self, 'statusbar'):
                 self.statusbar.SetStatusText('Not connected to any client.', 0)
             return
@@ -3476,10 +3556,10 @@ class MainFrame(wx.Frame):
             return
         if hasattr(self, 'statusbar'):
             self.statusbar.SetStatusText('Starting all torrents...', 0)
-        self.thread_pool.submit(self._apply_background_bulk, self.client.start_torrent, hashes, 'Start all')
+        self.thread_pool.submit(self._apply_background_bulk, self.client.start_torrents, hashes, 'Start all')
 
     def stop_all_torrents(self):
-        if not self.client or not hasattr(self.client, 'stop_torrent'):
+        if not self.client or not hasattr(self.client, 'stop_torrents'):
             if hasattr(self, 'statusbar'):
                 self.statusbar.SetStatusText('Not connected to any client.', 0)
             return
@@ -3490,22 +3570,22 @@ class MainFrame(wx.Frame):
             return
         if hasattr(self, 'statusbar'):
             self.statusbar.SetStatusText('Stopping all torrents...', 0)
-        self.thread_pool.submit(self._apply_background_bulk, self.client.stop_torrent, hashes, 'Stop all')
+        self.thread_pool.submit(self._apply_background_bulk, self.client.stop_torrents, hashes, 'Stop all')
 
     def on_start(self, event):
-        action = self.client.start_torrent if self.client else None
+        action = self.client.start_torrents if self.client else None
         self._apply_to_selected(action, "Start")
 
     def on_stop(self, event):
-        action = self.client.stop_torrent if self.client else None
+        action = self.client.stop_torrents if self.client else None
         self._apply_to_selected(action, "Stop")
 
     def on_pause(self, event):
-        action = self.client.stop_torrent if self.client else None
+        action = self.client.stop_torrents if self.client else None
         self._apply_to_selected(action, "Pause")
 
     def on_resume(self, event):
-        action = self.client.start_torrent if self.client else None
+        action = self.client.start_torrents if self.client else None
         self._apply_to_selected(action, "Resume")
 
 
@@ -3518,13 +3598,13 @@ class MainFrame(wx.Frame):
             pass
         except Exception:
             pass
-        self._apply_to_selected(self.client.recheck_torrent, "Recheck")
+        self._apply_to_selected(self.client.recheck_torrents, "Recheck")
 
     def on_reannounce(self, event):
         if not self.client or not hasattr(self.client, "reannounce_torrent"):
             self.statusbar.SetStatusText("Reannounce not supported by this client.", 0)
             return
-        self._apply_to_selected(self.client.reannounce_torrent, "Reannounce")
+        self._apply_to_selected(self.client.reannounce_torrents, "Reannounce")
 
     def _set_clipboard_text(self, text: str) -> bool:
         try:
@@ -3770,6 +3850,7 @@ class MainFrame(wx.Frame):
 
     def _on_action_complete(self, msg):
         self.statusbar.SetStatusText(msg, 0)
+        self.snapshots.invalidate()
         self.refresh_data()
 
     def _on_action_error(self, msg):
@@ -0,0 +1,167 @@
+"""Incremental sync/maindata support for the Web UI.
+
+Implements qBittorrent's rid-based delta protocol:
+- A request with rid=0 (or an rid we no longer remember) gets a full update.
+- Otherwise the response only carries torrents/fields that changed since that
+  rid, plus the hashes that disappeared in ``torrents_removed``.
+- Every response carries a new ``rid`` the client echoes back on its next poll.
+
+A session can hold several views (one per filter/search), each with its own
+rid history. Views are capped per session, so one client cycling through
+searches only evicts its own older views, never other sessions.
+
+Rows handed to ``MainDataSync.update`` are stored by reference and diffed on the
+next poll, so callers must treat them as immutable (build a new dict on change).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+# How many past snapshots we keep per session. One is enough for a well-behaved
+# client; a couple more lets a client recover from a dropped response without
+# falling back to a full update.
+SNAPSHOT_HISTORY = 3
+MAX_SESSIONS = 32
+MAX_VIEWS_PER_SESSION = 4
+SESSION_IDLE_TIMEOUT = 600.0
+
+_MISSING = object()
+
+
+def diff_rows(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the fields of ``new`` that differ from ``old``."""
+    if old is new:
+        return {}
+    changed = {}
+    for key, value in new.items():
+        if old.get(key, _MISSING) != value:
+            changed[key] = value
+    return changed
+
+
+def diff_torrents(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]):
+    """Diff two hash-indexed torrent maps.
+
+    Returns ``(changed, removed)`` where ``changed`` maps hash -> changed fields
+    (the whole row for new torrents) and ``removed`` lists vanished hashes.
+    """
+    changed = {}
+    for h, row in new.items():
+        prev = old.get(h)
+        if prev is None:
+            changed[h] = row
+            continue
+        delta = diff_rows(prev, row)
+        if delta:
+            changed[h] = delta
+    removed = [h for h in old if h not in new]
+    return changed, removed
+
+
+def index_torrents(torrents: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {t['hash']: t for t in torrents if t.get('hash')}
+
+
+class _SessionState:
+    __slots__ = ("next_rid", "views", "last_seen")
+
+    def __init__(self) -> None:
+        # Shared by all views, so a rid never means two different snapshots.
+        self.next_rid = 1
+        # view -> rid -> (torrents by hash, server_state)
+        self.views: "OrderedDict[str, OrderedDict[int, tuple]]" = OrderedDict()
+        self.last_seen = time.monotonic()
+
+
+class MainDataSync:
+    """Keeps per-session versioned snapshots and produces maindata responses."""
+
+    def __init__(self, history: int = SNAPSHOT_HISTORY, max_sessions: int = MAX_SESSIONS,
+                 idle_timeout: float = SESSION_IDLE_TIMEOUT, max_views: int = MAX_VIEWS_PER_SESSION) -> None:
+        self.lock = threading.Lock()
+        self.history = max(1, int(history))
+        self.max_sessions = max(1, int(max_sessions))
+        self.max_views = max(1, int(max_views))
+        self.idle_timeout = idle_timeout
+        self.sessions: "OrderedDict[str, _SessionState]" = OrderedDict()
+
+    def reset(self, session_id: Optional[str] = None) -> None:
+        with self.lock:
+            if session_id is None:
+                self.sessions.clear()
+            else:
+                self.sessions.pop(session_id, None)
+
+    def _get_session(self, session_id: str) -> _SessionState:
+        now = time.monotonic()
+        expired = [sid for sid, st in self.sessions.items() if now - st.last_seen > self.idle_timeout]
+        for sid in expired:
+            del self.sessions[sid]
+
+        state = self.sessions.get(session_id)
+        if state is None:
+            state = _SessionState()
+            self.sessions[session_id] = state
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session_id)
+        state.last_seen = now
+        return state
+
+    def update(self, session_id: str, rid: Any, torrents: Iterable[Dict[str, Any]],
+               server_state: Optional[Dict[str, Any]] = None, view: str = "") -> Dict[str, Any]:
+        """Record a new snapshot for ``view`` of ``session_id`` and return the response body."""
+        try:
+            rid = int(rid or 0)
+        except (TypeError, ValueError):
+            rid = 0
+        t_map = torrents if isinstance(torrents, dict) else index_torrents(torrents)
+        server_state = dict(server_state or {})
+
+        with self.lock:
+            state = self._get_session(session_id)
+            snapshots = state.views.get(view)
+            if snapshots is None:
+                snapshots = state.views[view] = OrderedDict()
+                while len(state.views) > self.max_views:
+                    state.views.popitem(last=False)
+            else:
+                state.views.move_to_end(view)
+            base = snapshots.get(rid) if rid > 0 else None
+
+            new_rid = state.next_rid
+            state.next_rid += 1
+            snapshots[new_rid] = (t_map, server_state)
+            while len(snapshots) > self.history:
+                snapshots.popitem(last=False)
+
+        if base is None:
+            return {
+                'rid': new_rid,
+                'full_update': True,
+                'torrents': t_map,
+                'categories': {},
+                'tags': [],
+                'server_state': server_state,
+            }
+
+        old_map, old_server_state = base
+        changed, removed = diff_torrents(old_map, t_map)
+        response: Dict[str, Any] = {'rid': new_rid}
+        if changed:
+            response['torrents'] = changed
+        if removed:
+            response['torrents_removed'] = removed
+        state_delta = diff_rows(old_server_state, server_state)
+        if state_delta:
+            response['server_state'] = state_delta
+        return response
+
+    def session_ids(self) -> List[str]:
+        with self.lock:
+            return list(self.sessions.keys())
@@ -0,0 +1,247 @@
+"""In-process metrics exported in the Prometheus text format.
+
+Counters and histograms keep their values in small dicts keyed by label values,
+one lock per metric. Recording a sample is a lock round-trip plus a bisect, so
+the hot paths (client RPCs, the GUI refresh, web requests, alerts, RSS
+fetches, resume-data saves) are instrumented unconditionally.
+
+Numbers that are already tracked elsewhere are read when the endpoint is
+scraped, through collectors registered with ``REGISTRY.register_collector``.
+That covers snapshot stats, rTorrent transport stats, restore and checkpoint
+progress, and queue depths.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+PREFIX = "serrebitorrent_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+# A collector returns families: (name, type, help, [(labels dict, value), ...]).
+Family = Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable[Tuple[str, Any]]) -> str:
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}" if body else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values: Dict[Labels, Any] = {}
+
+    def _check(self, labels: Labels) -> Labels:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return labels
+
+    def lines(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self.lock:
+            value = self.values.get(labels)
+            if value is None:
+                value = self.values[self._check(labels)] = 0
+            self.values[labels] = value + amount
+
+    def get(self, labels: Labels = ()) -> float:
+        with self.lock:
+            return self.values.get(labels, 0)
+
+    def lines(self) -> List[str]:
+        with self.lock:
+            items = list(self.values.items())
+        return [f"{self.name}{_labels(zip(self.labelnames, k))} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        with self.lock:
+            self.values[self._check(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(labels)
+            if state is None:
+                # Per-bucket (not cumulative) counts plus an overflow slot, sum.
+                state = self.values[self._check(labels)] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][i] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, labels: Labels = ()) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def count(self, labels: Labels = ()) -> int:
+        with self.lock:
+            state = self.values.get(labels)
+            return sum(state[0]) if state else 0
+
+    def lines(self) -> List[str]:
+        with self.lock:
+            items = [(k, list(counts), total) for k, (counts, total) in self.values.items()]
+        out = []
+        for key, counts, total in items:
+            pairs = list(zip(self.labelnames, key))
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                out.append(f"{self.name}_bucket{_labels(pairs + [('le', _number(float(bound)))])} {running}")
+            out.append(f"{self.name}_sum{_labels(pairs)} {_number(total)}")
+            out.append(f"{self.name}_count{_labels(pairs)} {running}")
+        return out
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, _Metric] = {}
+        self.collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def _get(self, cls, name: str, *args, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        with self.lock:
+            if collector not in self.collectors:
+                self.collectors.append(collector)
+
+    def unregister_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        with self.lock:
+            if collector in self.collectors:
+                self.collectors.remove(collector)
+
+    def expose(self) -> str:
+        """All metrics and collector output in the Prometheus text exposition format."""
+        with self.lock:
+            metrics = list(self.metrics.values())
+            collectors = list(self.collectors)
+        out: List[str] = []
+        for m in metrics:
+            out.append(f"# HELP {m.name} {m.help}")
+            out.append(f"# TYPE {m.name} {m.kind}")
+            out.extend(m.lines())
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception:
+                # A collector whose source went away must not break the scrape.
+                continue
+            for name, kind, help, samples in families:
+                out.append(f"# HELP {PREFIX}{name} {help}")
+                out.append(f"# TYPE {PREFIX}{name} {kind}")
+                for labels, value in samples:
+                    if value is not None:
+                        out.append(f"{PREFIX}{name}{_labels(labels.items())} {_number(float(value))}")
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+
+CLIENT_RPC_SECONDS = REGISTRY.histogram("client_rpc_seconds", "Duration of torrent client calls.", ("backend", "method"))
+CLIENT_RPC_ERRORS = REGISTRY.counter("client_rpc_errors_total", "Torrent client calls that raised.", ("backend", "method"))
+REFRESH_SECONDS = REGISTRY.histogram("refresh_seconds", "GUI refresh pipeline duration by stage (fetch, paint, total).", ("stage",))
+REFRESH_OVERRUNS = REGISTRY.counter("refresh_overruns_total",
+                                    "Refresh timer ticks skipped because the previous refresh was still running.")
+WEB_REQUEST_SECONDS = REGISTRY.histogram("web_request_seconds", "Web UI request handling time.", ("endpoint",))
+WEB_REQUESTS = REGISTRY.counter("web_requests_total", "Web UI requests by endpoint and status.", ("endpoint", "status"))
+RSS_FETCH_SECONDS = REGISTRY.histogram("rss_fetch_seconds", "RSS feed fetch and parse time.")
+RSS_FETCH_ERRORS = REGISTRY.counter("rss_fetch_errors_total", "RSS feed fetches that failed.")
+ALERTS = REGISTRY.counter("alerts_total", "libtorrent alerts handled by the alert loop.", ("type",))
+RESUME_SAVES = REGISTRY.counter("resume_data_saves_total", "save_resume_data results.", ("result",))
+STATE_FLUSH_SECONDS = REGISTRY.histogram("state_flush_seconds", "Session state store write time.")
+
+
+_timing = threading.local()
+
+
+def timed(fn: Callable, backend: str, method: str) -> Callable:
+    """Wrap a client method so each call lands in CLIENT_RPC_SECONDS (and CLIENT_RPC_ERRORS).
+
+    Only the outermost timed call on a thread is recorded, so a public method
+    built on other public methods (batch helpers, get_torrents_full) counts once.
+    """
+    labels = (backend, method)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if getattr(_timing, "active", False):
+            return fn(*args, **kwargs)
+        _timing.active = True
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            CLIENT_RPC_ERRORS.inc(labels)
+            raise
+        finally:
+            CLIENT_RPC_SECONDS.observe(time.perf_counter() - start, labels)
+            _timing.active = False
+    return wrapper
+
+
+def gauge_family(name: str, help: str, value: Optional[float], labels: Optional[Dict[str, Any]] = None) -> Family:
+    return name, "gauge", help, [(labels or {}, value)]
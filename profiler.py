@@ -0,0 +1,216 @@
+"""On-demand diagnostics for the running process.
+
+``sample`` is a wall-clock sampling profiler. For a fixed duration it reads
+every thread's current frame with ``sys._current_frames()`` and counts
+identical stacks. That covers the wx main loop, the GUI thread pool, the
+libtorrent alert thread and the web server workers alike. The result is
+written in the collapsed-stack format (``thread;outer;...;inner count``), which
+flamegraph.pl, speedscope and inferno all read.
+
+``MEMORY`` wraps ``tracemalloc``. The first snapshot switches tracing on. Each
+later snapshot reports the top allocation sites and how they grew since the
+previous snapshot, which is usually enough to spot a leak. Tracing slows
+allocation down noticeably, so ``MemoryTracker.stop`` turns it off again.
+
+Only one profile runs at a time. Both tools are reachable from the Tools menu
+and the authenticated ``/api/v2/debug/*`` web endpoints.
+"""
+
+from __future__ import annotations
+
+import linecache
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SECONDS = 10.0
+MAX_SECONDS = 60.0
+DEFAULT_INTERVAL = 0.005
+MIN_INTERVAL = 0.001
+# Frames kept per traced allocation; more frames cost more memory per block.
+TRACE_FRAMES = 10
+DEFAULT_TOP = 25
+KEY_TYPES = ("lineno", "filename", "traceback")
+
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profile is already running."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    # ';' separates frames and the last ' ' separates the count.
+    return f"{name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})".replace(";", ":")
+
+
+class Profile:
+    """Stack counts collected by ``sample``."""
+
+    def __init__(self, seconds: float, interval: float) -> None:
+        self.seconds = seconds
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    def collapsed(self) -> str:
+        """The profile as collapsed stacks, hottest first."""
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+def sample(seconds: float = DEFAULT_SECONDS, interval: float = DEFAULT_INTERVAL) -> Profile:
+    """Sample all threads but the caller for ``seconds``; raises ProfilerBusy if one is running.
+
+    Blocks the calling thread for the whole duration.
+    """
+    seconds, interval = float(seconds), float(interval)
+    if not (0 < seconds < math.inf and 0 < interval < math.inf):
+        raise ValueError("seconds and interval must be positive and finite")
+    interval = max(interval, MIN_INTERVAL)
+    seconds = min(max(seconds, interval), MAX_SECONDS)
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        profile = Profile(seconds, interval)
+        me = threading.get_ident()
+        names: Dict[int, str] = {}
+        labels: Dict[Any, str] = {}  # (code, lineno) -> label
+        deadline = time.monotonic() + seconds
+        while True:
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    names.update((t.ident, t.name.replace(";", ":")) for t in threading.enumerate())
+                    name = names.setdefault(ident, f"thread-{ident}")
+                stack = []
+                while frame is not None:
+                    key = (frame.f_code, frame.f_lineno)
+                    label = labels.get(key)
+                    if label is None:
+                        label = labels[key] = _frame_label(frame)
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(name)
+                profile.stacks[";".join(reversed(stack))] += 1
+            del frames
+            profile.samples += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+        return profile
+    finally:
+        _profile_lock.release()
+
+
+def is_profiling() -> bool:
+    return _profile_lock.locked()
+
+
+class MemoryTracker:
+    """tracemalloc snapshots, each diffed against the one before it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._previous_at = 0.0
+        self._started_here = False
+
+    def snapshot(self, top: int = DEFAULT_TOP, key_type: str = "lineno") -> Dict[str, Any]:
+        """Report the top ``top`` allocation sites and their growth since the last call.
+
+        The first call only starts tracing (and takes the baseline).
+        """
+        if key_type not in KEY_TYPES:
+            raise ValueError(f"key_type must be one of {', '.join(KEY_TYPES)}")
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+                self._started_here = True
+                self._previous = None
+            snap = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, linecache.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            ))
+            now = time.time()
+            current, peak = tracemalloc.get_traced_memory()
+            report: Dict[str, Any] = {
+                "tracing": True,
+                "time": now,
+                "traced_bytes": current,
+                "peak_bytes": peak,
+                "key_type": key_type,
+                "top": [_stat_row(s, key_type) for s in snap.statistics(key_type)[:top]],
+                "since": None,
+                "diff": [],
+            }
+            if self._previous is not None:
+                report["since"] = self._previous_at
+                diff = snap.compare_to(self._previous, key_type)
+                report["diff"] = [_stat_row(s, key_type) for s in diff[:top] if s.size_diff or s.count_diff]
+            self._previous, self._previous_at = snap, now
+            return report
+
+    def stop(self) -> None:
+        """Stop tracing (if a snapshot started it) and drop the baseline."""
+        with self._lock:
+            if self._started_here and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._started_here = False
+            self._previous = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+
+def _stat_row(stat, key_type: str) -> Dict[str, Any]:
+    frames = stat.traceback if key_type == "traceback" else stat.traceback[:1]
+    row: Dict[str, Any] = {
+        "location": f"{frames[0].filename}:{frames[0].lineno}" if key_type != "filename" else frames[0].filename,
+        "size": stat.size,
+        "count": stat.count,
+    }
+    if hasattr(stat, "size_diff"):
+        row["size_diff"] = stat.size_diff
+        row["count_diff"] = stat.count_diff
+    if key_type == "traceback":
+        row["traceback"] = [f"{f.filename}:{f.lineno}" for f in frames]
+    return row
+
+
+def format_memory_report(report: Dict[str, Any]) -> str:
+    """Plain-text rendering of a ``MemoryTracker.snapshot`` report."""
+    def size(n: int) -> str:
+        return f"{n / 1024:,.1f} KiB"
+
+    out: List[str] = [
+        f"Traced: {size(report['traced_bytes'])} (peak {size(report['peak_bytes'])})",
+        "",
+        f"Top allocations by {report['key_type']}:",
+    ]
+    out += [f"  {size(r['size']):>14}  {r['count']:>9,} blocks  {r['location']}" for r in report["top"]]
+    out.append("")
+    if report["since"] is None:
+        out.append("Tracing started; take another snapshot later to see what grew.")
+    else:
+        out.append(f"Growth over the last {report['time'] - report['since']:.0f} s:")
+        out += [f"  {r['size_diff']:>+14,} B  {r['count_diff']:>+9,} blocks  {r['location']}"
+                for r in report["diff"]]
+    return "\n".join(out) + "\n"
+
+
+MEMORY = MemoryTracker()
@@ -4,6 +4,7 @@ import re
 import requests
 import threading
 from defusedxml import ElementTree as ET
+import metrics
 from app_paths import get_data_dir
 
 RSS_FILE = os.path.join(get_data_dir(), "rss.json")
@@ -77,6 +78,10 @@ class RSSManager:
             self.save()
 
     def fetch_feed(self, url):
+        with metrics.RSS_FETCH_SECONDS.time():
+            return self._fetch_feed(url)
+
+    def _fetch_feed(self, url):
         try:
             r = requests.get(url, timeout=10)
             r.raise_for_status()
@@ -116,6 +121,7 @@ class RSSManager:
         except Exception as e:
             err_msg = str(e)
             print(f"RSS Fetch Error {url}: {err_msg}")
+            metrics.RSS_FETCH_ERRORS.inc()
             with self.lock:
                 if url in self.feeds:
                     self.feeds[url]['last_error'] = err_msg
@@ -1,9 +1,11 @@
 # ruff: noqa: E402
 
+import binascii
 import os
 import threading
 import time
-import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from libtorrent_env import prepare_libtorrent_dlls
 
@@ -14,8 +16,18 @@ try:
 except ImportError:
     lt = None
 
+import metrics
 from app_paths import get_state_dir
 from config_manager import ConfigManager
+from state_store import StateStore
+
+# Buffered state changes are written at most this often (seconds).
+DB_FLUSH_INTERVAL = 2.0
+# Torrents flagged need_save_resume are checkpointed within this many seconds;
+# the requests are spread evenly over the interval.
+CHECKPOINT_INTERVAL = 60.0
+# Threads decoding resume data / metainfo during startup restore.
+RESTORE_WORKERS = min(4, os.cpu_count() or 1)
 
 class SessionManager:
     _instance = None
@@ -31,11 +43,48 @@ class SessionManager:
             raise RuntimeError("libtorrent not available")
         
         self.lock = threading.RLock()
+        # info_hash -> torrent_handle, kept in sync by add/remove paths and alerts
+        self.handles = {}
+        self.handle_aliases = {}
+        # info_hash -> latest torrent_status, fed by state_update_alert
+        self.statuses = {}
+        self.status_interval = 1.0
+        self.last_status_post = 0.0
+        # info_hash -> latest status that carried name/save_path/distributed copies;
+        # those are only queried every cold_interval seconds.
+        self.cold_statuses = {}
+        self.cold_interval = 30.0
+        self.last_cold_post = 0.0
             
         self.state_dir = get_state_dir()
-        self.torrents_db_path = os.path.join(self.state_dir, 'torrents.json')
+        self.store = StateStore(self.state_dir)
+        migrated = self.store.migrate_legacy(self.state_dir)
+        if migrated:
+            print(f"Migrated {migrated} torrents to {self.store.path}")
+        # Write-behind buffers, flushed to the store in one transaction.
+        self.db_dirty = set()
+        self.db_dirty_since = 0.0
+        # Held across a flush's copy and write, and by remove_torrent around its
+        # delete, so a flush can't re-insert a torrent removed mid-write.
+        # Always taken before self.lock.
+        self.flush_lock = threading.Lock()
+        self.pending_resume = {}
+        self.pending_metainfo = {}
         with self.lock:
-            self.torrents_db = self._load_torrents_db()
+            self.torrents_db = self.store.load_entries()
+        # info_hash -> when we first saw it with unsaved resume data
+        self.checkpoint_dirty = {}
+        self.checkpoint_queue = deque()
+        self.checkpoint_inflight = set()
+        self.checkpoint_rate = 0.0
+        self.checkpoint_budget = 0.0
+        self.last_checkpoint_tick = None
+        self.last_checkpoint_scan = None
+        self.checkpoints_saved = 0
+        self.restore_thread = None
+        self.restore_pending = set()
+        self.restore = {'total': 0, 'loaded': 0, 'failed': 0, 'submitted': False,
+                        'started': 0.0, 'first_at': 0.0, 'finished_at': 0.0}
 
         # Create Session
         self.ses = lt.session()
@@ -48,27 +97,45 @@ class SessionManager:
         self.alerts_queue = []
         self.running = True
         self.pending_saves = set()  # Track info_hashes for pending resume data
-        self.alert_thread = threading.Thread(target=self._alert_loop, daemon=True)
+        self.alert_thread = threading.Thread(target=self._alert_loop, daemon=True, name="lt-alerts")
         self.alert_thread.start()
+        metrics.REGISTRY.register_collector(self.collect_metrics)
         
         with self.lock:
             self.load_state()
 
-    def _load_torrents_db(self):
-        if os.path.exists(self.torrents_db_path):
+    def _mark_db_dirty(self, info_hash):
+        # Write-behind: mutations only flag the entry, the alert loop flushes it.
+        with self.lock:
+            self.db_dirty.add(info_hash)
+            if not self.db_dirty_since:
+                self.db_dirty_since = time.monotonic()
+
+    def _flush_torrents_db(self, force=False):
+        with self.flush_lock:
+            with self.lock:
+                if not self.db_dirty_since:
+                    return
+                if not force and time.monotonic() - self.db_dirty_since < DB_FLUSH_INTERVAL:
+                    return
+                entries = {ih: dict(self.torrents_db[ih]) for ih in self.db_dirty if ih in self.torrents_db}
+                resume, metainfo = self.pending_resume, self.pending_metainfo
+                self.db_dirty, self.pending_resume, self.pending_metainfo = set(), {}, {}
+                self.db_dirty_since = 0.0
             try:
-                with open(self.torrents_db_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with metrics.STATE_FLUSH_SECONDS.time():
+                    self.store.write(entries=entries, resume=resume, metainfo=metainfo)
             except Exception as e:
-                print(f"Error loading torrents.json: {e}")
-        return {}
-
-    def _save_torrents_db(self):
-        try:
-            with open(self.torrents_db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.torrents_db, f, indent=2)
-        except Exception as e:
-            print(f"Error saving torrents.json: {e}")
+                print(f"Error saving session state: {e}")
+                with self.lock:
+                    # Keep anything newer that arrived while we were writing.
+                    for ih, data in resume.items():
+                        self.pending_resume.setdefault(ih, data)
+                    for ih, data in metainfo.items():
+                        self.pending_metainfo.setdefault(ih, data)
+                    self.db_dirty.update(entries)
+                    if not self.db_dirty_since:
+                        self.db_dirty_since = time.monotonic()
 
     def _info_hash_key(self, info_hashes):
         if info_hashes is None:
@@ -96,6 +163,54 @@ class SessionManager:
         except Exception:
             return ""
 
+    def _legacy_hash_key(self, handle_or_status):
+        # The 40-char key LocalClient rows use; differs from the canonical key
+        # only for v2-only torrents.
+        try:
+            ih = handle_or_status.info_hash
+            ih = ih() if callable(ih) else ih
+            key = str(ih)
+            if len(key) != 40:
+                key = binascii.hexlify(ih.to_string()).decode('ascii')
+            return key
+        except Exception:
+            return ""
+
+    def _index_handle(self, handle):
+        if handle is None:
+            return
+        try:
+            if not handle.is_valid():
+                return
+        except Exception:
+            return
+        key = self._handle_hash_key(handle)
+        if not key:
+            return
+        legacy = self._legacy_hash_key(handle)
+        with self.lock:
+            self.handles[key] = handle
+            if legacy and legacy != key:
+                self.handle_aliases[legacy] = key
+
+    def _unindex_hash(self, info_hash, handle=None):
+        """Drop ``info_hash`` from the index; with ``handle``, only if that handle is the one indexed."""
+        with self.lock:
+            key = self.handle_aliases.get(info_hash, info_hash)
+            indexed = self.handles.get(key)
+            if handle is not None and indexed is not None:
+                try:
+                    if indexed != handle:
+                        return
+                except Exception:
+                    pass
+            self.handle_aliases.pop(info_hash, None)
+            self.handles.pop(key, None)
+            self.statuses.pop(key, None)
+            self.cold_statuses.pop(key, None)
+            for alias in [a for a, k in self.handle_aliases.items() if k == key]:
+                del self.handle_aliases[alias]
+
     def apply_preferences(self, prefs):
         # Proxy Mapping
         # 0=None, 1=SOCKS4, 2=SOCKS5, 3=HTTP
@@ -151,23 +266,225 @@ class SessionManager:
                 if not self.ses:
                     time.sleep(0.5)
                     continue
-                if self.ses.wait_for_alert(1000):
+                self._flush_torrents_db()
+                self._checkpoint_tick()
+                now = time.monotonic()
+                if now - self.last_status_post >= self.status_interval:
+                    self.last_status_post = now
+                    cold = now - self.last_cold_post >= self.cold_interval
+                    if cold:
+                        self.last_cold_post = now
+                    self._post_torrent_updates(cold)
+                if self.ses.wait_for_alert(int(self.status_interval * 1000)):
                     alerts = self.ses.pop_alerts()
                     for alert in alerts:
-                        if isinstance(alert, lt.save_resume_data_alert):
-                            self._handle_save_resume(alert)
-                        elif isinstance(alert, lt.save_resume_data_failed_alert):
-                            ih = self._info_hash_key(alert.params.info_hashes)
-                            if ih:
-                                self.pending_saves.discard(ih)
-                        elif isinstance(alert, lt.metadata_received_alert):
-                            # ... handle metadata ...
-                            pass
+                        self._dispatch_alert(alert)
             except Exception:
                 # Suppress session-level RTTI/Access violations
                 time.sleep(1)
                 continue
 
+    def _post_torrent_updates(self, cold=True):
+        # Only the fields get_torrents_full needs; the default flags also ask
+        # for piece bitfields and the torrent_info for every changed torrent.
+        # Hot posts skip the name/save_path/distributed copies queries too.
+        try:
+            flags = 0
+            if cold:
+                flags = (lt.status_flags_t.query_name | lt.status_flags_t.query_save_path |
+                         lt.status_flags_t.query_distributed_copies)
+            self.ses.post_torrent_updates(flags)
+        except (AttributeError, TypeError):
+            self.ses.post_torrent_updates()
+
+    def _checkpoint_tick(self, now=None):
+        """Request save_resume_data for torrents whose resume data changed.
+
+        Every CHECKPOINT_INTERVAL the cached statuses are scanned for
+        need_save_resume; the resulting queue is drained at a steady rate so
+        the whole batch completes within the next interval instead of as one
+        burst. Results are buffered and committed by the store flush.
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            if self.last_checkpoint_scan is None or now - self.last_checkpoint_scan >= CHECKPOINT_INTERVAL:
+                self.last_checkpoint_scan = now
+                queued = set(self.checkpoint_queue)
+                for key, st in self.statuses.items():
+                    if not getattr(st, "need_save_resume", False):
+                        continue
+                    self.checkpoint_dirty.setdefault(key, now)
+                    if key not in queued and key not in self.checkpoint_inflight:
+                        self.checkpoint_queue.append(key)
+                # At least one per second so small batches don't linger.
+                self.checkpoint_rate = max(1.0, len(self.checkpoint_queue) / CHECKPOINT_INTERVAL)
+            elapsed = max(0.0, now - self.last_checkpoint_tick) if self.last_checkpoint_tick is not None else 0.0
+            self.last_checkpoint_tick = now
+            if not self.checkpoint_queue:
+                self.checkpoint_budget = 0.0
+                return
+            # Cap the budget so a stalled loop doesn't turn into a burst.
+            self.checkpoint_budget = min(self.checkpoint_budget + elapsed * self.checkpoint_rate,
+                                         self.checkpoint_rate + 1)
+            batch = []
+            while self.checkpoint_queue and self.checkpoint_budget >= 1:
+                key = self.checkpoint_queue.popleft()
+                h = self.handles.get(key)
+                if h is None:
+                    self.checkpoint_dirty.pop(key, None)
+                    continue
+                batch.append((key, h))
+                self.checkpoint_inflight.add(key)
+                self.checkpoint_budget -= 1
+        flags = getattr(lt.resume_data_flags_t, "only_if_modified", 0)
+        for key, h in batch:
+            try:
+                h.save_resume_data(flags)
+            except Exception:
+                with self.lock:
+                    self.checkpoint_inflight.discard(key)
+
+    def get_checkpoint_stats(self):
+        """Checkpoint queue sizes and lag: age of the oldest unsaved resume data (seconds)."""
+        now = time.monotonic()
+        with self.lock:
+            oldest = min(self.checkpoint_dirty.values(), default=None)
+            return {
+                'queued': len(self.checkpoint_queue),
+                'in_flight': len(self.checkpoint_inflight),
+                'dirty': len(self.checkpoint_dirty),
+                'saved': self.checkpoints_saved,
+                'lag_s': now - oldest if oldest is not None else 0.0,
+            }
+
+    def collect_metrics(self):
+        """Restore, checkpoint and session gauges for metrics.REGISTRY."""
+        r = self.get_restore_progress()
+        cp = self.get_checkpoint_stats()
+        with self.lock:
+            handles, dirty = len(self.handles), len(self.db_dirty)
+        return [
+            ("restore_torrents", "gauge", "Startup restore progress by state.",
+             [({"state": k}, r[k]) for k in ("total", "loaded", "failed")]),
+            metrics.gauge_family("restore_first_torrent_seconds", "Time from restore start to the first torrent.", r['first_torrent_s']),
+            metrics.gauge_family("restore_seconds", "Time the startup restore took.", r['restored_s']),
+            ("checkpoint_torrents", "gauge", "Resume-data checkpoint queue by state.",
+             [({"state": k}, cp[k]) for k in ("queued", "in_flight", "dirty")]),
+            ("checkpoints_saved_total", "counter", "Resume-data checkpoints saved.", [({}, cp['saved'])]),
+            metrics.gauge_family("checkpoint_lag_seconds", "Age of the oldest unsaved resume data.", cp['lag_s']),
+            metrics.gauge_family("session_torrents", "Torrents in the libtorrent session.", handles),
+            metrics.gauge_family("state_dirty_entries", "Torrent entries waiting for the next state flush.", dirty),
+        ]
+
+    def _status_hash_key(self, status):
+        if hasattr(status, "info_hashes"):
+            key = self._info_hash_key(status.info_hashes)
+            if key:
+                return key
+        return self._info_hash_key(getattr(status, "info_hash", None))
+
+    def _handle_state_update(self, alert):
+        # state_update_alert only carries torrents whose status changed since
+        # the previous post_torrent_updates() call.
+        with self.lock:
+            for st in alert.status:
+                key = self._status_hash_key(st)
+                if key and key in self.handles:
+                    self.statuses[key] = st
+                    if getattr(st, "save_path", ""):
+                        self.cold_statuses[key] = st
+
+    def get_torrent_statuses(self):
+        """Latest torrent_status per torrent, served from the alert-fed cache.
+
+        Only torrents that never appeared in a state_update_alert yet (just
+        added) are queried synchronously, once.
+        """
+        return [st for st, _ in self.get_torrent_status_pairs()]
+
+    def get_torrent_status_pairs(self):
+        """(latest status, latest status with the cold fields) per torrent.
+
+        Torrents missing either one (just added, or whose metadata/storage
+        changed) are queried synchronously with the full default flags.
+        """
+        with self.lock:
+            missing = [(k, h) for k, h in self.handles.items()
+                       if k not in self.statuses or k not in self.cold_statuses]
+        for key, h in missing:
+            try:
+                if h.is_valid():
+                    st = h.status()
+                    with self.lock:
+                        if key in self.handles:
+                            self.statuses.setdefault(key, st)
+                            self.cold_statuses[key] = st
+            except Exception:
+                continue
+        with self.lock:
+            return [(self.statuses[k], self.cold_statuses.get(k)) for k in self.handles if k in self.statuses]
+
+    def _dispatch_alert(self, alert):
+        metrics.ALERTS.inc((type(alert).__name__,))
+        if isinstance(alert, lt.save_resume_data_alert):
+            metrics.RESUME_SAVES.inc(("ok",))
+            self._handle_save_resume(alert)
+        elif isinstance(alert, lt.save_resume_data_failed_alert):
+            # Also posted when only_if_modified found nothing to save.
+            metrics.RESUME_SAVES.inc(("skipped",) if self._resume_not_modified(alert) else ("failed",))
+            if hasattr(alert, "params"):
+                ih = self._info_hash_key(alert.params.info_hashes)
+            else:
+                ih = self._handle_hash_key(alert.handle)
+            if ih:
+                self.pending_saves.discard(ih)
+                with self.lock:
+                    self.checkpoint_inflight.discard(ih)
+                    self.checkpoint_dirty.pop(ih, None)
+        elif isinstance(alert, lt.add_torrent_alert):
+            error = getattr(alert, "error", None)
+            ok = not error or not getattr(error, "value", lambda: 0)()
+            if ok:
+                self._index_handle(alert.handle)
+            if self.restore_pending:
+                ih = self._handle_hash_key(alert.handle) if ok else ""
+                if not ih:
+                    ih = self._info_hash_key(getattr(getattr(alert, "params", None), "info_hashes", None))
+                self._note_restored(ih, ok)
+        elif isinstance(alert, lt.torrent_removed_alert):
+            ih = ""
+            if hasattr(alert, "info_hashes"):
+                ih = self._info_hash_key(alert.info_hashes)
+            elif hasattr(alert, "info_hash"):
+                ih = self._info_hash_key(alert.info_hash)
+            if ih:
+                # remove_torrent already unindexed it; if the hash was re-added
+                # since, the index holds the new handle and must keep it.
+                self._unindex_hash(ih, getattr(alert, "handle", None))
+        elif isinstance(alert, lt.state_update_alert):
+            self._handle_state_update(alert)
+        elif isinstance(alert, (lt.metadata_received_alert, getattr(lt, "storage_moved_alert", lt.metadata_received_alert))):
+            # Name/save path changed: refresh the cold fields on the next read.
+            ih = self._handle_hash_key(alert.handle)
+            with self.lock:
+                self.cold_statuses.pop(self.handle_aliases.get(ih, ih), None)
+
+    def _resume_not_modified(self, alert):
+        error = getattr(alert, "error", None)
+        try:
+            value = error.value() if error is not None else 0
+        except Exception:
+            return False
+        if not value:
+            return True
+        code = getattr(getattr(lt, "errors", None), "resume_data_not_modified", None)
+        if isinstance(code, int) and value == int(code):
+            return True
+        try:
+            return "not modified" in error.message().lower()
+        except Exception:
+            return False
+
     def _handle_save_resume(self, alert):
         # alert.params is add_torrent_params
         # alert.resume_data is list of bytes (if bencoded) usually?
@@ -181,14 +498,23 @@ class SessionManager:
             if not ih:
                 return
             self.pending_saves.discard(ih)
-            
-            path = os.path.join(self.state_dir, ih + '.resume')
+            with self.lock:
+                if ih in self.checkpoint_inflight:
+                    self.checkpoint_inflight.discard(ih)
+                    self.checkpoints_saved += 1
+                self.checkpoint_dirty.pop(ih, None)
             
             # Serialize add_torrent_params
             # lt.write_resume_data(add_torrent_params) -> bencoded bytes
             data = lt.write_resume_data(alert.params)
-            with open(path, 'wb') as f:
-                f.write(data)
+            if not isinstance(data, (bytes, bytearray)):
+                data = lt.bencode(data)
+            with self.lock:
+                if ih not in self.handles:
+                    return  # removed while the save was in flight
+                self.pending_resume[ih] = bytes(data)
+                if not self.db_dirty_since:
+                    self.db_dirty_since = time.monotonic()
                 
             # Update DB with current save path from params if available
             # This ensures we have the latest path even if user moved it (though move is not fully implemented yet)
@@ -196,7 +522,7 @@ class SessionManager:
                  with self.lock:
                      if ih not in self.torrents_db or self.torrents_db[ih].get('save_path') != alert.params.save_path:
                           self.torrents_db[ih] = {'save_path': alert.params.save_path, 'added': time.time()}
-                          self._save_torrents_db()
+                          self._mark_db_dirty(ih)
 
         except Exception as e:
             print(f"Error writing resume data: {e}")
@@ -216,16 +542,11 @@ class SessionManager:
         if self._find_handle(ih):
             raise ValueError(f"Torrent with hash {ih} already exists.")
 
-        # Save .torrent file for restoration
-        tpath = os.path.join(self.state_dir, ih + '.torrent')
-        with open(tpath, 'wb') as f:
-            f.write(file_content)
-            
         params = {'ti': info, 'save_path': save_path}
         if file_priorities:
             params['file_priorities'] = file_priorities
             
-        self.ses.add_torrent(params)
+        self._index_handle(self.ses.add_torrent(params))
         
         if ih:
             with self.lock:
@@ -233,7 +554,9 @@ class SessionManager:
                 if file_priorities:
                     entry['priorities'] = list(file_priorities)
                 self.torrents_db[ih] = entry
-                self._save_torrents_db()
+                # Keep the .torrent for restoration
+                self.pending_metainfo[ih] = bytes(file_content)
+                self._mark_db_dirty(ih)
 
     def update_priorities(self, info_hash, priorities):
         with self.lock:
@@ -242,7 +565,7 @@ class SessionManager:
                     # Convert vector to list if needed
                     p_list = list(priorities)
                     self.torrents_db[info_hash]['priorities'] = p_list
-                    self._save_torrents_db()
+                    self._mark_db_dirty(info_hash)
                 except Exception as e:
                     print(f"Error updating priorities for {info_hash}: {e}")
 
@@ -258,109 +581,120 @@ class SessionManager:
         # We should also save the magnet URI itself for robust restoration if metadata is not fetched quickly
         # Or let resume data handle it.
         # For now, just adding it directly to session.
-        self.ses.add_torrent(params)
+        self._index_handle(self.ses.add_torrent(params))
 
         if ih:
              with self.lock:
                  self.torrents_db[ih] = {'save_path': save_path, 'added': time.time()}
-                 self._save_torrents_db()
+                 self._mark_db_dirty(ih)
 
     def load_state(self):
+        """Start restoring stored torrents in the background and return the thread.
+
+        Records are decoded on a small worker pool and handed to
+        ses.async_add_torrent() in storage order; handles show up through
+        add_torrent_alert as libtorrent finishes adding them, so the UI can
+        list torrents while the rest are still loading.
+        """
         print("Loading session state...")
-        loaded_hashes = set()
+        records = self.store.load_torrents()
+        run = {'total': len(records), 'loaded': 0, 'failed': 0, 'submitted': False,
+               'started': time.monotonic(), 'first_at': 0.0, 'finished_at': 0.0}
+        with self.lock:
+            self.restore_pending = set()
+            self.restore = run
+        self.restore_thread = threading.Thread(target=self._restore_torrents, args=(records, run),
+                                               daemon=True, name="lt-restore")
+        self.restore_thread.start()
+        return self.restore_thread
+
+    def _decode_record(self, record):
+        ih = record['info_hash']
         default_save_path = os.path.expanduser('~') # Fallback if save_path can't be determined
-        
-        # 1. Scan for .resume files and try to add them
-        if os.path.exists(self.state_dir):
-            for f in os.listdir(self.state_dir):
-                if f.endswith('.resume'):
+        stored_path = record.get('save_path')
+        if record['resume']:
+            try:
+                params = lt.read_resume_data(record['resume'])
+                # Use stored save_path if available to fix corrupted/missing resume path
+                if stored_path:
+                    params.save_path = stored_path
+                elif not params.save_path:
+                    params.save_path = default_save_path
+                return ih, params
+            except Exception as e:
+                print(f"Error loading resume data for {ih}: {e}")
+        # No (usable) resume data yet, e.g. the app crashed right after adding:
+        # fall back to the stored .torrent and tracked path.
+        if record['metainfo']:
+            try:
+                info = lt.torrent_info(record['metainfo'])
+                params = {'ti': info, 'save_path': stored_path or default_save_path}
+                if record.get('priorities'):
+                    params['file_priorities'] = record['priorities']
+                print(f"Loading {ih} from stored .torrent (no resume data) using tracked path.")
+                return ih, params
+            except Exception as e:
+                print(f"Error loading stored torrent {ih}: {e}")
+        return ih, None
+
+    def _restore_torrents(self, records, run):
+        # ``run`` is this restore's counters; a later load_state() replaces
+        # self.restore, and from then on this thread must not touch it.
+        try:
+            with ThreadPoolExecutor(max_workers=RESTORE_WORKERS, thread_name_prefix="restore") as pool:
+                for ih, params in pool.map(self._decode_record, records):
+                    if params is None:
+                        self._note_restored(None, False, run)
+                        continue
+                    with self.lock:
+                        if self.restore is not run:
+                            return
+                        self.restore_pending.add(ih)
                     try:
-                        with open(os.path.join(self.state_dir, f), 'rb') as fp:
-                            data = fp.read()
-                        params = lt.read_resume_data(data)
-                        
-                        ih = self._info_hash_key(params.info_hashes)
-                        
-                        # Use stored save_path if available to fix corrupted/missing resume path
-                        if ih in self.torrents_db:
-                            stored_path = self.torrents_db[ih].get('save_path')
-                            if stored_path: # and os.path.isdir(stored_path):
-                                params.save_path = stored_path
-                        elif not params.save_path:
-                             params.save_path = default_save_path
-
-                        self.ses.add_torrent(params)
-                        if ih:
-                            loaded_hashes.add(ih)
+                        self.ses.async_add_torrent(params)
                     except Exception as e:
-                        print(f"Error loading resume data for {f}: {e}")
-                        # If resume data fails, try to load .torrent directly if it exists.
-                        ih_from_resume = f.replace('.resume', '')
-                        torrent_file_path = os.path.join(self.state_dir, ih_from_resume + '.torrent')
-                        if os.path.exists(torrent_file_path):
-                            try:
-                                with open(torrent_file_path, 'rb') as tfp:
-                                    torrent_content = tfp.read()
-                                    info = lt.torrent_info(torrent_content)
-                                    
-                                    # Fallback to .torrent
-                                    save_path = default_save_path
-                                    priorities = None
-                                    if ih_from_resume in self.torrents_db:
-                                        entry = self.torrents_db[ih_from_resume]
-                                        if entry.get('save_path'):
-                                            save_path = entry.get('save_path')
-                                        if entry.get('priorities'):
-                                            priorities = entry.get('priorities')
-                                    
-                                    params = {'ti': info, 'save_path': save_path}
-                                    if priorities:
-                                        params['file_priorities'] = priorities
-                                    
-                                    self.ses.add_torrent(params)
-                                    ih = ""
-                                    try:
-                                        if hasattr(info, "info_hashes"):
-                                            ih = self._info_hash_key(info.info_hashes())
-                                    except Exception:
-                                        ih = ""
-                                    if not ih:
-                                        ih = self._info_hash_key(info.info_hash())
-                                    if ih:
-                                        loaded_hashes.add(ih)
-                                    print(f"Successfully loaded {ih_from_resume}.torrent after resume data failure using tracked path.")
-                            except Exception as tf_e:
-                                print(f"Failed to load .torrent file {torrent_file_path} as fallback: {tf_e}")
-
-        # 2. Scan for .torrent files that were added but never had resume data saved (e.g., app crashed immediately)
-        if os.path.exists(self.state_dir):
-            for f in os.listdir(self.state_dir):
-                if f.endswith('.torrent'):
-                    ih = f.replace('.torrent', '')
-                    if ih not in loaded_hashes:
-                        try:
-                            with open(os.path.join(self.state_dir, f), 'rb') as tfp:
-                                torrent_content = tfp.read()
-                                info = lt.torrent_info(torrent_content)
-                                
-                                save_path = default_save_path
-                                priorities = None
-                                if ih in self.torrents_db:
-                                    entry = self.torrents_db[ih]
-                                    if entry.get('save_path'):
-                                        save_path = entry.get('save_path')
-                                    if entry.get('priorities'):
-                                        priorities = entry.get('priorities')
-
-                                params = {'ti': info, 'save_path': save_path}
-                                if priorities:
-                                    params['file_priorities'] = priorities
-                                
-                                self.ses.add_torrent(params)
-                                loaded_hashes.add(ih)
-                                print(f"Loaded {ih}.torrent from file (no resume data) using tracked path.")
-                        except Exception as e:
-                            print(f"Error loading torrent file {f}: {e}")
+                        print(f"Error restoring {ih}: {e}")
+                        self._note_restored(ih, False, run)
+        finally:
+            with self.lock:
+                run['submitted'] = True
+                if self.restore is run:
+                    self._check_restore_finished()
+
+    def _note_restored(self, info_hash, ok, run=None):
+        with self.lock:
+            if run is not None and run is not self.restore:
+                return
+            if info_hash is not None:
+                if info_hash not in self.restore_pending:
+                    return
+                self.restore_pending.discard(info_hash)
+            r = self.restore
+            if ok:
+                r['loaded'] += 1
+                if not r['first_at']:
+                    r['first_at'] = time.monotonic()
+            else:
+                r['failed'] += 1
+            self._check_restore_finished()
+
+    def _check_restore_finished(self):
+        r = self.restore
+        if r['submitted'] and not self.restore_pending and not r['finished_at']:
+            r['finished_at'] = time.monotonic()
+            print(f"Restored {r['loaded']} torrents ({r['failed']} failed) in "
+                  f"{r['finished_at'] - r['started']:.2f}s")
+
+    def get_restore_progress(self):
+        """Startup restore counters plus time-to-first-torrent / time-to-restored (seconds)."""
+        with self.lock:
+            r = dict(self.restore)
+        started = r.pop('started')
+        first_at, finished_at = r.pop('first_at'), r.pop('finished_at')
+        r['done'] = bool(finished_at)
+        r['first_torrent_s'] = first_at - started if first_at else None
+        r['restored_s'] = finished_at - started if finished_at else None
+        return r
 
     def save_state(self):
         print("Saving session state...")
@@ -378,6 +712,7 @@ class SessionManager:
                 count += 1
         
         if count == 0:
+            self._flush_torrents_db(force=True)
             return
 
         # Actively poll for save_resume_data alerts instead of relying on background thread
@@ -388,12 +723,7 @@ class SessionManager:
                 if self.ses.wait_for_alert(500):  # 500ms timeout
                     alerts = self.ses.pop_alerts()
                     for alert in alerts:
-                        if isinstance(alert, lt.save_resume_data_alert):
-                            self._handle_save_resume(alert)
-                        elif isinstance(alert, lt.save_resume_data_failed_alert):
-                            ih = self._info_hash_key(alert.params.info_hashes)
-                            if ih:
-                                self.pending_saves.discard(ih)
+                        self._dispatch_alert(alert)
             except Exception as e:
                 print(f"Error processing alerts during save: {e}")
                 time.sleep(0.1)
@@ -403,15 +733,24 @@ class SessionManager:
         else:
             print("All resume data saved successfully.")
         
-        with self.lock:
-            self._save_torrents_db()
+        self._flush_torrents_db(force=True)
 
     def _find_handle(self, info_hash_str):
-        for h in self.ses.get_torrents():
-             if self._handle_hash_key(h) == info_hash_str:
-                 return h
+        with self.lock:
+            h = self.handles.get(self.handle_aliases.get(info_hash_str, info_hash_str))
+        if h is None:
+            return None
+        try:
+            if h.is_valid():
+                return h
+        except Exception:
+            pass
+        self._unindex_hash(info_hash_str)
         return None
 
+    def get_handle(self, info_hash):
+        return self._find_handle(info_hash)
+
     def remove_torrent(self, info_hash, delete_files=False):
         h = self._find_handle(info_hash)
         if h:
@@ -428,25 +767,20 @@ class SessionManager:
                 except Exception:
                     flags = 1
             self.ses.remove_torrent(h, flags)
+            self._unindex_hash(info_hash)
             
-            # Clean up state files to prevent resurrection
+            # Drop stored state right away to prevent resurrection. flush_lock
+            # waits out an in-flight flush so its upsert can't land after this delete.
             try:
-                t_path = os.path.join(self.state_dir, info_hash + '.torrent')
-                if os.path.exists(t_path):
-                    os.remove(t_path)
-                    
-                r_path = os.path.join(self.state_dir, info_hash + '.resume')
-                if os.path.exists(r_path):
-                    os.remove(r_path)
-                
-                # Remove from DB
-                with self.lock:
-                    if info_hash in self.torrents_db:
-                        del self.torrents_db[info_hash]
-                        self._save_torrents_db()
-                    
+                with self.flush_lock:
+                    with self.lock:
+                        self.torrents_db.pop(info_hash, None)
+                        self.db_dirty.discard(info_hash)
+                        self.pending_resume.pop(info_hash, None)
+                        self.pending_metainfo.pop(info_hash, None)
+                    self.store.write(removed=[info_hash])
             except Exception as e:
-                print(f"Error cleaning up state files for {info_hash}: {e}")
+                print(f"Error cleaning up state for {info_hash}: {e}")
 
     def get_torrents(self):
         return self.ses.get_torrents()
@@ -0,0 +1,181 @@
+"""SQLite-backed persistence for the local libtorrent session.
+
+One ``state.sqlite3`` file (WAL mode) in the state dir holds, per torrent:
+- the bencoded resume data and .torrent metainfo blobs,
+- the tracked save path, file priorities and when it was added.
+
+It replaces the older layout of ``<hash>.resume`` / ``<hash>.torrent`` files
+plus ``torrents.json``; ``migrate_legacy`` imports that layout once and moves
+the old files into a ``legacy`` backup folder.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+STATE_DB_NAME = "state.sqlite3"
+LEGACY_DB_NAME = "torrents.json"
+LEGACY_BACKUP_DIR = "legacy"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS torrents (
+    info_hash TEXT PRIMARY KEY,
+    save_path TEXT,
+    priorities TEXT,
+    added REAL,
+    resume BLOB,
+    metainfo BLOB
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _entry_from_row(save_path: Optional[str], priorities: Optional[str], added: Optional[float]) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {}
+    if save_path:
+        entry["save_path"] = save_path
+    if added is not None:
+        entry["added"] = added
+    if priorities:
+        try:
+            entry["priorities"] = json.loads(priorities)
+        except ValueError:
+            pass
+    return entry
+
+
+class StateStore:
+    def __init__(self, state_dir: str) -> None:
+        self.path = os.path.join(state_dir, STATE_DB_NAME)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self.lock:
+            try:
+                self.conn.close()
+            except sqlite3.Error:
+                pass
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def load_entries(self) -> Dict[str, Dict[str, Any]]:
+        """Return ``info_hash -> {save_path, priorities, added}`` for every torrent."""
+        with self.lock:
+            rows = self.conn.execute("SELECT info_hash, save_path, priorities, added FROM torrents").fetchall()
+        return {ih: _entry_from_row(sp, pr, ad) for ih, sp, pr, ad in rows}
+
+    def load_torrents(self) -> List[Dict[str, Any]]:
+        """Return every stored torrent with its blobs, oldest first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT info_hash, save_path, priorities, added, resume, metainfo FROM torrents "
+                "ORDER BY added IS NULL, added, info_hash"
+            ).fetchall()
+        result = []
+        for ih, sp, pr, ad, resume, metainfo in rows:
+            record = _entry_from_row(sp, pr, ad)
+            record["info_hash"] = ih
+            record["resume"] = bytes(resume) if resume is not None else None
+            record["metainfo"] = bytes(metainfo) if metainfo is not None else None
+            result.append(record)
+        return result
+
+    def write(self, entries: Optional[Dict[str, Dict[str, Any]]] = None,
+              resume: Optional[Dict[str, bytes]] = None,
+              metainfo: Optional[Dict[str, bytes]] = None,
+              removed: Iterable[str] = ()) -> None:
+        """Apply a batch of changes in a single transaction."""
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                for ih in removed:
+                    cur.execute("DELETE FROM torrents WHERE info_hash = ?", (ih,))
+                for ih, entry in (entries or {}).items():
+                    priorities = entry.get("priorities")
+                    cur.execute(
+                        "INSERT INTO torrents (info_hash, save_path, priorities, added) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(info_hash) DO UPDATE SET save_path = excluded.save_path, "
+                        "priorities = excluded.priorities, added = excluded.added",
+                        (ih, entry.get("save_path"), json.dumps(list(priorities)) if priorities else None,
+                         entry.get("added")),
+                    )
+                for column, blobs in (("resume", resume), ("metainfo", metainfo)):
+                    for ih, data in (blobs or {}).items():
+                        cur.execute(
+                            f"INSERT INTO torrents (info_hash, {column}) VALUES (?, ?) "
+                            f"ON CONFLICT(info_hash) DO UPDATE SET {column} = excluded.{column}",
+                            (ih, sqlite3.Binary(data)),
+                        )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def migrate_legacy(self, state_dir: str) -> int:
+        """Import ``<hash>.resume``/``<hash>.torrent`` files and torrents.json once.
+
+        Returns the number of torrents imported. The imported files are moved
+        into ``<state_dir>/legacy`` so they are not scanned again.
+        """
+        with self.lock:
+            if self._get_meta("legacy_migrated"):
+                return 0
+        try:
+            names = os.listdir(state_dir)
+        except OSError:
+            names = []
+
+        entries: Dict[str, Dict[str, Any]] = {}
+        resume: Dict[str, bytes] = {}
+        metainfo: Dict[str, bytes] = {}
+        migrated: List[str] = []
+        for name in names:
+            path = os.path.join(state_dir, name)
+            try:
+                if name == LEGACY_DB_NAME:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if isinstance(data, dict):
+                        entries.update({k: v for k, v in data.items() if isinstance(v, dict)})
+                elif name.endswith(".resume"):
+                    with open(path, "rb") as f:
+                        resume[name[:-len(".resume")]] = f.read()
+                elif name.endswith(".torrent"):
+                    with open(path, "rb") as f:
+                        metainfo[name[:-len(".torrent")]] = f.read()
+                else:
+                    continue
+            except (OSError, ValueError) as e:
+                print(f"Skipping legacy state file {name}: {e}")
+                continue
+            migrated.append(name)
+
+        for ih in set(resume) | set(metainfo):
+            entries.setdefault(ih, {})
+        self.write(entries=entries, resume=resume, metainfo=metainfo)
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_migrated', '1')")
+
+        if migrated:
+            backup_dir = os.path.join(state_dir, LEGACY_BACKUP_DIR)
+            try:
+                os.makedirs(backup_dir, exist_ok=True)
+                for name in migrated:
+                    os.replace(os.path.join(state_dir, name), os.path.join(backup_dir, name))
+            except OSError as e:
+                print(f"Could not move legacy state files: {e}")
+        return len(entries)
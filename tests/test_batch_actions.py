@@ -0,0 +1,100 @@
+import xmlrpc.client
+from unittest import mock
+
+import clients
+
+
+class FakeQbittorrentApiClient:
+    def __init__(self, host=None, username=None, password=None):
+        self.calls = []
+
+    def auth_log_in(self):
+        return None
+
+    def torrents_resume(self, torrent_hashes=None):
+        self.calls.append(("resume", torrent_hashes))
+
+    def torrents_pause(self, torrent_hashes=None):
+        self.calls.append(("pause", torrent_hashes))
+
+
+class FakeTransmissionApiClient:
+    def __init__(self, host=None, port=None, username=None, password=None, protocol=None):
+        self.calls = []
+
+    def start_torrent(self, ids):
+        self.calls.append(("start", ids))
+
+    def verify_torrent(self, ids):
+        self.calls.append(("verify", ids))
+
+
+class FakeSystem:
+    def __init__(self, fail=()):
+        self.requests = []
+        self.fail = set(fail)
+
+    def multicall(self, calls):
+        self.requests.append(calls)
+        out = []
+        for c in calls:
+            if c["params"][0] in self.fail and c["methodName"] == "d.start":
+                out.append({"faultCode": -501, "faultString": "Could not find info-hash."})
+            else:
+                out.append([0])
+        return out
+
+
+class FakeRTorrentProxy:
+    def __init__(self, fail=()):
+        self.system = FakeSystem(fail)
+
+
+def _hashes(n):
+    return [f"{i:040x}" for i in range(n)]
+
+
+def test_qbittorrent_start_all_is_chunked_bulk_call():
+    with mock.patch.object(clients.qbittorrentapi, "Client", FakeQbittorrentApiClient):
+        client = clients.QBittorrentClient("localhost", "user", "pass")
+        hashes = _hashes(2500)
+        assert client.start_torrents(hashes) == []
+        assert client.stop_torrents(hashes[:2]) == []
+
+    calls = client.c.calls
+    assert [len(h) for _, h in calls[:3]] == [1000, 1000, 500]
+    assert sum((h for _, h in calls[:3]), []) == hashes
+    assert calls[3] == ("pause", hashes[:2])
+
+
+def test_transmission_batch_uses_id_lists():
+    with mock.patch.object(clients, "TransClient", FakeTransmissionApiClient):
+        client = clients.TransmissionClient("http://localhost:9091", "user", "pass")
+        client.start_torrents(_hashes(3))
+        client.recheck_torrents([b"\x01" * 20])
+
+    assert client.c.calls == [("start", _hashes(3)), ("verify", ["01" * 20])]
+
+
+def test_rtorrent_batch_uses_system_multicall_and_reports_faults():
+    client = clients.RTorrentClient("http://localhost/RPC2")
+    hashes = _hashes(600)
+    client.srv = FakeRTorrentProxy(fail={hashes[5]})
+
+    failed = client.start_torrents(hashes)
+
+    # d.open + d.start for every hash, 1000 calls per request.
+    assert [len(r) for r in client.srv.system.requests] == [1000, 200]
+    assert client.srv.system.requests[0][:2] == [
+        {"methodName": "d.open", "params": [hashes[0]]},
+        {"methodName": "d.start", "params": [hashes[0]]},
+    ]
+    assert [h for h, _ in failed] == [hashes[5]]
+    assert isinstance(failed[0][1], xmlrpc.client.Fault)
+
+
+def test_base_client_batch_falls_back_to_single_calls():
+    client = clients.LocalClient.__new__(clients.LocalClient)
+    with mock.patch.object(clients.LocalClient, "start_torrent", side_effect=[None, RuntimeError("boom")]):
+        failed = client.start_torrents(["a" * 40, "b" * 40])
+    assert [(h, str(e)) for h, e in failed] == [("b" * 40, "boom")]
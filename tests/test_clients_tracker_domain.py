@@ -36,40 +36,38 @@ class FakeQbittorrentApiClient:
         ]
 
 
-class FakeTransTracker:
-    def __init__(self, announce):
-        self.announce = announce
-
-
 class FakeTransTorrent:
-    def __init__(self, trackers):
-        self.status = "downloading"
-        self.hashString = "b" * 40
-        self.name = "Test"
-        self.total_size = 100
-        self.downloaded_ever = 50
-        self.uploaded_ever = 0
-        self.ratio = 0.0
-        self.error_string = ""
-        self.rate_download = 0
-        self.rate_upload = 0
-        self.trackers = trackers
-        self.eta = -1
-        self.peersSendingToUs = 0
-        self.seeders = 0
-        self.peersGettingFromUs = 0
-        self.leechers = 0
-        self.download_dir = "C:\\Downloads"
+    """transmission_rpc.Torrent stand-in: raw RPC fields in ``fields``."""
+
+    def __init__(self, torrent_id, tracker_stats):
+        self.fields = {
+            "id": torrent_id,
+            "status": 4,
+            "hashString": "b" * 40,
+            "name": "Test",
+            "totalSize": 100,
+            "downloadedEver": 50,
+            "uploadedEver": 0,
+            "uploadRatio": 0.0,
+            "errorString": "",
+            "rateDownload": 0,
+            "rateUpload": 0,
+            "trackerStats": tracker_stats,
+            "eta": -1,
+            "peersSendingToUs": 0,
+            "peersGettingFromUs": 0,
+            "downloadDir": "C:\\Downloads",
+        }
 
 
 class FakeTransClient:
     def __init__(self, host=None, port=None, username=None, password=None, protocol=None):
         pass
 
-    def get_torrents(self):
+    def get_torrents(self, ids=None, arguments=None):
         return [
-            FakeTransTorrent([]),
-            FakeTransTorrent([FakeTransTracker("http://tracker.example/announce")]),
+            FakeTransTorrent(1, []),
+            FakeTransTorrent(2, [{"announce": "http://tracker.example/announce", "seederCount": 3, "leecherCount": 1}]),
         ]
 
 
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+
+import web_server
+from maindata_sync import MainDataSync
+
+
+def _row(h, **kw):
+    row = {"hash": h, "name": h.upper(), "size": 100, "done": 0, "state": 1, "down_rate": 0}
+    row.update(kw)
+    return row
+
+
+def test_first_poll_is_full_update():
+    sync = MainDataSync()
+    res = sync.update("s1", 0, [_row("a"), _row("b")], {"dl_info_speed": 1})
+    assert res["full_update"] is True
+    assert set(res["torrents"]) == {"a", "b"}
+    assert res["server_state"] == {"dl_info_speed": 1}
+    assert res["rid"] == 1
+
+
+def test_delta_contains_only_changed_fields_and_removals():
+    sync = MainDataSync()
+    first = sync.update("s1", 0, [_row("a"), _row("b")], {"dl_info_speed": 1, "up_info_speed": 2})
+    second = sync.update("s1", first["rid"], [_row("a", done=50, down_rate=10), _row("c")],
+                         {"dl_info_speed": 1, "up_info_speed": 3})
+    assert "full_update" not in second
+    assert second["torrents"]["a"] == {"done": 50, "down_rate": 10}
+    assert second["torrents"]["c"]["name"] == "C"
+    assert second["torrents_removed"] == ["b"]
+    assert second["server_state"] == {"up_info_speed": 3}
+
+
+def test_unchanged_poll_is_empty_delta():
+    sync = MainDataSync()
+    rows = [_row("a")]
+    first = sync.update("s1", 0, rows, {})
+    second = sync.update("s1", first["rid"], [_row("a")], {})
+    assert second == {"rid": first["rid"] + 1}
+
+
+def test_unknown_rid_and_other_sessions_get_full_update():
+    sync = MainDataSync(history=1)
+    first = sync.update("s1", 0, [_row("a")])
+    sync.update("s1", first["rid"], [_row("a")])
+    # first rid has been evicted from the history
+    assert sync.update("s1", first["rid"], [_row("a")])["full_update"] is True
+    assert sync.update("s2", first["rid"], [_row("a")])["full_update"] is True
+
+
+def test_session_limit_evicts_oldest():
+    sync = MainDataSync(max_sessions=2)
+    for sid in ("s1", "s2", "s3"):
+        sync.update(sid, 0, [])
+    assert sync.session_ids() == ["s2", "s3"]
+
+
+def test_views_are_capped_per_session():
+    sync = MainDataSync(max_sessions=2, max_views=2)
+    other = sync.update("s1", 0, [_row("a")])
+    base = sync.update("s2", 0, [_row("a")], view="search=a")
+    # Typing a search creates a view per keystroke; only s2's own views are evicted.
+    for text in ("ab", "abc", "abcd"):
+        sync.update("s2", 0, [_row("a")], view=f"search={text}")
+    assert sync.session_ids() == ["s1", "s2"]
+    assert "full_update" not in sync.update("s1", other["rid"], [_row("a")])
+    assert sync.update("s2", base["rid"], [_row("a")], view="search=a")["full_update"] is True
+    # A rid from another view of the same session is not a valid base.
+    latest = sync.update("s2", 0, [_row("a")], view="search=abcd")
+    assert sync.update("s2", latest["rid"], [_row("a")], view="search=abc")["full_update"] is True
+
+
+class FakeClient:
+    def __init__(self):
+        self.rows = [_row("a"), _row("b")]
+
+    def get_torrents_full(self):
+        return [dict(r) for r in self.rows]
+
+    def get_global_stats(self):
+        return 5, 6
+
+
+@pytest.fixture
+def app_client():
+    original = web_server.WEB_CONFIG["client"]
+    web_server.MAINDATA_SYNC.reset()
+    client = web_server.app.test_client()
+    with client.session_transaction() as session:
+        session["logged_in"] = True
+    yield client
+    web_server.WEB_CONFIG["client"] = original
+
+
+def test_sync_maindata_endpoint_returns_deltas(app_client):
+    fake = FakeClient()
+    web_server.WEB_CONFIG["client"] = fake
+
+    full = json.loads(app_client.get("/api/v2/sync/maindata?rid=0").data)
+    assert full["full_update"] is True
+    assert set(full["torrents"]) == {"a", "b"}
+    assert full["server_state"] == {"dl_info_speed": 5, "up_info_speed": 6}
+
+    fake.rows = [_row("a", done=70)]
+    web_server.get_snapshot_service().invalidate()
+    delta = json.loads(app_client.get(f"/api/v2/sync/maindata?rid={full['rid']}").data)
+    assert delta["torrents"] == {"a": {"done": 70}}
+    assert delta["torrents_removed"] == ["b"]
+    assert "server_state" not in delta
+
+
+def test_sync_maindata_filter_has_its_own_rid_history(app_client):
+    fake = FakeClient()
+    fake.rows = [_row("a"), _row("b", done=100)]
+    web_server.WEB_CONFIG["client"] = fake
+    web_server.get_snapshot_service().invalidate()
+
+    full = json.loads(app_client.get("/api/v2/sync/maindata?rid=0&filter=seeding").data)
+    assert set(full["torrents"]) == {"b"}
+
+    # Same rid under a different filter is unknown there: full update, not a bogus delta.
+    other = json.loads(app_client.get(f"/api/v2/sync/maindata?rid={full['rid']}&search=A").data)
+    assert other["full_update"] is True
+    assert set(other["torrents"]) == {"a"}
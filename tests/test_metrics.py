@@ -0,0 +1,81 @@
+import base64
+
+import pytest
+
+import clients
+import metrics
+import web_server
+
+
+def test_exposition_format():
+    reg = metrics.Registry()
+    c = reg.counter("things_total", "Things.", ("kind",))
+    c.inc(("a",))
+    c.inc(("a",), 2)
+    c.inc(('say "hi"',))
+    h = reg.histogram("op_seconds", "Ops.", buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5):
+        h.observe(v)
+    reg.register_collector(lambda: [metrics.gauge_family("depth", "Depth.", 3)])
+    reg.register_collector(lambda: 1 / 0)
+
+    text = reg.expose()
+    assert "# TYPE serrebitorrent_things_total counter" in text
+    assert 'serrebitorrent_things_total{kind="a"} 3' in text
+    assert 'serrebitorrent_things_total{kind="say \\"hi\\""} 1' in text
+    assert 'serrebitorrent_op_seconds_bucket{le="0.1"} 1' in text
+    assert 'serrebitorrent_op_seconds_bucket{le="1"} 2' in text
+    assert 'serrebitorrent_op_seconds_bucket{le="+Inf"} 3' in text
+    assert "serrebitorrent_op_seconds_count 3" in text
+    assert "serrebitorrent_depth 3" in text
+
+    with pytest.raises(ValueError):
+        c.inc(())
+    with pytest.raises(ValueError):
+        reg.histogram("things_total", "Clash.")
+
+
+def test_client_methods_are_timed_per_backend():
+    class FlakyClient(clients.RTorrentClient):
+        def get_global_stats(self):
+            raise ConnectionError("down")
+
+    client = FlakyClient("http://localhost/RPC2")
+    with pytest.raises(ConnectionError):
+        client.get_global_stats()
+    assert metrics.CLIENT_RPC_ERRORS.get(("flaky", "get_global_stats")) == 1
+    assert metrics.CLIENT_RPC_SECONDS.count(("flaky", "get_global_stats")) == 1
+    # Helpers that aren't backend calls stay unwrapped.
+    assert not hasattr(clients.RTorrentClient.set_cold_refresh_interval, "__wrapped__")
+    assert hasattr(clients.RTorrentClient.get_torrents_full, "__wrapped__")
+
+
+def test_nested_client_calls_are_timed_once():
+    class NestedClient(clients.RTorrentClient):
+        def start_torrent(self, h):
+            pass
+
+        def start_torrents(self, hs):
+            for h in hs:
+                self.start_torrent(h)
+            return []
+
+    client = NestedClient("http://localhost/RPC2")
+    client.start_torrents(["a", "b", "c"])
+    assert metrics.CLIENT_RPC_SECONDS.count(("nested", "start_torrents")) == 1
+    assert metrics.CLIENT_RPC_SECONDS.count(("nested", "start_torrent")) == 0
+    client.start_torrent("a")
+    assert metrics.CLIENT_RPC_SECONDS.count(("nested", "start_torrent")) == 1
+
+
+def test_metrics_endpoint_requires_credentials():
+    client = web_server.app.test_client()
+    assert client.get("/metrics").status_code == 401
+
+    token = base64.b64encode(b"admin:password").decode()
+    rv = client.get("/metrics", headers={"Authorization": f"Basic {token}"})
+    assert rv.status_code == 200
+    assert rv.content_type.startswith("text/plain; version=0.0.4")
+    text = rv.get_data(as_text=True)
+    assert 'serrebitorrent_web_requests_total{endpoint="metrics_endpoint",status="401"}' in text
+    assert "serrebitorrent_snapshot_version" in text
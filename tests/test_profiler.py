@@ -0,0 +1,89 @@
+import base64
+import threading
+
+import pytest
+
+import profiler
+import web_server
+
+AUTH = {"Authorization": "Basic " + base64.b64encode(b"admin:password").decode()}
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(200))
+
+
+def test_sample_collapses_stacks_per_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="busy-worker", daemon=True)
+    worker.start()
+    try:
+        profile = profiler.sample(0.2, 0.002)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert profile.samples > 10
+    lines = profile.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("busy-worker;")]
+    assert busy and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("_spin (test_profiler.py:" in line for line in busy)
+    # The sampling thread itself is left out.
+    assert not any("sample (profiler.py:" in line for line in lines)
+
+
+def test_sample_rejects_non_finite_arguments():
+    for seconds, interval in ((float("nan"), 0.01), (1, float("nan")), (1, float("inf")), (0, 0.01)):
+        with pytest.raises(ValueError):
+            profiler.sample(seconds, interval)
+
+
+def test_only_one_profile_at_a_time():
+    t = threading.Thread(target=profiler.sample, args=(0.3,))
+    t.start()
+    try:
+        while not profiler.is_profiling():
+            pass
+        with pytest.raises(profiler.ProfilerBusy):
+            profiler.sample(0.01)
+    finally:
+        t.join()
+
+
+def test_memory_snapshot_reports_growth():
+    try:
+        first = profiler.MEMORY.snapshot()
+        assert first["since"] is None and first["diff"] == []
+        hoard = [bytearray(1000) for _ in range(2000)]
+        report = profiler.MEMORY.snapshot(top=5)
+        assert report["since"] == first["time"]
+        grew = report["diff"][0]
+        assert "test_profiler.py" in grew["location"] and grew["size_diff"] >= 2_000_000
+        assert "Growth over the last" in profiler.format_memory_report(report)
+        with pytest.raises(ValueError):
+            profiler.MEMORY.snapshot(key_type="module")
+        del hoard
+    finally:
+        profiler.MEMORY.stop()
+    assert not profiler.MEMORY.tracing
+
+
+def test_debug_endpoints_require_credentials():
+    client = web_server.app.test_client()
+    assert client.get("/api/v2/debug/profile?seconds=0.05").status_code == 401
+    assert client.get("/api/v2/debug/memory").status_code == 401
+
+    rv = client.get("/api/v2/debug/profile?seconds=0.05&interval=2", headers=AUTH)
+    assert rv.status_code == 200
+    assert rv.headers["Content-Disposition"].startswith("attachment;")
+    assert int(rv.headers["X-Profile-Samples"]) > 0
+    for query in ("seconds=600", "seconds=nan", "interval=nan", "interval=inf", "interval=-1", "interval=x"):
+        assert client.get(f"/api/v2/debug/profile?{query}", headers=AUTH).status_code == 400
+
+    try:
+        assert client.get("/api/v2/debug/memory", headers=AUTH).get_json()["tracing"] is True
+        rv = client.get("/api/v2/debug/memory?format=text", headers=AUTH)
+        assert rv.get_data(as_text=True).startswith("Traced:")
+    finally:
+        assert client.delete("/api/v2/debug/memory", headers=AUTH).get_json() == {"tracing": False}
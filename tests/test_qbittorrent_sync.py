@@ -0,0 +1,85 @@
+import clients
+
+
+def _torrent(**fields):
+    base = {"name": "T", "total_size": 100, "completed": 0, "uploaded": 0, "ratio": 0.0, "state": "downloading",
+            "dlspeed": 0, "upspeed": 0, "tracker": "", "eta": -1, "save_path": "/data"}
+    base.update(fields)
+    return base
+
+
+class FakeSyncApiClient:
+    """Replays scripted sync/maindata responses and records the rids requested."""
+
+    responses = []
+
+    def __init__(self, host=None, username=None, password=None):
+        self.rids = []
+        self.responses = list(type(self).responses)
+        self.transfer_calls = 0
+
+    def auth_log_in(self):
+        return None
+
+    def sync_maindata(self, rid=0):
+        self.rids.append(rid)
+        return self.responses.pop(0)
+
+    def transfer_info(self):
+        self.transfer_calls += 1
+
+        class Info:
+            dl_info_speed, up_info_speed = 1, 2
+        return Info()
+
+
+def make_client(monkeypatch, responses):
+    monkeypatch.setattr(FakeSyncApiClient, "responses", responses)
+    monkeypatch.setattr(clients.qbittorrentapi, "Client", FakeSyncApiClient)
+    return clients.QBittorrentClient("localhost", "user", "pass")
+
+
+def test_mirror_applies_deltas_and_reuses_unchanged_rows(monkeypatch):
+    a, b = "a" * 40, "b" * 40
+    client = make_client(monkeypatch, [
+        {"rid": 1, "full_update": True, "torrents": {a: _torrent(name="A"), b: _torrent(name="B")},
+         "server_state": {"dl_info_speed": 10, "up_info_speed": 20}},
+        {"rid": 2, "torrents": {a: {"dlspeed": 500, "state": "pausedDL"}}},
+        {"rid": 3, "torrents_removed": [b]},
+    ])
+
+    first = {r["hash"]: r for r in client.get_torrents_full()}
+    assert first[a]["name"] == "A" and first[a]["state"] == 1
+    assert client.get_global_stats() == (10, 20)
+    assert client.c.transfer_calls == 0
+
+    second = {r["hash"]: r for r in client.get_torrents_full()}
+    assert second[a]["down_rate"] == 500 and second[a]["state"] == 0 and second[a]["name"] == "A"
+    assert second[b] is first[b]
+
+    third = client.get_torrents_full()
+    assert [r["hash"] for r in third] == [a]
+    assert client.c.rids == [0, 1, 2]
+
+
+def test_periodic_full_resync(monkeypatch):
+    a = "a" * 40
+    client = make_client(monkeypatch, [
+        {"rid": 1, "full_update": True, "torrents": {a: _torrent()}},
+        {"rid": 7, "full_update": True, "torrents": {}},
+    ])
+    client.get_torrents_full()
+    client.last_full -= clients.QBIT_FULL_RESYNC_INTERVAL + 1
+    assert client.get_torrents_full() == []
+    assert client.c.rids == [0, 0]
+    assert client.rid == 7
+
+
+def test_sync_error_falls_back_to_torrents_info_and_resyncs(monkeypatch):
+    client = make_client(monkeypatch, [{"rid": 1, "full_update": True, "torrents": {}}])
+    client.rid = 5
+    client.c.responses = []  # pop from empty list -> IndexError
+    client.c.torrents_info = lambda: [dict(_torrent(name="X"), hash="c" * 40)]
+    rows = client.get_torrents_full()
+    assert rows[0]["name"] == "X"
+    assert client.rid == 0
@@ -0,0 +1,155 @@
+import xmlrpc.client
+
+import pytest
+
+import clients
+
+
+class RecordingSystem:
+    """Fake system.multicall endpoint; methods in ``unknown`` fault."""
+
+    def __init__(self, values=None, unknown=()):
+        self.requests = []
+        self.values = values or {}
+        self.unknown = set(unknown)
+
+    def multicall(self, calls):
+        self.requests.append(calls)
+        out = []
+        for c in calls:
+            if c["methodName"] in self.unknown:
+                out.append({"faultCode": -506, "faultString": f"Method '{c['methodName']}' not defined"})
+            else:
+                out.append([self.values.get(c["methodName"], 0)])
+        return out
+
+
+class FakeProxy:
+    def __init__(self, system):
+        self.system = system
+
+
+def make_client(**kwargs):
+    client = clients.RTorrentClient("http://localhost/RPC2")
+    client.srv = FakeProxy(RecordingSystem(**kwargs))
+    return client
+
+
+def test_get_app_preferences_is_one_request_and_skips_unknown_methods():
+    client = make_client(values={"directory.default": "/data", "throttle.global_down.max_rate": 1024},
+                         unknown={"trackers.use_udp"})
+
+    prefs = client.get_app_preferences()
+
+    assert len(client.srv.system.requests) == 1
+    assert len(client.srv.system.requests[0]) == 13
+    assert prefs["directory_default"] == "/data"
+    assert prefs["dl_limit"] == 1024
+    assert "use_udp_trackers" not in prefs
+
+
+def test_set_app_preferences_applies_all_and_raises_first_fault():
+    client = make_client(unknown={"dht.mode.set"})
+
+    with pytest.raises(xmlrpc.client.Fault):
+        client.set_app_preferences({"dl_limit": 10, "dht_mode": "on", "pex_enabled": True, "bogus": 1})
+
+    [request] = client.srv.system.requests
+    assert request == [
+        {"methodName": "throttle.global_down.max_rate.set", "params": [10]},
+        {"methodName": "dht.mode.set", "params": ["on"]},
+        {"methodName": "protocol.pex.set", "params": [1]},
+    ]
+
+
+def test_single_hash_actions_cost_one_request():
+    client = make_client()
+    client.start_torrent("a" * 40)
+    client.stop_torrent("a" * 40)
+    assert [[c["methodName"] for c in r] for r in client.srv.system.requests] == [
+        ["d.open", "d.start"], ["d.stop", "d.close"]]
+    assert client.get_global_stats() == (0, 0)
+    assert len(client.srv.system.requests) == 3
+
+
+class FakeDownloads:
+    def __init__(self, hashes):
+        self.hashes = hashes
+        self.requests = []
+
+    def multicall2(self, target, view, *fields):
+        self.requests.append(fields)
+        values = {"d.name=": "Name", "d.size_bytes=": 100, "d.directory=": "/data", "d.down.rate=": 5,
+                  clients.RT_TRACKER_FIELD: [["dht://x", 1], ["udp://off.example/a", 0], ["https://tr.example/a", 1]]}
+        return [[h if f == "d.hash=" else values.get(f, 0) for f in fields] for h in self.hashes]
+
+
+def test_cold_fields_are_fetched_on_their_own_interval():
+    client = clients.RTorrentClient("http://localhost/RPC2")
+    client.srv = FakeProxy(None)
+    client.srv.d = FakeDownloads(["a" * 40])
+
+    first = client.get_torrents_full()
+    assert client.srv.d.requests == [clients.RT_HOT_FIELDS, clients.RT_COLD_FIELDS + (clients.RT_TRACKER_FIELD,)]
+    assert first[0]["tracker_domain"] == "tr.example"
+    assert first[0]["name"] == "Name" and first[0]["save_path"] == "/data" and first[0]["down_rate"] == 5
+
+    client.get_torrents_full()
+    assert client.srv.d.requests[2:] == [clients.RT_HOT_FIELDS]
+
+    # A new torrent pulls the cold tier in early.
+    client.srv.d.hashes.append("b" * 40)
+    rows = client.get_torrents_full()
+    assert client.srv.d.requests[3:] == [clients.RT_HOT_FIELDS, clients.RT_COLD_FIELDS + (clients.RT_TRACKER_FIELD,)]
+    assert [r["size"] for r in rows] == [100, 100]
+    assert [r["tracker_domain"] for r in rows] == ["tr.example"] * 2
+
+
+class NoNestingDownloads(FakeDownloads):
+    def multicall2(self, target, view, *fields):
+        if clients.RT_TRACKER_FIELD in fields:
+            raise xmlrpc.client.Fault(-506, "Method 't.multicall' not allowed here")
+        return super().multicall2(target, view, *fields)
+
+
+def test_tracker_domains_fall_back_to_cached_batched_lookups():
+    client = make_client(values={"t.multicall": [["http://a.example/ann", 1]]})
+    client.srv.d = NoNestingDownloads(["a" * 40])
+
+    assert client.get_torrents_full()[0]["tracker_domain"] == "a.example"
+    assert not client.nested_trackers
+    assert [c["methodName"] for c in client.srv.system.requests[0]] == ["t.multicall"]
+
+    # Known hashes are cached; only the new torrent is looked up on the next cold pass.
+    client.srv.d.hashes.append("b" * 40)
+    before = client.tc
+    client.get_torrents_full()
+    assert client.srv.system.requests[1] == [{"methodName": "t.multicall", "params": ["b" * 40, "", "t.url=", "t.is_enabled="]}]
+    # The map readers may hold is replaced, never mutated.
+    assert "b" * 40 not in before and "b" * 40 in client.tc
+
+    client.remove_torrents(["a" * 40])
+    assert "a" * 40 not in client.tc
+
+
+class FailingColdDownloads(FakeDownloads):
+    fail = False
+
+    def multicall2(self, target, view, *fields):
+        if self.fail and fields != clients.RT_HOT_FIELDS:
+            raise OSError("connection reset")
+        return super().multicall2(target, view, *fields)
+
+
+def test_cold_failure_keeps_hot_rows_and_previous_cold_values():
+    client = clients.RTorrentClient("http://localhost/RPC2")
+    client.srv = FakeProxy(None)
+    client.srv.d = FailingColdDownloads(["a" * 40])
+    client.get_torrents_full()
+
+    client.srv.d.fail = True
+    client.srv.d.hashes.append("b" * 40)
+    rows = client.get_torrents_full()
+    assert [r["hash"] for r in rows] == ["a" * 40, "b" * 40]
+    assert rows[0]["name"] == "Name" and rows[0]["tracker_domain"] == "tr.example"
+    assert rows[1]["name"] == "b" * 40 and rows[1]["size"] == 0 and rows[1]["down_rate"] == 5
@@ -1,6 +1,7 @@
 import pytest
 import sys
 import os
+import time
 from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -55,7 +56,7 @@ def mock_libtorrent_environment():
         del sys.modules['session_manager']
 
 @pytest.fixture
-def session_manager(mock_libtorrent_environment):
+def session_manager(mock_libtorrent_environment, tmp_path):
     from session_manager import SessionManager
     
     # Reset singleton
@@ -64,12 +65,17 @@ def session_manager(mock_libtorrent_environment):
     # Reset mock_lt session calls
     mock_libtorrent_environment.session.return_value.reset_mock()
     
-    with patch('session_manager.get_state_dir', return_value='.'):
+    with patch('session_manager.get_state_dir', return_value=str(tmp_path)):
         with patch('os.path.exists', return_value=False):
             with patch('session_manager.ConfigManager') as MockCM:
                 MockCM.return_value.get_preferences.return_value = {}
                 with patch('os.listdir', return_value=[]):
                     sm = SessionManager.get_instance()
+                    # The mocked session never blocks in wait_for_alert, so stop
+                    # the alert thread instead of letting it spin across tests.
+                    sm.running = False
+                    sm.alert_thread.join(timeout=5)
+                    sm.restore_thread.join(timeout=5)
                     sm.ses.reset_mock()
                     return sm
 
@@ -123,4 +129,370 @@ def test_remove_torrent(session_manager, mock_libtorrent_environment):
          session_manager.remove_torrent(info_hash)
          
          session_manager.ses.remove_torrent.assert_called()
-         assert info_hash not in session_manager.torrents_db
\ No newline at end of file
+         assert info_hash not in session_manager.torrents_db
+def _make_handle(info_hash):
+    h = MagicMock()
+    h.is_valid.return_value = True
+    del h.info_hashes
+    h.info_hash.return_value = info_hash
+    return h
+
+def test_find_handle_uses_index(session_manager):
+    h = _make_handle("a" * 40)
+    session_manager.ses.add_torrent.return_value = h
+    session_manager._index_handle(session_manager.ses.add_torrent({}))
+
+    session_manager.ses.get_torrents.reset_mock()
+    assert session_manager._find_handle("a" * 40) is h
+    assert session_manager.get_handle("b" * 40) is None
+    session_manager.ses.get_torrents.assert_not_called()
+
+def test_find_handle_drops_invalid_handles(session_manager):
+    h = _make_handle("a" * 40)
+    session_manager._index_handle(h)
+    h.is_valid.return_value = False
+
+    assert session_manager._find_handle("a" * 40) is None
+    assert "a" * 40 not in session_manager.handles
+
+def _use_alert_classes(lt):
+    for name in ('save_resume_data_alert', 'save_resume_data_failed_alert', 'add_torrent_alert',
+                 'torrent_removed_alert', 'state_update_alert', 'metadata_received_alert', 'storage_moved_alert'):
+        setattr(lt, name, type(name, (), {}))
+    return lt
+
+def test_alerts_maintain_handle_index(session_manager, mock_libtorrent_environment):
+    import session_manager as sm_module
+    lt = _use_alert_classes(sm_module.lt)
+
+    h = _make_handle("c" * 40)
+    added = lt.add_torrent_alert()
+    added.handle = h
+    added.error = MagicMock()
+    added.error.value.return_value = 0
+    session_manager._dispatch_alert(added)
+    assert session_manager._find_handle("c" * 40) is h
+
+    removed = lt.torrent_removed_alert()
+    removed.info_hash = "c" * 40
+    session_manager._dispatch_alert(removed)
+    assert session_manager._find_handle("c" * 40) is None
+
+def test_late_removed_alert_keeps_readded_handle(session_manager):
+    import session_manager as sm_module
+    lt = _use_alert_classes(sm_module.lt)
+    old, new = _make_handle("c" * 40), _make_handle("c" * 40)
+    session_manager._index_handle(new)
+
+    removed = lt.torrent_removed_alert()
+    removed.info_hash = "c" * 40
+    removed.handle = old
+    session_manager._dispatch_alert(removed)
+    assert session_manager._find_handle("c" * 40) is new
+
+    removed.handle = new
+    session_manager._dispatch_alert(removed)
+    assert session_manager._find_handle("c" * 40) is None
+
+def test_remove_torrent_unindexes_handle(session_manager, mock_libtorrent_environment):
+    h = _make_handle("d" * 40)
+    session_manager._index_handle(h)
+    mock_libtorrent_environment.remove_flags_t = MagicMock()
+    mock_libtorrent_environment.remove_flags_t.delete_files = 1
+
+    session_manager.remove_torrent("d" * 40)
+
+    session_manager.ses.remove_torrent.assert_called_once()
+    assert session_manager.handles == {}
+
+def _make_status(info_hash):
+    st = MagicMock()
+    del st.info_hashes
+    st.info_hash = info_hash
+    return st
+
+def test_state_update_alert_feeds_status_cache(session_manager):
+    import session_manager as sm_module
+    lt = _use_alert_classes(sm_module.lt)
+    h1, h2 = _make_handle("a" * 40), _make_handle("b" * 40)
+    session_manager._index_handle(h1)
+    session_manager._index_handle(h2)
+
+    update = lt.state_update_alert()
+    update.status = [_make_status("a" * 40), _make_status("b" * 40), _make_status("f" * 40)]
+    session_manager._dispatch_alert(update)
+
+    statuses = session_manager.get_torrent_statuses()
+    assert [st.info_hash for st in statuses] == ["a" * 40, "b" * 40]
+    h1.status.assert_not_called()
+    h2.status.assert_not_called()
+
+    # Only the torrent that changed is replaced.
+    changed = _make_status("b" * 40)
+    update.status = [changed]
+    session_manager._dispatch_alert(update)
+    assert session_manager.get_torrent_statuses()[1] is changed
+
+def test_get_torrent_statuses_queries_new_torrents_once(session_manager):
+    h = _make_handle("a" * 40)
+    h.status.return_value = _make_status("a" * 40)
+    session_manager._index_handle(h)
+
+    session_manager.get_torrent_statuses()
+    session_manager.get_torrent_statuses()
+    h.status.assert_called_once()
+
+    session_manager._unindex_hash("a" * 40)
+    assert session_manager.get_torrent_statuses() == []
+
+def test_hot_updates_keep_last_cold_status(session_manager):
+    import session_manager as sm_module
+    lt = _use_alert_classes(sm_module.lt)
+    h = _make_handle("a" * 40)
+    session_manager._index_handle(h)
+
+    cold, hot = _make_status("a" * 40), _make_status("a" * 40)
+    hot.save_path = ""
+    update = lt.state_update_alert()
+    update.status = [cold]
+    session_manager._dispatch_alert(update)
+    update.status = [hot]
+    session_manager._dispatch_alert(update)
+    assert session_manager.get_torrent_status_pairs() == [(hot, cold)]
+    h.status.assert_not_called()
+
+    # New metadata invalidates the cold fields; the next read queries them once.
+    moved = lt.metadata_received_alert()
+    moved.handle = h
+    session_manager._dispatch_alert(moved)
+    fresh = _make_status("a" * 40)
+    h.status.return_value = fresh
+    assert session_manager.get_torrent_status_pairs() == [(hot, fresh)]
+    session_manager.get_torrent_status_pairs()
+    h.status.assert_called_once()
+
+def test_hot_status_posts_skip_cold_queries(session_manager):
+    session_manager.ses.post_torrent_updates.reset_mock()
+    session_manager._post_torrent_updates(cold=False)
+    session_manager.ses.post_torrent_updates.assert_called_once_with(0)
+
+def test_torrents_db_writes_are_debounced(session_manager):
+    import session_manager as sm_module
+    store = session_manager.store
+
+    for i in range(50):
+        session_manager.torrents_db[f"hash_{i}"] = {'save_path': '/tmp', 'added': 1.0}
+        session_manager._mark_db_dirty(f"hash_{i}")
+    session_manager._flush_torrents_db()
+    assert store.load_entries() == {}
+
+    with patch.object(store, 'write', wraps=store.write) as write:
+        session_manager.db_dirty_since -= sm_module.DB_FLUSH_INTERVAL
+        session_manager._flush_torrents_db()
+        session_manager._flush_torrents_db()
+    write.assert_called_once()
+    assert len(store.load_entries()) == 50
+
+def test_save_state_flushes_torrents_db(session_manager):
+    session_manager.ses.get_torrents.return_value = []
+    session_manager.torrents_db["abcdef"] = {'save_path': '/tmp', 'added': 1.0}
+    session_manager._mark_db_dirty("abcdef")
+    session_manager.pending_metainfo["abcdef"] = b"d4:infoe"
+
+    session_manager.save_state()
+
+    assert session_manager.db_dirty_since == 0.0
+    [record] = session_manager.store.load_torrents()
+    assert record['save_path'] == '/tmp'
+    assert record['metainfo'] == b"d4:infoe"
+
+def test_remove_torrent_deletes_stored_state(session_manager, mock_libtorrent_environment):
+    h = _make_handle("e" * 40)
+    session_manager._index_handle(h)
+    session_manager.store.write(entries={"e" * 40: {'save_path': '/tmp'}}, resume={"e" * 40: b"resume"})
+    session_manager.torrents_db["e" * 40] = {'save_path': '/tmp'}
+    mock_libtorrent_environment.remove_flags_t = MagicMock()
+    mock_libtorrent_environment.remove_flags_t.delete_files = 1
+
+    session_manager.remove_torrent("e" * 40)
+
+    assert session_manager.store.load_torrents() == []
+
+def test_remove_during_flush_does_not_resurrect(session_manager, mock_libtorrent_environment):
+    import threading
+    ih = "f" * 40
+    h = _make_handle(ih)
+    session_manager._index_handle(h)
+    session_manager.torrents_db[ih] = {'save_path': '/tmp', 'added': 1.0}
+    session_manager._mark_db_dirty(ih)
+    mock_libtorrent_environment.remove_flags_t = MagicMock()
+    mock_libtorrent_environment.remove_flags_t.delete_files = 1
+
+    store = session_manager.store
+    real_write = store.write
+    writing = threading.Event()
+
+    def slow_write(**kwargs):
+        if kwargs.get('entries'):
+            writing.set()
+            time.sleep(0.2)
+        real_write(**kwargs)
+
+    with patch.object(store, 'write', side_effect=slow_write):
+        flusher = threading.Thread(target=session_manager._flush_torrents_db, kwargs={'force': True})
+        flusher.start()
+        assert writing.wait(timeout=5)
+        # The flush has copied the entry and is mid-write when the remove arrives.
+        session_manager.remove_torrent(ih)
+        flusher.join(timeout=5)
+
+    assert store.load_torrents() == []
+    assert ih not in session_manager.torrents_db
+
+def test_load_state_restores_from_store(session_manager, mock_libtorrent_environment):
+    session_manager.store.write(
+        entries={"a" * 40: {'save_path': '/data', 'added': 1.0}, "b" * 40: {'save_path': '/other', 'added': 2.0}},
+        resume={"a" * 40: b"resume-a"},
+        metainfo={"b" * 40: b"torrent-b"},
+    )
+    params = MagicMock()
+    mock_libtorrent_environment.read_resume_data.return_value = params
+    session_manager.ses.reset_mock()
+
+    session_manager.load_state().join(timeout=5)
+
+    mock_libtorrent_environment.read_resume_data.assert_called_once_with(b"resume-a")
+    assert params.save_path == '/data'
+    mock_libtorrent_environment.torrent_info.assert_called_with(b"torrent-b")
+    assert session_manager.ses.async_add_torrent.call_count == 2
+    session_manager.ses.add_torrent.assert_not_called()
+
+def test_restore_progress_follows_add_alerts(session_manager):
+    import session_manager as sm_module
+    lt = _use_alert_classes(sm_module.lt)
+    session_manager.store.write(resume={"a" * 40: b"resume-a", "b" * 40: b"resume-b"})
+    session_manager.load_state().join(timeout=5)
+
+    progress = session_manager.get_restore_progress()
+    assert progress['total'] == 2 and not progress['done']
+    assert progress['first_torrent_s'] is None
+
+    for ih, error in (("a" * 40, 0), ("b" * 40, 17)):
+        alert = lt.add_torrent_alert()
+        alert.handle = _make_handle(ih)
+        alert.params = MagicMock()
+        alert.params.info_hashes = ih
+        alert.error = MagicMock()
+        alert.error.value.return_value = error
+        session_manager._dispatch_alert(alert)
+
+    progress = session_manager.get_restore_progress()
+    assert progress['done']
+    assert (progress['loaded'], progress['failed']) == (1, 1)
+    assert progress['first_torrent_s'] is not None
+    assert progress['restored_s'] >= progress['first_torrent_s']
+    assert session_manager._find_handle("a" * 40) is not None
+
+def test_stale_restore_run_leaves_new_progress_alone(session_manager):
+    import threading
+    release = threading.Event()
+    records = [{'info_hash': "c" * 40, 'resume': None, 'metainfo': None, 'save_path': None}]
+    real_decode = session_manager._decode_record
+
+    def decode(record):
+        if record['info_hash'] == "c" * 40:
+            release.wait(5)
+        return real_decode(record)
+
+    with patch.object(session_manager, '_decode_record', side_effect=decode):
+        old = threading.Thread(target=session_manager._restore_torrents, args=(records, session_manager.restore))
+        old.start()
+        session_manager.store.write(resume={"a" * 40: b"resume-a"})
+        session_manager.load_state()
+        release.set()
+        old.join(timeout=5)
+        session_manager.restore_thread.join(timeout=5)
+
+    progress = session_manager.get_restore_progress()
+    assert progress['total'] == 1 and progress['failed'] == 0
+    assert not progress['done']
+
+def test_checkpoint_spreads_save_requests(session_manager):
+    import session_manager as sm_module
+    handles = []
+    for i in range(240):
+        ih = f"{i:040x}"
+        h = _make_handle(ih)
+        session_manager._index_handle(h)
+        st = _make_status(ih)
+        st.need_save_resume = i % 2 == 0
+        session_manager.statuses[ih] = st
+        handles.append(h)
+
+    t0 = 1000.0
+    session_manager.last_checkpoint_scan = session_manager.last_checkpoint_tick = None
+    session_manager._checkpoint_tick(t0)
+    assert session_manager.get_checkpoint_stats()['queued'] == 120
+    assert sum(h.save_resume_data.call_count for h in handles) == 0
+
+    session_manager._checkpoint_tick(t0 + 1)
+    assert sum(h.save_resume_data.call_count for h in handles) == 2
+
+    for step in range(2, int(sm_module.CHECKPOINT_INTERVAL) + 2):
+        session_manager._checkpoint_tick(t0 + step)
+    assert sum(h.save_resume_data.call_count for h in handles) == 120
+    assert all(h.save_resume_data.call_count == (i % 2 == 0) for i, h in enumerate(handles))
+    assert session_manager.get_checkpoint_stats()['in_flight'] == 120
+
+def test_checkpoint_lag_clears_on_save(session_manager):
+    import session_manager as sm_module
+    lt = _use_alert_classes(sm_module.lt)
+    ih = "a" * 40
+    session_manager._index_handle(_make_handle(ih))
+    st = _make_status(ih)
+    st.need_save_resume = True
+    session_manager.statuses[ih] = st
+    session_manager.last_checkpoint_scan = session_manager.last_checkpoint_tick = None
+    session_manager._checkpoint_tick(time.monotonic() - 5)
+    assert session_manager.get_checkpoint_stats()['lag_s'] >= 5
+
+    session_manager._checkpoint_tick()
+    alert = lt.save_resume_data_alert()
+    alert.params = MagicMock()
+    alert.params.info_hashes = ih
+    lt.write_resume_data.return_value = b"resume"
+    session_manager._dispatch_alert(alert)
+
+    stats = session_manager.get_checkpoint_stats()
+    assert stats['lag_s'] == 0.0 and stats['saved'] == 1
+    assert session_manager.pending_resume[ih] == b"resume"
+
+
+def test_resume_saves_and_checkpoints_are_exported(session_manager):
+    import metrics
+    import session_manager as sm_module
+    lt = _use_alert_classes(sm_module.lt)
+    ih = "b" * 40
+    session_manager._index_handle(_make_handle(ih))
+    before = metrics.RESUME_SAVES.get(("ok",))
+    alert = lt.save_resume_data_alert()
+    alert.params = MagicMock()
+    alert.params.info_hashes = ih
+    lt.write_resume_data.return_value = b"resume"
+    session_manager._dispatch_alert(alert)
+
+    assert metrics.RESUME_SAVES.get(("ok",)) == before + 1
+
+    skipped, failed = metrics.RESUME_SAVES.get(("skipped",)), metrics.RESUME_SAVES.get(("failed",))
+    for value, message in ((0, ""), (5, "resume data not modified"), (2, "No such file or directory")):
+        alert = lt.save_resume_data_failed_alert()
+        alert.handle = _make_handle(ih)
+        alert.error = MagicMock()
+        alert.error.value.return_value = value
+        alert.error.message.return_value = message
+        session_manager._dispatch_alert(alert)
+    assert metrics.RESUME_SAVES.get(("skipped",)) == skipped + 2
+    assert metrics.RESUME_SAVES.get(("failed",)) == failed + 1
+    families = {f[0]: f for f in session_manager.collect_metrics()}
+    assert families["session_torrents"][3] == [({}, 1)]
+    assert "checkpoint_lag_seconds" in families and "restore_torrents" in families
@@ -0,0 +1,58 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from state_store import LEGACY_BACKUP_DIR, StateStore
+
+
+def test_write_and_load_round_trip(tmp_path):
+    store = StateStore(str(tmp_path))
+    store.write(entries={"a" * 40: {"save_path": "/data", "added": 5.0, "priorities": [1, 0, 4]}},
+                resume={"a" * 40: b"resume"})
+    store.write(metainfo={"a" * 40: b"torrent"})
+
+    assert store.load_entries() == {"a" * 40: {"save_path": "/data", "added": 5.0, "priorities": [1, 0, 4]}}
+    [record] = store.load_torrents()
+    assert record["resume"] == b"resume"
+    assert record["metainfo"] == b"torrent"
+
+    store.write(removed=["a" * 40])
+    assert store.load_torrents() == []
+    store.close()
+
+
+def test_failed_batch_is_rolled_back(tmp_path):
+    store = StateStore(str(tmp_path))
+    try:
+        store.write(entries={"a" * 40: {"save_path": "/data"}}, resume={"b" * 40: object()})
+    except Exception:
+        pass
+    assert store.load_entries() == {}
+    store.close()
+
+
+def test_migrate_legacy_layout_once(tmp_path):
+    ih = "c" * 40
+    (tmp_path / "torrents.json").write_text(json.dumps({ih: {"save_path": "/dl", "added": 1.0}}), encoding="utf-8")
+    (tmp_path / f"{ih}.resume").write_bytes(b"resume-data")
+    (tmp_path / f"{ih}.torrent").write_bytes(b"torrent-data")
+    (tmp_path / f"{'d' * 40}.torrent").write_bytes(b"orphan")
+
+    store = StateStore(str(tmp_path))
+    assert store.migrate_legacy(str(tmp_path)) == 2
+
+    records = {r["info_hash"]: r for r in store.load_torrents()}
+    assert records[ih]["save_path"] == "/dl"
+    assert records[ih]["resume"] == b"resume-data"
+    assert records[ih]["metainfo"] == b"torrent-data"
+    assert records["d" * 40]["metainfo"] == b"orphan"
+    assert not (tmp_path / "torrents.json").exists()
+    assert (tmp_path / LEGACY_BACKUP_DIR / f"{ih}.resume").exists()
+
+    # A second run (or files dropped back in) is not re-imported.
+    (tmp_path / f"{'e' * 40}.torrent").write_bytes(b"late")
+    assert store.migrate_legacy(str(tmp_path)) == 0
+    assert len(store.load_torrents()) == 2
+    store.close()
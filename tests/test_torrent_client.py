@@ -14,7 +14,6 @@ Tests cover:
 import pytest
 import sys
 import os
-import tempfile
 from unittest.mock import MagicMock, patch, PropertyMock
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -134,12 +133,12 @@ def mock_session_env(mock_lt):
 
 
 @pytest.fixture
-def session_manager_instance(mock_session_env):
+def session_manager_instance(mock_session_env, tmp_path):
     """Create a SessionManager instance with mocked dependencies."""
     from session_manager import SessionManager
     SessionManager._instance = None
     
-    with patch('session_manager.get_state_dir', return_value=tempfile.gettempdir()):
+    with patch('session_manager.get_state_dir', return_value=str(tmp_path)):
         with patch('os.path.exists', return_value=False):
             with patch('session_manager.ConfigManager') as MockCM:
                 MockCM.return_value.get_preferences.return_value = {}
@@ -148,6 +147,7 @@ def session_manager_instance(mock_session_env):
                     sm.ses.reset_mock()
                     yield sm
     
+    sm.running = False
     SessionManager._instance = None
 
 
@@ -308,6 +308,42 @@ class TestLocalClientUrlEncoding:
 class TestLocalClientTorrentStatus:
     """Test LocalClient torrent status detection - simplified unit tests."""
     
+    def test_rows_reused_for_unchanged_statuses(self, monkeypatch):
+        """Rows are rebuilt only for statuses the session reported as changed."""
+        import clients
+        monkeypatch.setattr(clients, 'lt', MagicMock())
+        
+        def status(ih):
+            st = MagicMock(info_hash='a' * 39 + ih, paused=False, auto_managed=True, errc=None,
+                           all_time_download=0, download_payload_rate=0, current_tracker='',
+                           save_path='/data', total_wanted=10, total_wanted_done=5)
+            del st.distributed_copies
+            del st.distributed_full_copies
+            return st
+        
+        s1, s2 = status('1'), status('2')
+        client = clients.LocalClient.__new__(clients.LocalClient)
+        client.m = MagicMock()
+        client._rows = {}
+        client.m.get_torrent_status_pairs.return_value = [(s1, s1), (s2, s2)]
+        first = client.get_torrents_full()
+        assert [r['hash'] for r in first] == ['a' * 39 + '1', 'a' * 39 + '2']
+        
+        s2b = status('2')
+        client.m.get_torrent_status_pairs.return_value = [(s1, s1), (s2b, s2)]
+        second = client.get_torrents_full()
+        assert second[0] is first[0]
+        assert second[1] is not first[1]
+        assert second[1]['hash'] == first[1]['hash']
+        
+        # A new cold status (name/save_path) rebuilds the row even if the hot one is unchanged.
+        cold = status('1')
+        cold.save_path = '/moved'
+        client.m.get_torrent_status_pairs.return_value = [(s1, cold), (s2b, s2)]
+        third = client.get_torrents_full()
+        assert third[0]['save_path'] == '/moved'
+        assert third[1] is second[1]
+    
     def test_seeding_state_value(self):
         """Test that seeding state detection logic is correct."""
         # Test the logic used in get_torrents_full
@@ -467,7 +503,7 @@ class TestIntegrationSessionLifecycle:
 class TestConcurrentOperations:
     """Test thread safety of operations."""
     
-    def test_torrents_db_thread_safety(self, mock_session_env):
+    def test_torrents_db_thread_safety(self, mock_session_env, tmp_path):
         """Test that torrents_db access is thread-safe."""
         import threading
         import time
@@ -475,7 +511,7 @@ class TestConcurrentOperations:
         from session_manager import SessionManager
         SessionManager._instance = None
         
-        with patch('session_manager.get_state_dir', return_value=tempfile.gettempdir()):
+        with patch('session_manager.get_state_dir', return_value=str(tmp_path)):
             with patch('os.path.exists', return_value=False):
                 with patch('session_manager.ConfigManager') as MockCM:
                     MockCM.return_value.get_preferences.return_value = {}
@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+from torrent_columns import TorrentColumns
+
+
+def _row(h, size=100, done=0, state=1, message="", tracker="t.example", name=None, ratio=0):
+    return {"hash": h, "name": name or h, "size": size, "done": done, "state": state, "message": message,
+            "tracker_domain": tracker, "ratio": ratio, "availability": None}
+
+
+def _reference_summary(rows, is_error):
+    """The per-row loop the columnar passes replace."""
+    stats = dict.fromkeys(("All", "Downloading", "Finished", "Seeding", "Stopped", "Failed"), 0)
+    trackers = {}
+    for t in rows:
+        pct = t["done"] / t["size"] * 100 if t["size"] > 0 else 0
+        stats["All"] += 1
+        stats["Downloading"] += t["state"] == 1 and pct < 100
+        stats["Finished"] += pct >= 100
+        stats["Seeding"] += t["state"] == 1 and pct >= 100
+        stats["Stopped"] += t["state"] == 0
+        stats["Failed"] += bool(is_error(t["message"]))
+        domain = t["tracker_domain"] or "Unknown"
+        trackers[domain] = trackers.get(domain, 0) + 1
+    return stats, trackers
+
+
+ROWS = [
+    _row("a", done=50),
+    _row("b", done=100),
+    _row("c", done=100, state=0, tracker=""),
+    _row("d", size=0, state=0, message="tracker error"),
+    _row("e", done=10, message="OK", tracker="other.example"),
+]
+
+
+def is_error(msg):
+    return msg and msg.lower() != "ok"
+
+
+def test_summary_matches_per_row_loop():
+    assert TorrentColumns(ROWS).summary(is_error) == _reference_summary(ROWS, is_error)
+
+
+def test_select_by_category_and_tracker():
+    cols = TorrentColumns(ROWS)
+    assert [t["hash"] for t in cols.select("Downloading", is_error)] == ["a", "e"]
+    assert [t["hash"] for t in cols.select("Seeding", is_error)] == ["b"]
+    assert [t["hash"] for t in cols.select("Failed", is_error)] == ["d"]
+    assert [t["hash"] for t in cols.select("Unknown", is_error)] == ["c"]
+    assert [t["hash"] for t in cols.select("other.example", is_error)] == ["e"]
+    assert cols.select("All", is_error) == ROWS
+
+
+def test_error_classifier_runs_once_per_distinct_message():
+    calls = []
+    rows = [_row(str(i), message="boom" if i % 2 else "") for i in range(1000)]
+    TorrentColumns(rows).summary(lambda m: calls.append(m) or m)
+    assert sorted(calls) == ["", "boom"]
+
+
+def test_sorted_rows_handle_missing_values():
+    rows = [_row("a", size=5, name="b"), _row("b", size=1, name="a"), dict(_row("c", name="c"), size=None)]
+    cols = TorrentColumns(rows)
+    assert [t["hash"] for t in cols.sorted_rows("size")] == ["c", "b", "a"]
+    assert [t["hash"] for t in cols.sorted_rows("name", reverse=True)] == ["c", "a", "b"]
+    assert [t["hash"] for t in cols.sorted_rows("availability")] == ["a", "b", "c"]
+
+
+def test_query_caches_masks_and_orders_per_snapshot():
+    cols = TorrentColumns(ROWS)
+    rows, total = cols.query(is_error, category="stopped", sort="hash", reverse=True)
+    assert total == 2 and [t["hash"] for t in rows] == ["d", "c"]
+    cached = dict(cols.orders)
+    rows, total = cols.query(is_error, category="Stopped", sort="hash", reverse=True, offset=1, limit=5)
+    assert [t["hash"] for t in rows] == ["c"] and total == 2
+    assert cols.orders == cached
+    assert cols.query(is_error, search="A")[0] == [ROWS[0]]
+
+
+def test_indexes_carry_over_unchanged_columns():
+    first = TorrentColumns(ROWS)
+    first.query(is_error, category="Stopped", search="a", sort="name")
+    # Next snapshot: new row dicts, only rates moved.
+    rows = [dict(t, up_rate=7) for t in ROWS]
+    second = TorrentColumns(rows, previous=first)
+    with patch.object(second, "_sort_order", side_effect=AssertionError("re-sorted")):
+        rows_out, total = second.query(is_error, category="Stopped", search="a", sort="name")
+    assert second.orders[("name", False)] is first.orders[("name", False)]
+    assert second.masks[("state", 0)] is first.masks[("state", 0)]
+    assert (rows_out, total) == (first.query(is_error, category="Stopped", search="a", sort="name"))
+
+    # A renamed torrent invalidates the name order and search masks, nothing else.
+    renamed = [dict(t, name="zzz") if t["hash"] == "a" else t for t in rows]
+    third = TorrentColumns(renamed, previous=second)
+    assert second.previous is None
+    assert [t["hash"] for t in third.sorted_rows("name")][-1] == "a"
+    assert third.query(is_error, search="a")[1] == 0
+    assert third.state_is(0) is second.state_is(0)
+
+
+def test_carry_over_survives_previous_dropped_mid_query():
+    first = TorrentColumns(ROWS)
+    first.query(is_error, search="a")
+
+    class Racing(TorrentColumns):
+        # A newer snapshot built on this one clears ``previous`` right after it is read.
+        @property
+        def previous(self):
+            value, self._previous = self._previous, None
+            return value
+
+        @previous.setter
+        def previous(self, value):
+            self._previous = value
+
+    second = Racing([dict(t) for t in ROWS], previous=first)
+    assert second.query(is_error, search="a") == first.query(is_error, search="a")
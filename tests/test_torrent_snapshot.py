@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+from torrent_snapshot import SnapshotService
+
+
+class SlowClient:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.prefs_calls = 0
+        self.lock = threading.Lock()
+
+    def get_torrents_full(self):
+        with self.lock:
+            self.calls += 1
+            n = self.calls
+        time.sleep(self.delay)
+        return [{"hash": "a", "done": n}]
+
+    def get_global_stats(self):
+        return 10, 20
+
+    def get_app_preferences(self):
+        self.prefs_calls += 1
+        return {"dl_limit": 0}
+
+
+class FailingClient(SlowClient):
+    def get_torrents_full(self):
+        raise RuntimeError("backend down")
+
+
+def test_snapshot_is_reused_within_ttl():
+    client = SlowClient()
+    service = SnapshotService(client, ttl=60)
+    first = service.get("gui")
+    second = service.get("web")
+    assert first is second
+    assert client.calls == 1
+    assert first.global_stats == (10, 20)
+    stats = service.get_stats()["consumers"]
+    assert stats["gui"]["fetches"] == 1
+    assert stats["web"]["hits"] == 1
+
+
+def test_invalidate_forces_refetch():
+    client = SlowClient()
+    service = SnapshotService(client, ttl=60)
+    first = service.get()
+    fetched_at = first.fetched_at
+    service.invalidate()
+    # Snapshots already handed out keep their real age.
+    assert first.fetched_at == fetched_at and first.age() < 60
+    second = service.get()
+    assert client.calls == 2
+    assert second.version == first.version + 1
+    assert service.get() is second
+
+
+def test_next_snapshot_builds_on_previous_columns():
+    service = SnapshotService(SlowClient(), ttl=60)
+    first = service.get()
+    first_columns = first.columns
+    first_columns.sort_order("hash")
+    service.invalidate()
+    second = service.get()
+    assert second.columns.previous is first_columns
+    assert second.columns.sort_order("hash") is first_columns.sort_order("hash")
+
+
+def test_invalidate_during_fetch_refetches_next_time():
+    client = SlowClient(delay=0.2)
+    service = SnapshotService(client, ttl=60)
+    t = threading.Thread(target=service.get)
+    t.start()
+    time.sleep(0.05)
+    service.invalidate()
+    t.join()
+    service.get()
+    assert client.calls == 2
+
+
+def test_concurrent_callers_share_one_fetch():
+    client = SlowClient(delay=0.2)
+    service = SnapshotService(client, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.get("web"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert client.calls == 1
+    assert len({id(r) for r in results}) == 1
+    assert service.get_stats()["consumers"]["web"]["coalesced"] >= 1
+
+
+def test_set_client_drops_cached_snapshot():
+    service = SnapshotService(SlowClient(), ttl=60)
+    service.get()
+    service.set_client(None)
+    assert service.get().torrents == []
+    other = SlowClient()
+    service.set_client(other)
+    assert service.get().torrents[0]["done"] == 1
+    assert other.calls == 1
+
+
+def test_fetch_errors_propagate():
+    service = SnapshotService(FailingClient(), ttl=60)
+    with pytest.raises(RuntimeError):
+        service.get()
+    assert service.get_stats()["consumers"]["default"]["errors"] == 1
+
+
+def test_preferences_are_cached_until_invalidated():
+    client = SlowClient()
+    service = SnapshotService(client, prefs_ttl=60)
+    assert service.get_app_preferences() == {"dl_limit": 0}
+    service.get_app_preferences()
+    assert client.prefs_calls == 1
+    service.invalidate_preferences()
+    service.get_app_preferences()
+    assert client.prefs_calls == 2
@@ -0,0 +1,90 @@
+import clients
+from test_clients_tracker_domain import FakeTransTorrent
+
+
+def _only(torrent, fields):
+    torrent.fields = {k: v for k, v in torrent.fields.items() if k in fields}
+    return torrent
+
+
+class FakeIncrementalTransClient:
+    def __init__(self, host=None, port=None, username=None, password=None, protocol=None):
+        self.calls = []
+        self.active = []
+        self.ids = [1, 2]
+
+    def get_torrents(self, ids=None, arguments=None):
+        self.calls.append(("get", arguments))
+        return [_only(FakeTransTorrent(i, []), arguments) for i in (ids or self.ids)]
+
+    def get_recently_active_torrents(self, arguments=None):
+        self.calls.append(("active", arguments))
+        torrents, removed = self.active.pop(0)
+        return [_only(t, arguments) for t in torrents], removed
+
+
+def test_recently_active_deltas_merge_into_mirror(monkeypatch):
+    monkeypatch.setattr(clients, "TransClient", FakeIncrementalTransClient)
+    client = clients.TransmissionClient("http://localhost:9091", "user", "pass")
+    first = client.get_torrents_full()
+    assert len(first) == 2
+
+    changed = FakeTransTorrent(1, [])
+    changed.fields.update(rateDownload=900, status=0)
+    client.c.active = [([changed], [2])]
+    [row] = client.get_torrents_full()
+    assert row["down_rate"] == 900 and row["state"] == 0
+
+    assert client.c.calls == [("get", clients.TRANS_TORRENT_FIELDS), ("active", clients.TRANS_HOT_FIELDS)]
+    assert "trackers" not in clients.TRANS_TORRENT_FIELDS
+    assert row["name"] == "Test"
+
+
+def test_unchanged_rows_are_reused_and_full_resync_is_periodic(monkeypatch):
+    monkeypatch.setattr(clients, "TransClient", FakeIncrementalTransClient)
+    client = clients.TransmissionClient("http://localhost:9091", "user", "pass")
+    first = client.get_torrents_full()
+    client.c.active = [([], [])]
+    assert client.get_torrents_full()[0] is first[0]
+
+    client.last_full -= clients.TRANS_FULL_RESYNC_INTERVAL + 1
+    client.get_torrents_full()
+    assert client.c.calls[-1] == ("get", clients.TRANS_TORRENT_FIELDS)
+
+
+def test_cold_fields_refresh_on_their_own_interval(monkeypatch):
+    monkeypatch.setattr(clients, "TransClient", FakeIncrementalTransClient)
+    client = clients.TransmissionClient("http://localhost:9091", "user", "pass")
+    client.get_torrents_full()
+
+    # A torrent added since the last cold pass gets its cold fields right away.
+    client.c.ids = [1, 2, 3]
+    client.c.active = [([FakeTransTorrent(3, [])], [])]
+    rows = client.get_torrents_full()
+    assert [r["name"] for r in rows] == ["Test"] * 3
+    assert client.c.calls[-1] == ("get", clients.TRANS_COLD_FIELDS)
+
+    client.c.ids = [1, 3]
+    client.c.active = [([], [])]
+    client._cold_at -= client.cold_refresh_interval + 1
+    assert len(client.get_torrents_full()) == 2
+    assert [args for _, args in client.c.calls[-2:]] == [clients.TRANS_COLD_FIELDS, clients.TRANS_HOT_FIELDS]
+
+
+def test_failed_refresh_resets_mirror_under_lock(monkeypatch):
+    monkeypatch.setattr(clients, "TransClient", FakeIncrementalTransClient)
+    client = clients.TransmissionClient("http://localhost:9091", "user", "pass")
+    client.get_torrents_full()
+
+    class LockCheckingClient(clients.TransmissionClient):
+        def __setattr__(self, name, value):
+            if name == "rows":
+                assert self.sync_lock.locked()
+            super().__setattr__(name, value)
+
+    client.__class__ = LockCheckingClient
+    client.c.active = []  # the next hot fetch fails
+    assert client.get_torrents_full() == []
+    assert client.rows == {}
+    # The next refresh starts over with a full fetch.
+    assert len(client.get_torrents_full()) == 2
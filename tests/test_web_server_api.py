@@ -77,3 +77,143 @@ def test_rss_feeds_endpoint(auth_client):
     assert rv.status_code == 200
     data = json.loads(rv.data)
     assert 'http://feed' in data
+
+def test_torrents_resume_uses_batch_action(auth_client):
+    mock_client = MagicMock()
+    mock_client.start_torrents.return_value = []
+    web_server.WEB_CONFIG['client'] = mock_client
+
+    rv = auth_client.post('/api/v2/torrents/resume', data={'hashes': 'aaa|bbb|ccc'})
+
+    assert rv.status_code == 200
+    mock_client.start_torrents.assert_called_once_with(['aaa', 'bbb', 'ccc'])
+    mock_client.start_torrent.assert_not_called()
+    web_server.WEB_CONFIG['client'] = None
+
+def test_batch_action_reports_failed_hashes(auth_client):
+    mock_client = MagicMock()
+    mock_client.stop_torrents.return_value = [('bbb', RuntimeError('gone'))]
+    mock_client.recheck_torrents.side_effect = NotImplementedError
+    web_server.WEB_CONFIG['client'] = mock_client
+
+    rv = auth_client.post('/api/v2/torrents/pause', data={'hashes': 'aaa|bbb'})
+    assert rv.status_code == 500
+    assert 'bbb' in rv.get_data(as_text=True) and 'aaa' not in rv.get_data(as_text=True)
+    assert auth_client.post('/api/v2/torrents/recheck', data={'hashes': 'aaa'}).status_code == 501
+    web_server.WEB_CONFIG['client'] = None
+
+def test_torrents_info_filters_sorts_and_pages(auth_client):
+    mock_app = MagicMock()
+    torrents_list = [
+        {'hash': f'h{i}', 'name': f'Ubuntu {i}' if i % 2 else f'Debian {i}', 'size': 100,
+         'done': 100 if i < 4 else 10, 'state': 1, 'tracker_domain': 'a.example' if i < 6 else 'b.example'}
+        for i in range(10)
+    ]
+    mock_app.get_all_torrents_safe.return_value = torrents_list
+    web_server.WEB_CONFIG['app'] = mock_app
+
+    data = json.loads(auth_client.get('/api/v2/torrents/info?filter=downloading&sort=name&reverse=true&limit=2').data)
+    assert data['total'] == 6
+    assert [t['name'] for t in data['torrents']] == ['Ubuntu 9', 'Ubuntu 7']
+    assert data['stats']['All'] == 10
+
+    data = json.loads(auth_client.get('/api/v2/torrents/info?search=ubu%209&tracker=b.example').data)
+    assert [t['hash'] for t in data['torrents']] == ['h9']
+
+    data = json.loads(auth_client.get('/api/v2/torrents/info?filter=a.example&offset=4').data)
+    assert data['total'] == 6
+    assert [t['hash'] for t in data['torrents']] == ['h4', 'h5']
+
+    assert auth_client.get('/api/v2/torrents/info?sort=__class__').status_code == 400
+    assert auth_client.get('/api/v2/torrents/info?limit=x').status_code == 400
+
+def test_torrents_all_is_compressed_and_revalidated_by_snapshot_version(auth_client):
+    import gzip
+    from torrent_snapshot import SnapshotService
+
+    rows = [{'hash': f'h{i}', 'name': f'Torrent {i}', 'state': 1} for i in range(100)]
+    mock_client = MagicMock()
+    mock_client.get_torrents_full.return_value = rows
+    mock_client.get_global_stats.return_value = (0, 0)
+    service = SnapshotService(mock_client, ttl=60)
+    web_server.WEB_CONFIG['client'] = mock_client
+    web_server.WEB_CONFIG['snapshots'] = service
+    try:
+        rv = auth_client.get('/api/v2/torrents/all', headers={'Accept-Encoding': 'gzip'})
+        assert rv.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in rv.headers['Vary']
+        assert json.loads(gzip.decompress(rv.data)) == rows
+        etag = rv.headers['ETag']
+
+        rv = auth_client.get('/api/v2/torrents/all', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert rv.status_code == 304 and rv.data == b''
+
+        service.invalidate()
+        rv = auth_client.get('/api/v2/torrents/all', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert rv.status_code == 200 and rv.headers['ETag'] != etag
+
+        # Small bodies and clients without gzip get plain JSON.
+        mock_client.get_torrents_full.return_value = rows[:1]
+        service.invalidate()
+        assert 'Content-Encoding' not in auth_client.get('/api/v2/torrents/all', headers={'Accept-Encoding': 'gzip'}).headers
+    finally:
+        web_server.WEB_CONFIG['client'] = None
+        web_server.WEB_CONFIG['snapshots'] = None
+
+def test_index_links_content_hashed_assets_with_long_cache(auth_client):
+    import re
+
+    html = auth_client.get('/').get_data(as_text=True)
+    [digest] = re.findall(r'src="app\.js\?v=(\w+)"', html)
+    assert re.search(r'href="style\.css\?v=\w+"', html)
+
+    rv = auth_client.get(f'/app.js?v={digest}')
+    assert 'immutable' in rv.headers['Cache-Control']
+    assert auth_client.get('/app.js').headers['Cache-Control'] == 'no-cache'
+    assert auth_client.get('/app.js', headers={'If-None-Match': rv.headers['ETag']}).status_code == 304
+
+def test_static_asset_tracks_unresolved_dependencies(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_server, 'static_dir', str(tmp_path))
+    monkeypatch.setattr(web_server, '_static_assets', {})
+    (tmp_path / 'page.html').write_text('<script src="late.js"></script>')
+
+    first = web_server._static_asset('page.html')
+    assert first.deps == (('late.js', None),)
+    # A reference that still doesn't resolve doesn't rebuild the page.
+    assert web_server._static_asset('page.html') is first
+
+    (tmp_path / 'late.js').write_text('1')
+    second = web_server._static_asset('page.html')
+    assert second is not first and 'late.js?v=' in second.data.decode()
+    assert web_server._static_asset('page.html') is second
+
+    (tmp_path / 'late.js').unlink()
+    third = web_server._static_asset('page.html')
+    assert third is not second and web_server._static_asset('page.html') is third
+
+def test_torrent_lists_in_columnar_format(auth_client):
+    rows = [{'hash': 'a', 'name': 'A', 'size': 1}, {'hash': 'b', 'name': 'B', 'size': 2}]
+    mock_client = MagicMock()
+    mock_client.get_torrents_full.return_value = rows
+    mock_client.get_global_stats.return_value = (0, 0)
+    web_server.WEB_CONFIG['client'] = mock_client
+    try:
+        rv = auth_client.get('/api/v2/torrents/all?format=columns')
+        assert rv.mimetype == web_server.COLUMNS_MIMETYPE
+        assert json.loads(rv.data) == {'fields': ['hash', 'name', 'size'], 'rows': [['a', 'A', 1], ['b', 'B', 2]]}
+
+        rv = auth_client.get('/api/v2/torrents/all', headers={'Accept': web_server.COLUMNS_MIMETYPE})
+        assert json.loads(rv.data)['fields'] == ['hash', 'name', 'size']
+        assert json.loads(auth_client.get('/api/v2/torrents/all', headers={'Accept': '*/*'}).data) == rows
+        assert auth_client.get('/api/v2/torrents/all?format=xml').status_code == 400
+    finally:
+        web_server.WEB_CONFIG['client'] = None
+
+def test_to_columns_fills_missing_fields_with_null():
+    assert web_server.to_columns([{'hash': 'a', 'name': 'A'}, {'hash': 'b', 'size': 2}]) == {
+        'fields': ['hash', 'name', 'size'], 'rows': [['a', 'A', None], ['b', None, 2]]}
+    assert web_server.to_columns([]) == {'fields': [], 'rows': []}
+    # Keys absent from the first row still get a column.
+    assert web_server.to_columns([{'hash': 'a', 'size': 1}, {'hash': 'b', 'size': 2, 'save_path': '/x'}]) == {
+        'fields': ['hash', 'size', 'save_path'], 'rows': [['a', 1, None], ['b', 2, '/x']]}
+    assert web_server.to_columns([{'hash': 'a'}, {'hash': 'b'}]) == {'fields': ['hash'], 'rows': [['a'], ['b']]}
@@ -0,0 +1,128 @@
+import socket
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+import web_server
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(params=["werkzeug", "waitress"])
+def serving(request, monkeypatch):
+    if request.param == "waitress":
+        pytest.importorskip("waitress")
+    else:
+        monkeypatch.setitem(sys.modules, "waitress.server", None)
+    monkeypatch.setitem(web_server.WEB_CONFIG, "host", "127.0.0.1")
+    monkeypatch.setitem(web_server.WEB_CONFIG, "port", _free_port())
+    yield request.param
+    web_server.stop_web_ui()
+
+
+def _get(path):
+    url = f"http://127.0.0.1:{web_server.WEB_CONFIG['port']}{path}"
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        return resp.status
+
+
+def test_start_serves_and_stop_releases_port(serving):
+    web_server.start_web_ui()
+    assert _get("/login.html") == 200
+    assert isinstance(web_server.server, web_server.PooledWSGIServer) == (serving == "werkzeug")
+
+    web_server.stop_web_ui(timeout=2)
+    assert web_server.server is None
+    with socket.socket() as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind(("127.0.0.1", web_server.WEB_CONFIG["port"]))
+
+
+def test_start_restarts_on_port_change(serving):
+    web_server.start_web_ui()
+    first = web_server.server
+    web_server.start_web_ui()
+    assert web_server.server is first
+
+    web_server.WEB_CONFIG["port"] = _free_port()
+    web_server.start_web_ui()
+    assert web_server.server is not first
+    assert _get("/login.html") == 200
+
+
+def test_fallback_server_rejects_requests_beyond_its_queue(monkeypatch):
+    monkeypatch.setitem(sys.modules, "waitress.server", None)
+    srv = web_server.PooledWSGIServer("127.0.0.1", 0, web_server.app, threads=1, queue=0)
+    try:
+        srv.slots.acquire()
+        client, server_side = socket.socketpair()
+        with client:
+            srv.process_request(server_side, ("127.0.0.1", 0))
+            assert client.recv(64).startswith(b"HTTP/1.0 503")
+    finally:
+        srv.server_close()
+        srv.pool.shutdown()
+
+
+
+def _slow_app(entered):
+    def app(environ, start_response):
+        entered.set()
+        time.sleep(0.5)
+        start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", "4")])
+        return [b"done"]
+    return app
+
+
+def _assert_drains(port, entered, stop):
+    result = {}
+
+    def fetch():
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5) as resp:
+            result["body"] = resp.read()
+
+    client = threading.Thread(target=fetch)
+    client.start()
+    assert entered.wait(5)
+    stop()
+    client.join(5)
+    assert result.get("body") == b"done"
+    with pytest.raises(OSError):
+        socket.create_connection(("127.0.0.1", port), timeout=1).close()
+
+
+def test_fallback_server_drains_in_flight_requests():
+    entered = threading.Event()
+    srv = web_server.PooledWSGIServer("127.0.0.1", 0, _slow_app(entered), threads=2, queue=2)
+    threading.Thread(target=srv.run, daemon=True).start()
+    _assert_drains(srv.server_address[1], entered, lambda: srv.stop(timeout=5))
+
+
+def test_waitress_closes_listener_then_drains():
+    server_mod = pytest.importorskip("waitress.server")
+    entered = threading.Event()
+    srv = server_mod.create_server(_slow_app(entered), host="127.0.0.1", port=0, threads=2)
+    runner = threading.Thread(target=srv.run, daemon=True)
+    runner.start()
+    _assert_drains(srv.socket.getsockname()[1], entered, lambda: web_server._stop_waitress(srv, 5))
+    runner.join(5)
+    assert not runner.is_alive()
+
+
+def test_waitress_falls_back_to_public_close(monkeypatch):
+    server_mod = pytest.importorskip("waitress.server")
+    monkeypatch.setattr(web_server, "WAITRESS_DRAIN_MAJORS", ())
+    srv = server_mod.create_server(_slow_app(threading.Event()), host="127.0.0.1", port=0, threads=2)
+    assert not web_server._waitress_can_drain(srv)
+    runner = threading.Thread(target=srv.run, daemon=True)
+    runner.start()
+    web_server._stop_waitress(srv, 5)
+    runner.join(5)
+    assert not runner.is_alive()
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+import web_server
+
+
+class FakeClient:
+    def __init__(self):
+        self.rows = [
+            {"hash": "a", "name": "A", "size": 100, "done": 100, "state": 1, "tracker_domain": "t1"},
+            {"hash": "b", "name": "B", "size": 100, "done": 10, "state": 1, "tracker_domain": "t2"},
+        ]
+
+    def get_torrents_full(self):
+        return [dict(r) for r in self.rows]
+
+    def get_global_stats(self):
+        return 1, 2
+
+
+@pytest.fixture
+def app_client():
+    original = web_server.WEB_CONFIG["client"]
+    client = web_server.app.test_client()
+    with client.session_transaction() as session:
+        session["logged_in"] = True
+    yield client
+    web_server.WEB_CONFIG["client"] = original
+
+
+def _events(response):
+    for chunk in response.response:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if text.startswith("data: "):
+            yield json.loads(text[len("data: "):])
+
+
+def test_stream_sends_full_update_then_deltas(app_client):
+    fake = FakeClient()
+    web_server.WEB_CONFIG["client"] = fake
+    rv = app_client.get("/api/v2/sync/stream?interval=500", buffered=False)
+    assert rv.status_code == 200
+    assert rv.mimetype == "text/event-stream"
+    events = _events(rv)
+    try:
+        first = next(events)
+        assert first["full_update"] is True
+        assert set(first["torrents"]) == {"a", "b"}
+        assert first["stats"]["Seeding"] == 1
+        assert first["trackers"] == {"t1": 1, "t2": 1}
+        assert first["server_state"] == {"dl_info_speed": 1, "up_info_speed": 2}
+
+        fake.rows = [dict(fake.rows[0], state=0)]
+        web_server.get_snapshot_service().invalidate()
+        second = next(events)
+        assert "full_update" not in second
+        assert second["torrents"] == {"a": {"state": 0}}
+        assert second["torrents_removed"] == ["b"]
+        assert second["stats"]["Stopped"] == 1
+        assert second["trackers"] == {"t1": 1}
+        assert "server_state" not in second
+    finally:
+        rv.close()
+
+
+def test_stream_refuses_when_slots_exhausted(app_client, monkeypatch):
+    web_server.WEB_CONFIG["client"] = FakeClient()
+    monkeypatch.setattr(web_server, "_stream_slots", web_server.threading.BoundedSemaphore(1))
+    web_server._stream_slots.acquire()
+    rv = app_client.get("/api/v2/sync/stream")
+    assert rv.status_code == 503
+
+
+def test_stream_rejects_non_finite_interval(app_client):
+    web_server.WEB_CONFIG["client"] = FakeClient()
+    for value in ("inf", "-inf", "nan"):
+        assert app_client.get(f"/api/v2/sync/stream?interval={value}").status_code == 400
+
+
+def test_stream_clamps_interval_to_snapshot_ttl(app_client, monkeypatch):
+    web_server.WEB_CONFIG["client"] = FakeClient()
+    service = web_server.get_snapshot_service()
+    ages, waits = [], []
+    real_get = service.get
+    monkeypatch.setattr(service, "get", lambda name, max_age=None: ages.append(max_age) or real_get(name, max_age))
+    stopping = web_server.threading.Event()
+    monkeypatch.setattr(web_server, "_shutting_down", stopping)
+    monkeypatch.setattr(service, "wait_for_update", lambda version, timeout: waits.append(timeout) or stopping.set())
+    for value, expected in (("1", service.ttl), ("1e12", web_server.STREAM_MAX_INTERVAL)):
+        stopping.clear()
+        rv = app_client.get(f"/api/v2/sync/stream?interval={value}", buffered=False)
+        try:
+            assert list(_events(rv))[0]["full_update"] is True
+        finally:
+            rv.close()
+        assert ages[-1] == waits[-1] == expected
+
+
+def test_stream_slot_released_when_body_never_read(app_client, monkeypatch):
+    web_server.WEB_CONFIG["client"] = FakeClient()
+    slots = web_server.threading.BoundedSemaphore(1)
+    monkeypatch.setattr(web_server, "_stream_slots", slots)
+    active = web_server.STREAMS_ACTIVE.get()
+    rv = app_client.get("/api/v2/sync/stream", buffered=False)
+    assert rv.status_code == 200
+    assert web_server.STREAMS_ACTIVE.get() == active + 1
+    rv.close()
+    assert web_server.STREAMS_ACTIVE.get() == active
+    assert slots.acquire(blocking=False)
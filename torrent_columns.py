@@ -0,0 +1,285 @@
+"""Columnar view of a torrent list for counting, filtering and sorting.
+
+Row dicts stay what the GUI list and the Web UI render, but the passes that
+touch every torrent on every refresh (sidebar counts, tracker counts, filter
+membership, sort order) run over typed columns instead:
+- numeric fields become ``array('q')``/``array('d')`` columns, built lazily and
+  only for the fields a pass actually needs,
+- tracker domain, save path and status message become interned category codes,
+  so per-value work such as "is this message an error?" runs once per distinct
+  value instead of once per torrent,
+- element-wise comparisons use ``map``/``operator`` so the per-torrent loops
+  run in C, and the resulting masks are held as big ints (one byte per row) so
+  combining (``&``, ``^``) and counting (``bit_count``) them is a handful of
+  word operations.
+
+A ``TorrentColumns`` is built over an immutable row list (a snapshot) and may
+be shared between threads; columns are computed at most a few times under a
+race, never inconsistently.
+
+Masks and sort orders carry over between snapshots: built with ``previous``
+(the last snapshot's columns), a lookup that misses reuses the previous
+result when the columns it was computed from are unchanged. Comparing two
+columns runs in C, so a refresh that only moved rates and progress keeps its
+name order, tracker and state masks and search masks instead of re-sorting
+and re-scanning.
+"""
+
+from __future__ import annotations
+
+import operator
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+CATEGORIES = ("All", "Downloading", "Finished", "Seeding", "Stopped", "Failed")
+# Lower-cased category names and qBittorrent filter aliases accepted by query().
+CATEGORY_ALIASES = {c.lower(): c for c in CATEGORIES}
+CATEGORY_ALIASES.update({"completed": "Finished", "paused": "Stopped", "errored": "Failed"})
+UNKNOWN_TRACKER = "Unknown"
+
+INT_FIELDS = ("size", "done", "state", "hashing", "active", "down_rate", "up_rate", "up_total", "eta",
+              "seeds_connected", "seeds_total", "leechers_connected", "leechers_total")
+FLOAT_FIELDS = ("ratio", "availability")
+CATEGORY_FIELDS = ("tracker_domain", "save_path", "message")
+SORT_FIELDS = INT_FIELDS + FLOAT_FIELDS + CATEGORY_FIELDS + ("name", "hash")
+# Sort value used for missing numeric fields (matches the old per-row sort key).
+MISSING_NUMBER = -1
+
+ErrorClassifier = Callable[[str], Any]
+
+
+def _int(v: Any) -> int:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return MISSING_NUMBER
+
+
+def _float(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return float(MISSING_NUMBER)
+
+
+def _mask(flags) -> int:
+    """Pack an iterable of 0/1 (or bools) into an int with one byte per row."""
+    return int.from_bytes(bytes(flags), "little")
+
+
+def _count(mask: int) -> int:
+    try:
+        return mask.bit_count()
+    except AttributeError:  # Python < 3.10
+        return bin(mask).count("1")
+
+
+class Categorical:
+    """Interned values plus one code per row."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, items: List[Any]) -> None:
+        self.values: List[Any] = list(dict.fromkeys(items))
+        index = {v: i for i, v in enumerate(self.values)}
+        self.codes = array("I", map(index.__getitem__, items))
+
+    def counts(self) -> Dict[Any, int]:
+        return {self.values[code]: n for code, n in Counter(self.codes).items()}
+
+    def mask_of(self, predicate: Callable[[Any], Any]) -> int:
+        """Per-row mask; ``predicate`` runs once per distinct value."""
+        per_value = [1 if predicate(v) else 0 for v in self.values]
+        return _mask(map(per_value.__getitem__, self.codes))
+
+
+def _same_column(a: Any, b: Any) -> bool:
+    if isinstance(a, Categorical):
+        return isinstance(b, Categorical) and a.values == b.values and a.codes == b.codes
+    return type(a) is type(b) and a == b
+
+
+class TorrentColumns:
+    def __init__(self, rows: Sequence[Dict[str, Any]], previous: Optional["TorrentColumns"] = None) -> None:
+        self.rows = rows
+        self.n = len(rows)
+        self.columns: Dict[str, Any] = {}
+        self.masks: Dict[Any, int] = {}
+        self.orders: Dict[Tuple[str, bool], List[int]] = {}
+        # 0x0101...01: XOR with it negates a mask.
+        self.ones = int.from_bytes(b"\x01" * self.n, "little")
+        # Only the previous generation is kept, so snapshots don't chain up.
+        self.previous = previous if previous is not None and previous.n == self.n else None
+        if previous is not None:
+            previous.previous = None
+        self.unchanged: Dict[str, bool] = {}
+
+    def column(self, name: str):
+        col = self.columns.get(name)
+        if col is not None:
+            return col
+        values = [t.get(name) for t in self.rows]
+        if name in INT_FIELDS or name in FLOAT_FIELDS:
+            typecode, convert = ("q", _int) if name in INT_FIELDS else ("d", _float)
+            try:
+                col = array(typecode, values)
+            except TypeError:
+                # None, floats in an int column, strings from odd backends...
+                col = array(typecode, map(convert, values))
+        elif name in CATEGORY_FIELDS:
+            missing = UNKNOWN_TRACKER if name == "tracker_domain" else ""
+            col = Categorical([v or missing for v in values])
+        else:
+            col = values
+        self.columns[name] = col
+        return col
+
+    def _unchanged(self, name: str, prev: "TorrentColumns") -> bool:
+        """True if column ``name`` is identical in ``prev`` (and that one built it).
+
+        Callers read ``self.previous`` once and pass it in: a newer snapshot
+        built on this one clears the attribute from another thread.
+        """
+        same = self.unchanged.get(name)
+        if same is None:
+            old = prev.columns.get(name)
+            same = self.unchanged[name] = old is not None and _same_column(self.column(name), old)
+        return same
+
+    def _carried(self, store: str, key, deps: Sequence[str]):
+        prev = self.previous
+        if prev is None:
+            return None
+        value = getattr(prev, store).get(key)
+        if value is None or not all(self._unchanged(d, prev) for d in deps):
+            return None
+        return value
+
+    # -- masks -------------------------------------------------------------
+
+    def _cached(self, key, deps: Sequence[str], build: Callable[[], int]) -> int:
+        m = self.masks.get(key)
+        if m is None:
+            m = self._carried("masks", key, deps)
+            if m is None:
+                m = build()
+            self.masks[key] = m
+        return m
+
+    def finished(self) -> int:
+        # pct >= 100  <=>  size > 0 and done >= size
+        def build():
+            size, done = self.column("size"), self.column("done")
+            return _mask(map(operator.gt, size, repeat(0))) & _mask(map(operator.ge, done, size))
+        return self._cached("finished", ("size", "done"), build)
+
+    def state_is(self, value: int) -> int:
+        return self._cached(("state", value), ("state",),
+                            lambda: _mask(map(operator.eq, self.column("state"), repeat(value))))
+
+    def category_mask(self, category: str, is_error: ErrorClassifier) -> Optional[int]:
+        if category == "Downloading":
+            return self.state_is(1) & (self.finished() ^ self.ones)
+        if category == "Finished":
+            return self.finished()
+        if category == "Seeding":
+            return self.state_is(1) & self.finished()
+        if category == "Stopped":
+            return self.state_is(0)
+        if category == "Failed":
+            return self._cached(("failed", is_error), ("message",), lambda: self.column("message").mask_of(is_error))
+        return None
+
+    # -- passes --------------------------------------------------------------
+
+    def summary(self, is_error: ErrorClassifier) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Sidebar category counts and per-tracker counts."""
+        stats = {"All": self.n}
+        for category in CATEGORIES[1:]:
+            stats[category] = _count(self.category_mask(category, is_error))
+        return stats, self.column("tracker_domain").counts()
+
+    def select(self, filter_mode: str, is_error: ErrorClassifier) -> List[Dict[str, Any]]:
+        """Rows in a sidebar category or, for any other name, of that tracker domain."""
+        if filter_mode == "All":
+            return list(self.rows)
+        mask = self.category_mask(filter_mode, is_error)
+        if mask is None:
+            trackers = self.column("tracker_domain")
+            mask = trackers.mask_of(lambda v: v == filter_mode)
+        return list(compress(self.rows, mask.to_bytes(self.n, "little")))
+
+    def search_mask(self, text: str) -> int:
+        """Rows whose name contains every whitespace-separated token (case-insensitive)."""
+        def lowered():
+            prev = self.previous
+            if prev is not None and self._unchanged("name", prev):
+                old = prev.columns.get("name_lower")
+                if old is not None:
+                    return old
+            return [str(v).lower() if v is not None else "" for v in self.column("name")]
+        names = self.columns.get("name_lower") or self.columns.setdefault("name_lower", lowered())
+        mask = self.ones
+        for token in text.lower().split():
+            mask &= self._cached(("search", token), ("name",),
+                                 lambda: _mask(map(operator.contains, names, repeat(token))))
+        return mask
+
+    def query(self, is_error: ErrorClassifier, category: Optional[str] = None, tracker: Optional[str] = None,
+              search: Optional[str] = None, sort: Optional[str] = None, reverse: bool = False,
+              offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Filtered, searched, sorted and paged rows plus the total number of matches.
+
+        ``category`` is a sidebar category (or qBittorrent filter alias); any
+        other value is taken as a tracker domain, like the GUI sidebar. Masks and sort
+        orders are cached on this instance (and carried over from the previous
+        snapshot where their columns didn't change), so repeated requests only
+        pay for the final slice.
+        """
+        mask = self.ones
+        if category:
+            category = CATEGORY_ALIASES.get(category.lower(), category)
+            m = self.category_mask(category, is_error)
+            if m is None and category != "All":
+                m = self._cached(("tracker", category), ("tracker_domain",),
+                                 lambda: self.column("tracker_domain").mask_of(lambda v: v == category))
+            if m is not None:
+                mask &= m
+        if tracker:
+            mask &= self._cached(("tracker", tracker), ("tracker_domain",),
+                                 lambda: self.column("tracker_domain").mask_of(lambda v: v == tracker))
+        if search and search.strip():
+            mask &= self.search_mask(search)
+
+        flags = mask.to_bytes(self.n, "little")
+        if sort:
+            order = self.sort_order(sort, reverse)
+            selected = list(compress(order, map(flags.__getitem__, order)))
+        else:
+            selected = list(compress(range(self.n), flags))
+        offset = max(0, int(offset or 0))
+        end = None if limit is None else offset + max(0, int(limit))
+        return [self.rows[i] for i in selected[offset:end]], len(selected)
+
+    def sort_order(self, key: str, reverse: bool = False) -> List[int]:
+        order = self.orders.get((key, reverse))
+        if order is None:
+            order = self._carried("orders", (key, reverse), (key,))
+            if order is None:
+                order = self._sort_order(key, reverse)
+            self.orders[(key, reverse)] = order
+        return order
+
+    def _sort_order(self, key: str, reverse: bool) -> List[int]:
+        col = self.column(key)
+        if isinstance(col, Categorical):
+            rank = {v: i for i, v in enumerate(sorted(col.values))}
+            col = array("I", map(rank.__getitem__, (col.values[c] for c in col.codes)))
+        elif not isinstance(col, array):
+            col = ["" if v is None else v for v in col]
+        return sorted(range(self.n), key=col.__getitem__, reverse=reverse)
+
+    def sorted_rows(self, key: str, reverse: bool = False) -> List[Dict[str, Any]]:
+        return [self.rows[i] for i in self.sort_order(key, reverse)]
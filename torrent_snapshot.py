@@ -0,0 +1,239 @@
+"""Shared torrent snapshot service.
+
+The wx GUI and the Flask Web UI both need the torrent list of the active client.
+Instead of each of them (and every open browser tab) polling the backend, they
+ask this service for a snapshot:
+- Snapshots younger than the freshness TTL are served from memory.
+- When a refresh is needed, only one fetch runs at a time; concurrent callers
+  wait for it and share its result (request coalescing).
+- Per-consumer counters record hits, fetches, coalesced waits and how stale the
+  data handed out was.
+
+Snapshots (and the row dicts inside them) are shared between consumers and must
+be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from torrent_columns import TorrentColumns
+
+DEFAULT_TTL = 1.5
+DEFAULT_PREFS_TTL = 30.0
+
+
+class TorrentSnapshot:
+    __slots__ = ("version", "torrents", "global_stats", "fetched_at", "_columns", "_previous_columns")
+
+    def __init__(self, version: int, torrents: List[Dict[str, Any]], global_stats: Tuple[int, int],
+                 fetched_at: float, previous: Optional["TorrentSnapshot"] = None) -> None:
+        self.version = version
+        self.torrents = torrents
+        self.global_stats = global_stats
+        self.fetched_at = fetched_at
+        self._columns: Optional[TorrentColumns] = None
+        # The latest columns built before this snapshot; their indexes carry over.
+        self._previous_columns: Optional[TorrentColumns] = None
+        if previous is not None:
+            self._previous_columns = previous._columns or previous._previous_columns
+
+    @property
+    def columns(self) -> TorrentColumns:
+        """Columnar view of ``torrents``, built on first use and shared by all consumers."""
+        if self._columns is None:
+            self._columns = TorrentColumns(self.torrents, previous=self._previous_columns)
+            self._previous_columns = None
+        return self._columns
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.monotonic()) - self.fetched_at
+
+
+EMPTY_SNAPSHOT = TorrentSnapshot(0, [], (0, 0), 0.0)
+
+
+class _ConsumerStats:
+    __slots__ = ("requests", "hits", "fetches", "coalesced", "errors", "last_age", "max_age")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.hits = 0
+        self.fetches = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.last_age = 0.0
+        self.max_age = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class SnapshotService:
+    def __init__(self, client=None, ttl: float = DEFAULT_TTL, prefs_ttl: float = DEFAULT_PREFS_TTL) -> None:
+        self.cond = threading.Condition(threading.Lock())
+        self.client = client
+        self.ttl = float(ttl)
+        self.prefs_ttl = float(prefs_ttl)
+        self.generation = 0
+        self.version = 0
+        self.snapshot: Optional[TorrentSnapshot] = None
+        # Set by invalidate(); the published snapshot is shared, so it is never mutated.
+        self.stale = False
+        self.invalidated_at = 0.0
+        self.inflight = False
+        self.last_error: Optional[BaseException] = None
+        self.prefs: Any = None
+        self.prefs_at = 0.0
+        self.consumers: Dict[str, _ConsumerStats] = {}
+
+    def set_client(self, client) -> None:
+        """Switch to a new backend (or None) and drop everything cached for the old one."""
+        with self.cond:
+            self.client = client
+            self.generation += 1
+            self.snapshot = None
+            self.stale = False
+            self.prefs = None
+            self.prefs_at = 0.0
+            self.last_error = None
+            self.cond.notify_all()
+
+    def set_ttl(self, ttl: float) -> None:
+        with self.cond:
+            self.ttl = max(0.0, float(ttl))
+
+    def invalidate(self) -> None:
+        """Force the next get() to refetch (e.g. after start/stop/remove)."""
+        with self.cond:
+            self.stale = True
+            self.invalidated_at = time.monotonic()
+
+    def invalidate_preferences(self) -> None:
+        with self.cond:
+            self.prefs = None
+            self.prefs_at = 0.0
+
+    def _stats(self, consumer: str) -> _ConsumerStats:
+        st = self.consumers.get(consumer)
+        if st is None:
+            st = self.consumers[consumer] = _ConsumerStats()
+        return st
+
+    def peek(self) -> Optional[TorrentSnapshot]:
+        """Return the current snapshot without triggering a fetch."""
+        with self.cond:
+            return self.snapshot
+
+    def get(self, consumer: str = "default", max_age: Optional[float] = None) -> TorrentSnapshot:
+        """Return a snapshot no older than ``max_age`` (defaults to the TTL)."""
+        with self.cond:
+            st = self._stats(consumer)
+            st.requests += 1
+            limit = self.ttl if max_age is None else max_age
+
+            while True:
+                if self.client is None:
+                    return EMPTY_SNAPSHOT
+                now = time.monotonic()
+                snap = self.snapshot
+                if snap is not None and not self.stale and snap.age(now) <= limit:
+                    st.hits += 1
+                    self._record_age(st, snap.age(now))
+                    return snap
+                if not self.inflight:
+                    break
+                # Someone else is fetching: share their result.
+                st.coalesced += 1
+                seen = self.version
+                self.cond.wait()
+                if self.version != seen and self.snapshot is not None:
+                    self._record_age(st, self.snapshot.age())
+                    return self.snapshot
+                if self.last_error is not None and self.version == seen:
+                    st.errors += 1
+                    raise self.last_error
+
+            self.inflight = True
+            client = self.client
+            generation = self.generation
+            started = time.monotonic()
+            st.fetches += 1
+
+        try:
+            torrents = client.get_torrents_full()
+            try:
+                global_stats = client.get_global_stats()
+            except Exception:
+                global_stats = (0, 0)
+        except Exception as e:
+            with self.cond:
+                self.inflight = False
+                self.last_error = e
+                st.errors += 1
+                self.cond.notify_all()
+            raise
+
+        with self.cond:
+            self.inflight = False
+            if generation != self.generation:
+                # Client switched while we were fetching; the result is stale.
+                self.cond.notify_all()
+                return EMPTY_SNAPSHOT
+            self.version += 1
+            self.last_error = None
+            # Invalidated mid-fetch: the result may predate the change, keep refetching.
+            self.stale = self.invalidated_at > started
+            self.snapshot = TorrentSnapshot(self.version, torrents or [], tuple(global_stats or (0, 0)),
+                                            time.monotonic(), previous=self.snapshot)
+            self._record_age(st, 0.0)
+            self.cond.notify_all()
+            return self.snapshot
+
+    def wait_for_update(self, version: int, timeout: float) -> int:
+        """Block until a snapshot newer than ``version`` exists, the client changes, or ``timeout`` passes."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self.cond:
+            generation = self.generation
+            while self.version <= version and self.generation == generation:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.cond.wait(remaining)
+            return self.version
+
+    def _record_age(self, st: _ConsumerStats, age: float) -> None:
+        st.last_age = age
+        if age > st.max_age:
+            st.max_age = age
+
+    def get_app_preferences(self, consumer: str = "default"):
+        """Cached ``client.get_app_preferences()`` with its own (longer) TTL."""
+        with self.cond:
+            client = self.client
+            generation = self.generation
+            st = self._stats(consumer)
+            st.requests += 1
+            if client is None:
+                return None
+            if self.prefs is not None and time.monotonic() - self.prefs_at <= self.prefs_ttl:
+                st.hits += 1
+                return self.prefs
+        prefs = client.get_app_preferences()
+        with self.cond:
+            st.fetches += 1
+            if generation == self.generation and prefs is not None:
+                self.prefs = prefs
+                self.prefs_at = time.monotonic()
+        return prefs
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.cond:
+            return {
+                'version': self.version,
+                'ttl': self.ttl,
+                'age': self.snapshot.age() if self.snapshot else None,
+                'consumers': {name: st.as_dict() for name, st in self.consumers.items()},
+            }
@@ -1,14 +1,79 @@
 import os
+import functools
+import gzip
+import hashlib
+import itertools
+import json
+import math
+import mimetypes
+import operator
+import re
 import threading
+import time
 import sys
-from flask import Flask, request, jsonify, send_from_directory, session, redirect
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait
+from flask import Flask, Response, g, request, jsonify, send_from_directory, session, redirect, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.serving import BaseWSGIServer
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
 
+import metrics
+import profiler
+from maindata_sync import MainDataSync, diff_rows, diff_torrents, index_torrents
+from torrent_columns import SORT_FIELDS, TorrentColumns
+from torrent_snapshot import SnapshotService
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 def get_bundle_dir():
     return getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
 
 static_dir = os.path.join(get_bundle_dir(), 'web_static')
+# Compact torrent-list formats: {"fields": [...], "rows": [[...], ...]} as JSON or MessagePack.
+COLUMNS_MIMETYPE = 'application/vnd.serrebi.columns+json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+WIRE_FORMATS = {'json': 'application/json', 'columns': COLUMNS_MIMETYPE, 'msgpack': MSGPACK_MIMETYPE}
+
+if orjson is not None:
+    # Datetimes and dataclasses go through Flask's own default() so output matches the stdlib path.
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+def _dumps(obj, sort_keys=False):
+    """Compact JSON bytes, through orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=DefaultJSONProvider.default,
+                                option=_ORJSON_OPTS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(',', ':'), sort_keys=sort_keys,
+                      default=DefaultJSONProvider.default).encode('utf-8')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() through orjson when it is installed."""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get('indent'):
+            return super().dumps(obj, **kwargs)
+        return _dumps(obj, kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+
 app = Flask(__name__, static_folder=static_dir)
+app.json = FastJSONProvider(app)
 app.secret_key = os.urandom(24)
 
 # Global context to hold reference to the active torrent client and credentials
@@ -16,6 +81,7 @@ app.secret_key = os.urandom(24)
 WEB_CONFIG = {
     'app': None, # Reference to MainFrame
     'client': None,
+    'snapshots': None, # SnapshotService shared with the GUI
     'username': 'admin',
     'password': 'password',
     'host': '127.0.0.1',
@@ -23,6 +89,21 @@ WEB_CONFIG = {
     'enabled': False
 }
 
+# Per-session rid snapshots for /api/v2/sync/maindata
+MAINDATA_SYNC = MainDataSync()
+
+# Used when the GUI hasn't handed us its SnapshotService (tests, headless use).
+_fallback_snapshots = SnapshotService()
+
+def get_snapshot_service():
+    client = WEB_CONFIG['client']
+    service = WEB_CONFIG.get('snapshots')
+    if service is not None and service.client is client:
+        return service
+    if _fallback_snapshots.client is not client:
+        _fallback_snapshots.set_client(client)
+    return _fallback_snapshots
+
 def login_required(f):
     def wrapper(*args, **kwargs):
         if not session.get('logged_in'):
@@ -33,18 +114,278 @@ def login_required(f):
     wrapper.__name__ = f.__name__
     return wrapper
 
+# Compression and caching
+# Responses smaller than this aren't worth compressing.
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESS_MIMETYPES = {'application/json', 'application/javascript', 'text/javascript', 'text/css',
+                      'text/html', 'text/plain', 'image/svg+xml', COLUMNS_MIMETYPE, MSGPACK_MIMETYPE}
+# Static assets requested with their current content hash (?v=...) never change.
+STATIC_MAX_AGE = 365 * 24 * 3600
+# ETags embed snapshot versions, which restart at 1 with the process.
+_ETAG_SALT = uuid.uuid4().hex[:8]
+
+def _pick_encoding():
+    accept = request.accept_encodings
+    if brotli is not None and accept['br']:
+        return 'br'
+    if accept['gzip']:
+        return 'gzip'
+    return None
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, COMPRESS_LEVEL, mtime=0)
+
+def _etag(*parts):
+    return hashlib.sha1(repr((_ETAG_SALT,) + parts).encode()).hexdigest()[:20]
+
+def _etag_matches(tag):
+    """The validator the client sent for ``tag`` (compressed bodies carry "<tag>-<encoding>"), or None."""
+    inm = request.if_none_match
+    if inm:
+        for t in (tag, tag + '-gzip', tag + '-br'):
+            if inm.contains(t):
+                return t
+    return None
+
+def _not_modified(tag, cache_control):
+    resp = Response(status=304)
+    resp.set_etag(tag)
+    resp.headers['Cache-Control'] = cache_control
+    resp.vary.add('Accept-Encoding')
+    return resp
+
+def _cached_json(tag, build, fmt='json'):
+    """build() encoded as ``fmt`` with a strong ETag; build() is skipped when the client already has it."""
+    matched = _etag_matches(tag) if tag is not None else None
+    if matched:
+        return _not_modified(matched, 'private, no-cache')
+    payload = build()
+    if fmt == 'msgpack':
+        resp = Response(msgpack.packb(payload, use_bin_type=True), mimetype=MSGPACK_MIMETYPE)
+    else:
+        resp = Response(_dumps(payload), mimetype=WIRE_FORMATS[fmt])
+    resp.vary.add('Accept')
+    if tag is not None:
+        resp.set_etag(tag)
+        resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    endpoint = request.endpoint or 'unmatched'
+    started = g.get('request_started')
+    if started is not None:
+        metrics.WEB_REQUEST_SECONDS.observe(time.perf_counter() - started, (endpoint,))
+    metrics.WEB_REQUESTS.inc((endpoint, str(response.status_code)))
+    return response
+
+@app.after_request
+def _compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESS_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = _pick_encoding()
+    if encoding is None or response.content_length is None or response.content_length < COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(_compress(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    tag, weak = response.get_etag()
+    if tag:
+        response.set_etag(f"{tag}-{encoding}", weak)
+    return response
+
+class _StaticAsset:
+    __slots__ = ("data", "digest", "mimetype", "mtime", "deps", "encoded")
+
+    def __init__(self, data, mimetype, mtime, deps=()):
+        self.data = data
+        self.digest = hashlib.sha1(data).hexdigest()[:12]
+        self.mimetype = mimetype
+        self.mtime = mtime
+        self.deps = deps  # (filename, digest or None if it didn't resolve) of assets referenced by data
+        self.encoded = {}
+
+    def body(self, encoding):
+        if encoding is None or len(self.data) < COMPRESS_MIN_SIZE:
+            return self.data, None
+        data = self.encoded.get(encoding)
+        if data is None:
+            data = self.encoded[encoding] = _compress(self.data, encoding)
+        return data, encoding
+
+_static_assets = {}
+_static_lock = threading.Lock()
+# Local script/stylesheet references in HTML pages; any ?v= is replaced by the content hash.
+_ASSET_REF = re.compile(r'((?:src|href)=")([\w./-]+\.(?:js|css))(?:\?v=[^"]*)?"')
+
+def _static_asset(filename):
+    """Cached text asset (compressible types only), or None to fall back to send_from_directory."""
+    path = safe_join(static_dir, filename)
+    mimetype = mimetypes.guess_type(filename)[0]
+    if path is None or mimetype not in COMPRESS_MIMETYPES:
+        return None
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _static_lock:
+        asset = _static_assets.get(filename)
+    if asset is not None and asset.mtime == mtime and all(
+            _asset_digest(name) == digest for name, digest in asset.deps):
+        return asset
+    with open(path, 'rb') as f:
+        data = f.read()
+    deps = []
+    if mimetype == 'text/html':
+        def versioned(m):
+            digest = _asset_digest(m.group(2))
+            # Unresolved references are recorded too, so they don't force a
+            # rebuild on every request, but do trigger one if the file appears.
+            deps.append((m.group(2), digest))
+            if digest is None:
+                return m.group(0)
+            return f'{m.group(1)}{m.group(2)}?v={digest}"'
+        data = _ASSET_REF.sub(versioned, data.decode('utf-8')).encode('utf-8')
+    asset = _StaticAsset(data, mimetype, mtime, tuple(deps))
+    with _static_lock:
+        _static_assets[filename] = asset
+    return asset
+
+def _asset_digest(filename):
+    asset = _static_asset(filename)
+    return asset.digest if asset is not None else None
+
+def _serve_asset(filename):
+    asset = _static_asset(filename)
+    if asset is None:
+        return send_from_directory(static_dir, filename)
+    if request.args.get('v') == asset.digest:
+        cache_control = f'public, max-age={STATIC_MAX_AGE}, immutable'
+    else:
+        cache_control = 'no-cache'
+    matched = _etag_matches(asset.digest)
+    if matched:
+        return _not_modified(matched, cache_control)
+    data, encoding = asset.body(_pick_encoding())
+    resp = Response(data, mimetype=asset.mimetype)
+    resp.set_etag(asset.digest + (f'-{encoding}' if encoding else ''))
+    resp.headers['Cache-Control'] = cache_control
+    resp.vary.add('Accept-Encoding')
+    if encoding:
+        resp.headers['Content-Encoding'] = encoding
+    return resp
+
+def _collect_web_metrics():
+    """Snapshot service and backend transport stats for metrics.REGISTRY."""
+    service = WEB_CONFIG.get('snapshots') or _fallback_snapshots
+    st = service.get_stats()
+    consumers = st['consumers'].items()
+    families = [
+        metrics.gauge_family("snapshot_version", "Torrent snapshots fetched since start.", st['version']),
+        metrics.gauge_family("snapshot_age_seconds", "Age of the current torrent snapshot.", st['age']),
+    ]
+    for field in ('requests', 'hits', 'fetches', 'coalesced', 'errors'):
+        families.append((f"snapshot_{field}_total", "counter", f"Snapshot {field} per consumer.",
+                         [({'consumer': name}, c[field]) for name, c in consumers]))
+    families.append(("snapshot_max_age_seconds", "gauge", "Oldest snapshot handed to each consumer.",
+                     [({'consumer': name}, c['max_age']) for name, c in consumers]))
+    client = WEB_CONFIG['client']
+    if hasattr(client, 'get_transport_stats'):
+        ts = client.get_transport_stats()
+        families += [
+            ("transport_requests_total", "counter", "Requests sent by the rTorrent transport.", [({}, ts['requests'])]),
+            ("transport_connects_total", "counter", "Connections opened by the rTorrent transport.", [({}, ts['connects'])]),
+            ("transport_reused_total", "counter", "Requests sent on a reused connection.", [({}, ts['reused'])]),
+            ("transport_errors_total", "counter", "rTorrent transport errors.", [({}, ts['errors'])]),
+            ("transport_connect_seconds_total", "counter", "Time spent opening connections.", [({}, ts['connect_time_total'])]),
+        ]
+    return families
+
+metrics.REGISTRY.register_collector(_collect_web_metrics)
+
+def basic_auth_allowed(f):
+    """Like login_required, but also accepts HTTP basic auth with the web UI credentials (for curl/scrapers)."""
+    def wrapper(*args, **kwargs):
+        if not session.get('logged_in'):
+            auth = request.authorization
+            if not auth or auth.username != WEB_CONFIG['username'] or auth.password != WEB_CONFIG['password']:
+                return Response('Unauthorized', 401, {'WWW-Authenticate': 'Basic realm="SerrebiTorrent"'})
+        return f(*args, **kwargs)
+    wrapper.__name__ = f.__name__
+    return wrapper
+
+@app.route('/metrics')
+@basic_auth_allowed
+def metrics_endpoint():
+    """Prometheus scrape target."""
+    resp = Response(metrics.REGISTRY.expose(), content_type=metrics.CONTENT_TYPE)
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
+@app.route('/api/v2/debug/profile')
+@basic_auth_allowed
+def debug_profile():
+    """Sample every thread for ?seconds= (interval ?interval= ms); returns collapsed stacks for flamegraphs."""
+    try:
+        seconds = float(request.args.get('seconds', profiler.DEFAULT_SECONDS))
+        interval = float(request.args.get('interval', profiler.DEFAULT_INTERVAL * 1000)) / 1000
+    except ValueError:
+        return "Invalid seconds or interval", 400
+    if not 0 < seconds <= profiler.MAX_SECONDS:
+        return f"seconds must be between 0 and {profiler.MAX_SECONDS:g}", 400
+    if not 0 < interval <= seconds:
+        return "interval must be a positive number of milliseconds no longer than the profile", 400
+    try:
+        profile = profiler.sample(seconds, interval)
+    except profiler.ProfilerBusy as e:
+        return str(e), 409
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    resp = Response(profile.collapsed(), content_type='text/plain; charset=utf-8')
+    resp.headers['Content-Disposition'] = f'attachment; filename="serrebitorrent-profile-{stamp}.txt"'
+    resp.headers['X-Profile-Samples'] = str(profile.samples)
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
+@app.route('/api/v2/debug/memory', methods=['GET', 'DELETE'])
+@basic_auth_allowed
+def debug_memory():
+    """GET: tracemalloc snapshot (?top=, ?key=lineno|filename|traceback) diffed against the last one. DELETE: stop tracing."""
+    if request.method == 'DELETE':
+        profiler.MEMORY.stop()
+        return jsonify({'tracing': profiler.MEMORY.tracing})
+    try:
+        top = max(1, int(request.args.get('top', profiler.DEFAULT_TOP)))
+        report = profiler.MEMORY.snapshot(top, request.args.get('key', 'lineno'))
+    except ValueError as e:
+        return str(e), 400
+    if request.args.get('format') == 'text':
+        resp = Response(profiler.format_memory_report(report), content_type='text/plain; charset=utf-8')
+    else:
+        resp = jsonify(report)
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
 @app.route('/')
 @login_required
 def index():
-    return send_from_directory(static_dir, 'index.html')
+    return _serve_asset('index.html')
 
 @app.route('/login.html')
 def login_page():
-    return send_from_directory(static_dir, 'login.html')
+    return _serve_asset('login.html')
 
 @app.route('/<path:filename>')
 def serve_static(filename):
-    return send_from_directory(static_dir, filename)
+    return _serve_asset(filename)
 
 @app.route('/api/v2/auth/login', methods=['POST'])
 def api_login():
@@ -103,65 +444,122 @@ def add_profile():
         return "Ok."
     return "Missing data", 400
 
-@app.route('/api/v2/torrents/info')
-@login_required
-def torrents_info():
+def _is_error_message(msg):
+    return bool(msg and "success" not in msg.lower() and "ok" not in msg.lower())
+
+def summarize_torrents(torrents, columns=None):
+    """Sidebar category counts and per-tracker counts for a torrent list."""
+    return (columns or TorrentColumns(torrents)).summary(_is_error_message)
+
+def _parse_torrent_query(paged=False):
+    """Query-string filters shared by the info and sync endpoints.
+
+    filter (sidebar category, qBittorrent alias or tracker domain), tracker and
+    search (name tokens) narrow the rows; torrents/info also takes sort,
+    reverse, offset and limit. Raises ValueError on malformed values.
+    """
+    args = request.args
+    query = {'category': args.get('filter') or None, 'tracker': args.get('tracker') or None,
+             'search': args.get('search') or None}
+    if paged:
+        sort = args.get('sort') or None
+        if sort and sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}")
+        limit = int(args.get('limit') or 0)
+        query.update(sort=sort, reverse=args.get('reverse', '').lower() in ('1', 'true', 'yes'),
+                     offset=max(0, int(args.get('offset') or 0)), limit=limit if limit > 0 else None)
+    return query
+
+def _wire_format():
+    """Torrent-list format from ?format= or the Accept header; plain JSON unless asked otherwise.
+
+    Raises ValueError for unknown or unavailable formats.
+    """
+    fmt = request.args.get('format')
+    if not fmt:
+        best = request.accept_mimetypes.best_match(list(WIRE_FORMATS.values()), default='application/json')
+        fmt = next(k for k, v in WIRE_FORMATS.items() if v == best)
+        if fmt == 'msgpack' and msgpack is None:
+            fmt = 'json'
+    if fmt not in WIRE_FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    if fmt == 'msgpack' and msgpack is None:
+        raise ValueError("MessagePack is not available")
+    return fmt
+
+def to_columns(rows):
+    """Columnar layout of a row list: field names once, then one value list per row."""
+    if not rows:
+        return {'fields': [], 'rows': []}
+    # Backends can return rows with differing keys (cold fields are absent
+    # until the first cold refresh): fields are the union, missing values null.
+    fields = list(dict.fromkeys(itertools.chain.from_iterable(rows)))
+    if len(fields) > 1 and set(map(len, rows)) == {len(fields)}:
+        # Every row has exactly these keys.
+        return {'fields': fields, 'rows': list(map(operator.itemgetter(*fields), rows))}
+    return {'fields': fields, 'rows': [[r.get(f) for f in fields] for r in rows]}
+
+def _wire_rows(rows, fmt):
+    return rows if fmt == 'json' else to_columns(rows)
+
+def _current_torrents():
+    """Rows, their columnar view and an ETag base, reusing the GUI's latest snapshot when it is shared with us.
+
+    The tag is None when the rows don't come from a versioned snapshot.
+    """
+    service = WEB_CONFIG.get('snapshots')
+    snap = service.peek() if service is not None else None
+    if snap is not None and snap.version:
+        return snap.torrents, snap.columns, (id(service), snap.version)
     app_ref = WEB_CONFIG['app']
-    if not app_ref:
-        return jsonify({'torrents': [], 'stats': {}, 'trackers': {}})
-    
-    # Use all_torrents for stats but allow the info call to return what's actually there
-    # Use thread-safe copy if available
     if hasattr(app_ref, 'get_all_torrents_safe'):
         torrents = app_ref.get_all_torrents_safe()
     else:
         torrents = list(app_ref.all_torrents)
+    return torrents, TorrentColumns(torrents), None
 
-    stats = {"All": 0, "Downloading": 0, "Finished": 0, "Seeding": 0, "Stopped": 0, "Failed": 0}
-    tracker_counts = {}
-    
-    for t in torrents:
-        size = t.get('size', 0)
-        done = t.get('done', 0)
-        pct = (done / size * 100) if size > 0 else 0
-        state = t.get('state', 0)
-        msg = t.get('message', '')
-        tracker_domain = t.get('tracker_domain', 'Unknown') or 'Unknown'
-        
-        is_seeding = (state == 1 and pct >= 100)
-        is_stopped = (state == 0)
-        is_error = bool(msg and "success" not in msg.lower() and "ok" not in msg.lower())
-        
-        stats["All"] += 1
-        if state == 1 and pct < 100:
-            stats["Downloading"] += 1
-        if pct >= 100:
-            stats["Finished"] += 1
-        if is_seeding:
-            stats["Seeding"] += 1
-        if is_stopped:
-            stats["Stopped"] += 1
-        if is_error:
-            stats["Failed"] += 1
-        
-        tracker_counts[tracker_domain] = tracker_counts.get(tracker_domain, 0) + 1
+@app.route('/api/v2/torrents/info')
+@login_required
+def torrents_info():
+    app_ref = WEB_CONFIG['app']
+    if not app_ref:
+        return jsonify({'torrents': [], 'stats': {}, 'trackers': {}, 'total': 0})
+    try:
+        query = _parse_torrent_query(paged=True)
+        fmt = _wire_format()
+    except ValueError as e:
+        return str(e), 400
 
-    return jsonify({
-        'torrents': torrents,
-        'stats': stats,
-        'trackers': tracker_counts
-    })
+    torrents, columns, version = _current_torrents()
+
+    def build():
+        stats, tracker_counts = summarize_torrents(torrents, columns)
+        page, total = columns.query(_is_error_message, **query)
+        return {
+            'torrents': _wire_rows(page, fmt),
+            'total': total,
+            'stats': stats,
+            'trackers': tracker_counts
+        }
+    tag = _etag('info', version, request.query_string, fmt) if version else None
+    return _cached_json(tag, build, fmt)
 
 @app.route('/api/v2/torrents/all')
 @login_required
 def torrents_all():
+    try:
+        fmt = _wire_format()
+    except ValueError as e:
+        return str(e), 400
     client = WEB_CONFIG['client']
     if client:
         try:
-            return jsonify(client.get_torrents_full())
+            service = get_snapshot_service()
+            snap = service.get('web')
+            return _cached_json(_etag('all', id(service), snap.version, fmt), lambda: _wire_rows(snap.torrents, fmt), fmt)
         except Exception as e:
             return str(e), 500
-    return jsonify([])
+    return _cached_json(None, lambda: _wire_rows([], fmt), fmt)
 
 @app.route('/api/v2/torrents/files')
 @login_required
@@ -172,51 +570,41 @@ def torrents_files():
         return jsonify(client.get_files(hash))
     return jsonify([])
 
-@app.route('/api/v2/torrents/resume', methods=['POST'])
-@login_required
-def torrents_resume():
+def _bulk_action(method):
+    """Run a batch client action on the posted hashes; 500 listing the hashes that failed."""
     hashes = request.form.get('hashes')
     client = WEB_CONFIG['client']
-    if client and hashes:
-        for h in hashes.split('|'):
-            client.start_torrent(h)
+    if not client or not hashes:
+        return "Ok."
+    try:
+        failed = getattr(client, method)(hashes.split('|')) or []
+    except NotImplementedError:
+        return "Not supported by this client", 501
+    finally:
+        get_snapshot_service().invalidate()
+    if failed:
+        return f"Failed for {len(failed)} torrent(s): {', '.join(h for h, _ in failed)}. Last error: {failed[-1][1]}", 500
     return "Ok."
 
+@app.route('/api/v2/torrents/resume', methods=['POST'])
+@login_required
+def torrents_resume():
+    return _bulk_action('start_torrents')
+
 @app.route('/api/v2/torrents/pause', methods=['POST'])
 @login_required
 def torrents_pause():
-    hashes = request.form.get('hashes')
-    client = WEB_CONFIG['client']
-    if client and hashes:
-        for h in hashes.split('|'):
-            client.stop_torrent(h)
-    return "Ok."
+    return _bulk_action('stop_torrents')
 
 @app.route('/api/v2/torrents/recheck', methods=['POST'])
 @login_required
 def torrents_recheck():
-    hashes = request.form.get('hashes')
-    client = WEB_CONFIG['client']
-    if client and hashes:
-        for h in hashes.split('|'):
-            try:
-                client.recheck_torrent(h)
-            except Exception:
-                continue
-    return "Ok."
+    return _bulk_action('recheck_torrents')
 
 @app.route('/api/v2/torrents/reannounce', methods=['POST'])
 @login_required
 def torrents_reannounce():
-    hashes = request.form.get('hashes')
-    client = WEB_CONFIG['client']
-    if client and hashes:
-        for h in hashes.split('|'):
-            try:
-                client.reannounce_torrent(h)
-            except Exception:
-                continue
-    return "Ok."
+    return _bulk_action('reannounce_torrents')
 
 @app.route('/api/v2/torrents/openfolder', methods=['POST'])
 @login_required
@@ -247,6 +635,7 @@ def torrents_delete():
                 client.remove_torrent_with_data(h)
             else:
                 client.remove_torrent(h)
+        get_snapshot_service().invalidate()
     return "Ok."
 
 @app.route('/api/v2/torrents/add', methods=['POST'])
@@ -284,6 +673,7 @@ def torrents_add():
                 
     if attempted == 0:
         return "No torrents provided", 400
+    get_snapshot_service().invalidate()
     if errors:
         return "Failed to add torrents: " + "; ".join(errors), 500
     return "Ok."
@@ -430,7 +820,7 @@ def get_remote_prefs():
     
     return jsonify({
         'name': name,
-        'prefs': client.get_app_preferences()
+        'prefs': get_snapshot_service().get_app_preferences('web')
     })
 
 @app.route('/api/v2/app/remote_prefs', methods=['POST'])
@@ -443,37 +833,316 @@ def set_remote_prefs():
     if new_prefs:
         try:
             client.set_app_preferences(new_prefs)
+            get_snapshot_service().invalidate_preferences()
             return "Ok."
         except Exception as e:
             return str(e), 500
     return "No data", 400
 
+def _filtered_rows(snap, query):
+    if not any(query.values()):
+        return snap.torrents
+    return snap.columns.query(_is_error_message, **query)[0]
+
 @app.route('/api/v2/sync/maindata')
 @login_required
 def sync_maindata():
     client = WEB_CONFIG['client']
     if not client:
-        return jsonify({'torrents': {}})
-    
-    torrents = client.get_torrents_full()
-    # qBit sync format is a dict indexed by hash
-    t_dict = {t['hash']: t for t in torrents}
-    return jsonify({
-        'torrents': t_dict,
-        'full_update': True
-    })
+        return jsonify({'rid': 0, 'full_update': True, 'torrents': {}})
+
+    try:
+        query = _parse_torrent_query()
+    except ValueError as e:
+        return str(e), 400
+    snap = get_snapshot_service().get('web')
+    g_down, g_up = snap.global_stats
+    server_state = {'dl_info_speed': g_down, 'up_info_speed': g_up}
+
+    # qBit sync semantics: the client echoes the last rid it saw and we only
+    # send what changed since then. Snapshots are tracked per login session.
+    sync_id = session.get('sync_id')
+    if not sync_id:
+        sync_id = uuid.uuid4().hex
+        session['sync_id'] = sync_id
+    # Each distinct filter gets its own rid history, so switching filters starts with a full update.
+    view = '|'.join(f"{k}={v}" for k, v in sorted(query.items()) if v)
+    return jsonify(MAINDATA_SYNC.update(sync_id, request.args.get('rid', 0), _filtered_rows(snap, query),
+                                        server_state, view=view))
+
+# Live updates (Server-Sent Events)
+STREAM_MAX_CLIENTS = 8
+STREAM_HEARTBEAT = 15.0
+# Bounds for the client's ?interval=; the lower one is the snapshot TTL, so a
+# tab can't force backend fetches more often than the GUI makes them.
+STREAM_MAX_INTERVAL = 30.0
+_stream_slots = threading.BoundedSemaphore(STREAM_MAX_CLIENTS)
+STREAMS_ACTIVE = metrics.REGISTRY.gauge("web_streams_active", "Open live-update streams.")
+
+def _sse(payload):
+    return "data: " + _dumps(payload).decode('utf-8') + "\n\n"
+
+@app.route('/api/v2/sync/stream')
+@login_required
+def sync_stream():
+    """Push torrent deltas, sidebar counters and global rates as they change.
+
+    The first event is a full update; later events only carry what changed.
+    Clients that can't get a stream slot fall back to polling.
+    """
+    try:
+        requested = float(request.args.get('interval', 2000)) / 1000.0
+    except (TypeError, ValueError):
+        requested = 2.0
+    if not math.isfinite(requested):
+        return "Invalid interval", 400
+    query = _parse_torrent_query()
+    slots = _stream_slots
+    if not slots.acquire(blocking=False):
+        return "Too many live streams", 503
+    STREAMS_ACTIVE.inc()
+    stopping = _shutting_down
+    released = []
+
+    def release():
+        # Called when the response is closed, whether or not the body was ever
+        # iterated (client gone before the first read, response discarded).
+        if not released:
+            released.append(True)
+            STREAMS_ACTIVE.inc(amount=-1)
+            slots.release()
+
+    def generate():
+        prev_map = None
+        prev_stats = prev_trackers = prev_state = None
+        version = -1
+        last_sent = time.monotonic()
+        try:
+            yield "retry: 5000\n\n"
+            while not stopping.is_set():
+                service = get_snapshot_service()
+                interval = min(max(requested, service.ttl), STREAM_MAX_INTERVAL)
+                try:
+                    snap = service.get('web-stream', max_age=interval)
+                except Exception:
+                    snap = None
+
+                if snap is not None and (prev_map is None or snap.version != version):
+                    version = snap.version
+                    t_map = index_torrents(_filtered_rows(snap, query))
+                    stats, trackers = summarize_torrents(snap.torrents, snap.columns)
+                    g_down, g_up = snap.global_stats
+                    server_state = {'dl_info_speed': g_down, 'up_info_speed': g_up}
+
+                    if prev_map is None:
+                        payload = {'full_update': True, 'torrents': t_map, 'stats': stats,
+                                   'trackers': trackers, 'server_state': server_state}
+                    else:
+                        payload = {}
+                        changed, removed = diff_torrents(prev_map, t_map)
+                        if changed:
+                            payload['torrents'] = changed
+                        if removed:
+                            payload['torrents_removed'] = removed
+                        if stats != prev_stats:
+                            payload['stats'] = stats
+                        if trackers != prev_trackers:
+                            payload['trackers'] = trackers
+                        state_delta = diff_rows(prev_state, server_state)
+                        if state_delta:
+                            payload['server_state'] = state_delta
+                    prev_map, prev_stats, prev_trackers, prev_state = t_map, stats, trackers, server_state
+
+                    if payload:
+                        last_sent = time.monotonic()
+                        yield _sse(payload)
+
+                if time.monotonic() - last_sent >= STREAM_HEARTBEAT:
+                    last_sent = time.monotonic()
+                    yield ": ping\n\n"
+                service.wait_for_update(version, interval)
+        finally:
+            release()
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    resp = Response(stream_with_context(generate()), mimetype='text/event-stream', headers=headers)
+    resp.call_on_close(release)
+    return resp
 
 # Server Threading
+# Worker threads for the WSGI server. Live streams hold a worker for their whole
+# lifetime, so keep room for regular API calls next to STREAM_MAX_CLIENTS.
+WEB_THREADS = STREAM_MAX_CLIENTS + 8
+# Open connections (waitress) / accepted-but-waiting requests (fallback server).
+WEB_CONNECTION_LIMIT = 100
+WEB_BACKLOG = 64
+# Idle keep-alive connections are closed after this many seconds.
+WEB_CHANNEL_TIMEOUT = 60
+WEB_SHUTDOWN_TIMEOUT = 5.0
+
 server_thread = None
+server = None
+_shutting_down = threading.Event()
 
-def run_server():
-    host = WEB_CONFIG.get('host') or '127.0.0.1'
-    app.run(host=host, port=WEB_CONFIG['port'], threaded=True)
+class PooledWSGIServer(BaseWSGIServer):
+    """werkzeug server with a bounded worker pool, used when waitress is not installed.
+
+    Requests beyond WEB_THREADS workers plus WEB_BACKLOG queued ones get a 503
+    instead of a new thread each. No keep-alive (HTTP/1.0), like werkzeug's
+    own server.
+    """
+
+    request_queue_size = WEB_BACKLOG
+
+    def __init__(self, host, port, wsgi_app, threads=WEB_THREADS, queue=WEB_BACKLOG):
+        super().__init__(host, port, wsgi_app)
+        self.pool = ThreadPoolExecutor(threads, thread_name_prefix="webui")
+        self.slots = threading.BoundedSemaphore(threads + queue)
+        # Accepted-request futures; added on the serve thread, discarded on pool threads.
+        self.inflight = set()
+        self.inflight_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        if not self.slots.acquire(blocking=False):
+            try:
+                request.sendall(b"HTTP/1.0 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        fut = self.pool.submit(self._process, request, client_address)
+        with self.inflight_lock:
+            self.inflight.add(fut)
+        fut.add_done_callback(functools.partial(self._finished, request))
+
+    def _finished(self, request, fut):
+        with self.inflight_lock:
+            self.inflight.discard(fut)
+        if fut.cancelled():
+            # Still queued when stop() ran out of time; _process never ran.
+            self.shutdown_request(request)
+            self.slots.release()
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+    def run(self):
+        self.serve_forever()
+
+    def stop(self, timeout=WEB_SHUTDOWN_TIMEOUT):
+        """Close the listener, then let accepted requests finish for up to ``timeout`` seconds."""
+        self.shutdown()
+        self.server_close()
+        self.pool.shutdown(wait=False)
+        with self.inflight_lock:
+            pending = list(self.inflight)
+        _, unfinished = futures_wait(pending, timeout)
+        for fut in unfinished:
+            fut.cancel()
+
+def _make_server(host, port):
+    try:
+        from waitress.server import create_server
+    except ImportError:
+        return PooledWSGIServer(host, port, app), "werkzeug"
+    srv = create_server(app, host=host, port=port, threads=WEB_THREADS, connection_limit=WEB_CONNECTION_LIMIT,
+                        backlog=WEB_BACKLOG, channel_timeout=WEB_CHANNEL_TIMEOUT, ident="SerrebiTorrent",
+                        asyncore_use_poll=True)
+    return srv, "waitress"
+
+# The graceful drain below uses waitress internals (the loop trigger, the task
+# dispatcher and the channel map), so it only runs on the major versions it was
+# written against; anything else gets the public close().
+WAITRESS_DRAIN_MAJORS = (2, 3)
+
+def _waitress_can_drain(srv):
+    try:
+        from importlib.metadata import version
+        major = int(version("waitress").split(".")[0])
+    except Exception:
+        return False
+    return (major in WAITRESS_DRAIN_MAJORS and hasattr(srv, "_map")
+            and hasattr(getattr(srv, "trigger", None), "pull_trigger")
+            and hasattr(getattr(srv, "task_dispatcher", None), "shutdown"))
+
+def _on_waitress_loop(srv, fn, timeout=1.0):
+    # waitress' asyncore map isn't thread-safe; run fn on the loop thread via
+    # the trigger and wait for it (or run it here if the loop is gone).
+    done = threading.Event()
+
+    def thunk():
+        try:
+            fn()
+        finally:
+            done.set()
+    try:
+        srv.trigger.pull_trigger(thunk)
+    except OSError:
+        pass
+    if not done.wait(timeout):
+        fn()
+
+def _close_waitress_channels(srv):
+    for channel in list(srv._map.values()):
+        try:
+            channel.close()
+        except OSError:
+            pass
+
+def _stop_waitress(srv, timeout):
+    # Close the listener first so nothing new arrives while draining, then let
+    # in-flight requests finish (live streams watch _shutting_down) and close
+    # every remaining channel, including the trigger, so the asyncore loop ends.
+    if not _waitress_can_drain(srv):
+        # Closes the listener and the trigger; the loop ends once the open
+        # channels finish or time out, and stop_web_ui's join is bounded.
+        srv.close()
+        return
+    from waitress import wasyncore
+    _on_waitress_loop(srv, lambda: wasyncore.dispatcher.close(srv))
+    srv.task_dispatcher.shutdown(cancel_pending=True, timeout=timeout)
+    _on_waitress_loop(srv, lambda: _close_waitress_channels(srv))
+
+def run_server(srv, stopping):
+    try:
+        srv.run()
+    except Exception as e:
+        if not stopping.is_set():
+            print(f"Web UI server stopped: {e}")
 
 def start_web_ui():
-    global server_thread
+    global server_thread, server
+    host = WEB_CONFIG.get('host') or '127.0.0.1'
+    port = WEB_CONFIG['port']
     if server_thread and server_thread.is_alive():
-        return
-    server_thread = threading.Thread(target=run_server, daemon=True)
+        if WEB_CONFIG.get('bound') == (host, port):
+            return
+        stop_web_ui()
+    server, kind = _make_server(host, port)
+    WEB_CONFIG['bound'] = (host, port)
+    server_thread = threading.Thread(target=run_server, args=(server, _shutting_down), daemon=True, name="webui-server")
     server_thread.start()
-    print(f"Web UI started on port {WEB_CONFIG['port']}")
+    print(f"Web UI started on port {port} ({kind})")
+
+def stop_web_ui(timeout=WEB_SHUTDOWN_TIMEOUT):
+    """Stop accepting connections, give in-flight requests ``timeout`` seconds, then close."""
+    global server_thread, server, _shutting_down
+    srv, thread = server, server_thread
+    if srv is None:
+        return
+    _shutting_down.set()
+    _shutting_down = threading.Event()
+    if isinstance(srv, PooledWSGIServer):
+        srv.stop(timeout)
+    else:
+        _stop_waitress(srv, timeout)
+    if thread is not None:
+        thread.join(timeout)
+    server, server_thread = None, None
+    WEB_CONFIG.pop('bound', None)
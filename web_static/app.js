@@ -1,16 +1,19 @@
-let torrentsMap = new Map();
 let domRows = new Map(); 
 let selectedHashes = new Set();
 let currentFilter = 'All';
 let currentProfileId = null;
 let lastFocusedHash = null;
 let lastUserActivity = 0;
-let refreshIntervalId = null;
+
+// Deferred repaint while the user is interacting
+let pendingRenderTimeout = null;
 
 // Virtual Scrolling Config
 const ROW_HEIGHT = 40;
 const VIEWPORT_BUFFER = 10; 
-let visibleTorrents = []; 
+let visibleHashes = []; // filtered + sorted order, from the worker
+let windowStart = 0;    // index of windowRows[0] in visibleHashes
+let windowRows = [];    // the rows around the viewport
 
 // Throttling
 let lastProfileFetch = 0;
@@ -45,15 +48,25 @@ window.addEventListener('DOMContentLoaded', () => {
     });
 
     // Initial fetch
-    refreshData(true);
     if (window.fetchProfiles) window.fetchProfiles(); 
-    startRefreshLoop();
+    startLiveUpdates();
+
+    const search = document.getElementById('torrentSearch');
+    if (search) {
+        let searchTimeout = null;
+        search.addEventListener('input', () => {
+            clearTimeout(searchTimeout);
+            searchTimeout = setTimeout(() => {
+                listWorker.postMessage({type: 'search', text: search.value, end: wantedWindow().end});
+            }, 150);
+        });
+    }
 
     // Refresh rate listener
     const rr = els.refreshRateInput();
     if (rr) {
         rr.addEventListener('change', () => {
-            startRefreshLoop();
+            startLiveUpdates();
         });
     }
 
@@ -99,8 +112,8 @@ window.addEventListener('DOMContentLoaded', () => {
     if (selectAllCheck) {
         selectAllCheck.onchange = (e) => {
             if (e.target.checked) {
-                visibleTorrents.forEach(t => selectedHashes.add(t.hash));
-                announceToSR(`Selected all ${visibleTorrents.length} torrents`);
+                visibleHashes.forEach(h => selectedHashes.add(h));
+                announceToSR(`Selected all ${visibleHashes.length} torrents`);
             } else {
                 selectedHashes.clear();
                 announceToSR("Selection cleared");
@@ -145,7 +158,7 @@ window.addEventListener('DOMContentLoaded', () => {
                 const modal = bootstrap.Modal.getInstance(document.getElementById('addTorrentModal'));
                 if (modal) modal.hide();
                 e.target.reset();
-                refreshData(true); 
+                refreshData();
             } else {
                 alert("Failed to add torrent: " + await res.text());
             }
@@ -183,7 +196,7 @@ window.addEventListener('DOMContentLoaded', () => {
         }
 
         lastUserActivity = Date.now();
-        if (visibleTorrents.length === 0) return;
+        if (visibleHashes.length === 0) return;
 
         // Arrow Key Navigation Logic
         const navKeys = ['ArrowDown', 'ArrowUp', 'Home', 'End', 'PageUp', 'PageDown'];
@@ -195,37 +208,37 @@ window.addEventListener('DOMContentLoaded', () => {
             let currentIndex = -1;
             const focusedRow = document.activeElement.closest('tr[data-hash]');
             if (focusedRow) {
-                currentIndex = visibleTorrents.findIndex(t => t.hash === focusedRow.dataset.hash);
+                currentIndex = visibleHashes.indexOf(focusedRow.dataset.hash);
             } else if (lastFocusedHash) {
-                currentIndex = visibleTorrents.findIndex(t => t.hash === lastFocusedHash);
+                currentIndex = visibleHashes.indexOf(lastFocusedHash);
             }
 
             let nextIndex = currentIndex;
             if (e.key === 'ArrowDown') nextIndex++;
             else if (e.key === 'ArrowUp') nextIndex--;
             else if (e.key === 'Home') nextIndex = 0;
-            else if (e.key === 'End') nextIndex = visibleTorrents.length - 1;
+            else if (e.key === 'End') nextIndex = visibleHashes.length - 1;
             else if (e.key === 'PageDown') nextIndex += 10;
             else if (e.key === 'PageUp') nextIndex -= 10;
 
             if (nextIndex < 0) nextIndex = 0;
-            if (nextIndex >= visibleTorrents.length) nextIndex = visibleTorrents.length - 1;
+            if (nextIndex >= visibleHashes.length) nextIndex = visibleHashes.length - 1;
 
-            if (visibleTorrents.length > 0) {
+            if (visibleHashes.length > 0) {
                 if (e.shiftKey && currentIndex !== -1) {
                     // Range selection
                     const start = Math.min(currentIndex, nextIndex);
                     const end = Math.max(currentIndex, nextIndex);
                     for (let i = start; i <= end; i++) {
-                        selectedHashes.add(visibleTorrents[i].hash);
+                        selectedHashes.add(visibleHashes[i]);
                     }
-                    lastFocusedHash = visibleTorrents[nextIndex].hash;
+                    lastFocusedHash = visibleHashes[nextIndex];
                     updateSelectionVisuals();
                     focusRow(lastFocusedHash);
                     updateDetailsDebounced();
                 } else if (e.ctrlKey) {
                     // Just move focus
-                    focusRow(visibleTorrents[nextIndex].hash);
+                    focusRow(visibleHashes[nextIndex]);
                 } else {
                     // Normal navigation
                     navigateToIndex(nextIndex);
@@ -237,9 +250,9 @@ window.addEventListener('DOMContentLoaded', () => {
         // Ctrl+A Select All
         if ((e.ctrlKey || e.metaKey) && e.key === 'a') {
             e.preventDefault();
-            visibleTorrents.forEach(t => selectedHashes.add(t.hash));
+            visibleHashes.forEach(h => selectedHashes.add(h));
             updateSelectionVisuals();
-            announceToSR(`Selected all ${visibleTorrents.length} torrents`);
+            announceToSR(`Selected all ${visibleHashes.length} torrents`);
             return;
         }
     });
@@ -318,13 +331,122 @@ window.addEventListener('DOMContentLoaded', () => {
     }
 });
 
-function startRefreshLoop() {
-    if (refreshIntervalId) clearInterval(refreshIntervalId);
+function getRefreshRate() {
     let rate = 2000;
     const input = els.refreshRateInput();
     if (input && input.value) rate = parseInt(input.value);
-    if (rate < 500) rate = 500;
-    refreshIntervalId = setInterval(() => refreshData(), rate);
+    if (!rate || rate < 500) rate = 500;
+    return rate;
+}
+
+// The torrent list lives in a Web Worker (torrent_worker.js): it fetches or
+// streams updates, merges, filters and sorts them, and posts back only the
+// window of rows we render plus the hash order whenever that changes.
+const listWorker = new Worker('torrent_worker.js');
+listWorker.onmessage = (e) => handleWorkerMessage(e.data);
+let pendingView = null;
+let pendingFocusHash = null;
+let rowRequests = new Map();
+let rowRequestId = 0;
+let listLoaded = false;
+
+function startLiveUpdates() {
+    const w = wantedWindow();
+    listWorker.postMessage({type: 'start', interval: getRefreshRate(), start: w.start, end: w.end});
+}
+
+function refreshData() {
+    listWorker.postMessage({type: 'refresh'});
+}
+
+// Row range to ask the worker for: the viewport plus a screen's worth either side,
+// so small scrolls are served from rows we already have.
+function wantedWindow() {
+    const container = els.container();
+    const height = container ? container.clientHeight : 0;
+    const top = container ? container.scrollTop : 0;
+    const page = Math.ceil(height / ROW_HEIGHT) + VIEWPORT_BUFFER;
+    const first = Math.max(0, Math.floor(top / ROW_HEIGHT) - page);
+    return {start: first, end: first + 3 * page};
+}
+
+function requestWindow() {
+    const w = wantedWindow();
+    listWorker.postMessage({type: 'window', start: w.start, end: w.end});
+}
+
+// Full row for one torrent (details pane), straight from the worker.
+function getTorrent(hash) {
+    const cached = windowRows.find(t => t.hash === hash);
+    if (cached) return Promise.resolve(cached);
+    return new Promise(resolve => {
+        const id = ++rowRequestId;
+        rowRequests.set(id, resolve);
+        listWorker.postMessage({type: 'row', id, hash});
+    });
+}
+
+function handleWorkerMessage(msg) {
+    if (msg.type === 'auth') { window.location.href = '/login.html'; return; }
+    if (msg.type === 'row') {
+        const resolve = rowRequests.get(msg.id);
+        rowRequests.delete(msg.id);
+        if (resolve) resolve(msg.row);
+        return;
+    }
+    if (msg.type === 'stats') {
+        updateSidebarStats(msg.stats, msg.trackers);
+        const now = Date.now();
+        if (now - lastProfileFetch > 30000) {
+            if (window.fetchProfiles) window.fetchProfiles();
+            lastProfileFetch = now;
+        }
+        return;
+    }
+    if (msg.type !== 'view') return;
+    // Keep the newest hash order even if this view replaces a deferred one without it.
+    if (!msg.hashes && pendingView && pendingView.hashes) msg.hashes = pendingView.hashes;
+    if (pendingView && pendingView.removed) msg.removed = pendingView.removed.concat(msg.removed || []);
+    pendingView = msg;
+    // Replies to our own window/filter requests render at once; pushed updates
+    // don't repaint under the user's hands and catch up shortly after they stop.
+    if (!msg.reply && !msg.reset && Date.now() - lastUserActivity < 1000) {
+        if (!pendingRenderTimeout) {
+            pendingRenderTimeout = setTimeout(() => { pendingRenderTimeout = null; applyPendingView(); }, 1000);
+        }
+        return;
+    }
+    applyPendingView();
+}
+
+function applyPendingView() {
+    const msg = pendingView;
+    if (!msg) return;
+    pendingView = null;
+    const isFirstLoad = !listLoaded && msg.count > 0;
+    // Only torrents that are gone lose their selection; ones merely hidden by
+    // the filter or search stay selected for when they show up again.
+    (msg.removed || []).forEach(removeTorrentFromView);
+    if (msg.hashes) {
+        const current = new Set(msg.hashes);
+        if (lastFocusedHash && !current.has(lastFocusedHash)) removeRowElement(lastFocusedHash);
+        visibleHashes = msg.hashes;
+        updateListSize();
+    }
+    windowStart = msg.start;
+    windowRows = msg.rows;
+    if (msg.reset) {
+        const container = els.container();
+        if (container) container.scrollTop = 0;
+    }
+    renderVirtualRows();
+    if (isFirstLoad || (msg.reset && visibleHashes.length > 0)) {
+        listLoaded = true;
+        setTimeout(() => focusRow(visibleHashes[0], true), isFirstLoad ? 100 : 0);
+    } else if (lastFocusedHash) {
+        // Keyboard navigation into rows we didn't have yet focuses them once they arrive.
+        focusRow(lastFocusedHash, pendingFocusHash === lastFocusedHash);
+    }
 }
 
 function handleSidebarNavigation(e) {
@@ -361,76 +483,21 @@ function handleSidebarNavigation(e) {
     }
 }
 
-async function refreshData(force = false) {
-    // If user is actively typing or interacting, skip background refresh unless forced
-    if (!force && Date.now() - lastUserActivity < 1000) return;
-    
-    try {
-        const isFirstLoad = torrentsMap.size === 0;
-        // Get the full list from the client directly, info only provides MainFrame's filtered list
-        const res = await fetch('/api/v2/torrents/all');
-        if (res.status === 403) { window.location.href = '/login.html'; return; }
-        const torrentsList = await res.json();
-        
-        // Also get stats from info
-        const infoRes = await fetch('/api/v2/torrents/info');
-        const infoData = await infoRes.json();
-        
-        syncTorrentsMap(Array.isArray(torrentsList) ? torrentsList : []);
-        updateFilteredList();
-        renderVirtualRows();
-        updateSidebarStats(infoData.stats, infoData.trackers);
-        
-        const now = Date.now();
-        if (now - lastProfileFetch > 30000) { 
-            if (window.fetchProfiles) window.fetchProfiles(); 
-            lastProfileFetch = now; 
-        }
+function removeRowElement(h) {
+    const tr = domRows.get(h);
+    if (tr) { tr.remove(); domRows.delete(h); }
+}
 
-        if (isFirstLoad && visibleTorrents.length > 0) {
-            // Focus the first torrent on very first load
-            setTimeout(() => focusRow(visibleTorrents[0].hash, true), 100);
-        } else if (lastFocusedHash) {
-            focusRow(lastFocusedHash, false);
-        }
-    } catch (e) { console.error("Refresh error", e); }
+function removeTorrentFromView(h) {
+    removeRowElement(h);
+    selectedHashes.delete(h);
 }
 
-function syncTorrentsMap(newData) {
-    const newHashes = new Set(newData.map(t => t.hash));
-    for (const h of torrentsMap.keys()) {
-        if (!newHashes.has(h)) {
-            torrentsMap.delete(h);
-            const tr = domRows.get(h);
-            if (tr) { tr.remove(); domRows.delete(h); }
-            selectedHashes.delete(h);
-        }
-    }
-    newData.forEach(t => torrentsMap.set(t.hash, t));
-}
-
-function updateFilteredList() {
-    visibleTorrents = Array.from(torrentsMap.values()).filter(t => {
-        if (currentFilter === 'All') return true;
-        if (currentFilter === 'RSS') return false;
-        const pct = t.size > 0 ? (t.done / t.size * 100) : 0;
-        if (currentFilter === 'Downloading') return t.state === 1 && (pct < 100);
-        if (currentFilter === 'Seeding') return t.state === 1 && (pct >= 100);
-        if (currentFilter === 'Finished') return pct >= 100;
-        if (currentFilter === 'Stopped') return t.state === 0;
-        if (currentFilter === 'Failed') {
-            const msg = (t.message || '').toLowerCase();
-            return msg && !msg.includes('success') && !msg.includes('ok');
-        }
-        if (t.tracker_domain === currentFilter) return true;
-        return false;
-    });
-    visibleTorrents.sort((a, b) => a.name.localeCompare(b.name));
-    
+function updateListSize() {
     const table = els.table();
-    if (table) table.setAttribute('aria-rowcount', visibleTorrents.length);
+    if (table) table.setAttribute('aria-rowcount', visibleHashes.length);
     const stretcher = els.stretcher();
-    if (stretcher) stretcher.style.height = (visibleTorrents.length * ROW_HEIGHT) + 'px';
+    if (stretcher) stretcher.style.height = (visibleHashes.length * ROW_HEIGHT) + 'px';
 }
 
 function renderVirtualRows() {
@@ -438,19 +505,24 @@ function renderVirtualRows() {
     const tbody = els.tbody();
     if (!container || !tbody) return;
     const startIndex = Math.max(0, Math.floor(container.scrollTop / ROW_HEIGHT) - VIEWPORT_BUFFER);
-    const endIndex = Math.min(visibleTorrents.length - 1, Math.ceil((container.scrollTop + container.clientHeight) / ROW_HEIGHT) + VIEWPORT_BUFFER);
-    const visibleSubList = visibleTorrents.slice(startIndex, endIndex + 1);
-    const visibleHashes = new Set(visibleSubList.map(t => t.hash));
+    const endIndex = Math.min(visibleHashes.length - 1, Math.ceil((container.scrollTop + container.clientHeight) / ROW_HEIGHT) + VIEWPORT_BUFFER);
+    if (endIndex >= startIndex && (startIndex < windowStart || endIndex >= windowStart + windowRows.length)) {
+        // Scrolled past the rows we have; the worker's reply renders again.
+        requestWindow();
+    }
+    const first = Math.max(startIndex, windowStart);
+    const visibleSubList = windowRows.slice(first - windowStart, endIndex - windowStart + 1);
+    const visibleSet = new Set(visibleSubList.map(t => t.hash));
 
-    tbody.style.transform = `translateY(${startIndex * ROW_HEIGHT}px)`;
+    tbody.style.transform = `translateY(${first * ROW_HEIGHT}px)`;
 
     for (const [hash, tr] of domRows.entries()) {
-        if (!visibleHashes.has(hash) && hash !== lastFocusedHash) {
+        if (!visibleSet.has(hash) && hash !== lastFocusedHash) {
             tr.remove(); domRows.delete(hash);
         }
     }
     visibleSubList.forEach((t, i) => {
-        const absoluteIndex = startIndex + i;
+        const absoluteIndex = first + i;
         let tr = domRows.get(t.hash);
         if (!tr) { tr = createRowElement(t); domRows.set(t.hash, tr); }
         updateRowData(tr, t, absoluteIndex);
@@ -521,14 +593,14 @@ function updateRowData(tr, t, absIndex) {
 }
 
 function navigateToIndex(index) {
-    if (index < 0 || index >= visibleTorrents.length) return;
-    const t = visibleTorrents[index];
+    if (index < 0 || index >= visibleHashes.length) return;
+    const hash = visibleHashes[index];
     selectedHashes.clear();
-    selectedHashes.add(t.hash);
-    lastFocusedHash = t.hash;
-    scrollToRow(t.hash, index);
+    selectedHashes.add(hash);
+    lastFocusedHash = hash;
+    scrollToRow(hash, index);
     renderVirtualRows();
-    focusRow(t.hash);
+    focusRow(hash);
     updateDetailsDebounced();
 }
 
@@ -552,6 +624,7 @@ function toggleSelection(hash) {
 function focusRow(hash, shouldPerformFocus = true) {
     lastFocusedHash = hash;
     const row = domRows.get(hash) || document.querySelector(`tr[data-hash="${hash}"]`);
+    pendingFocusHash = !row && shouldPerformFocus ? hash : null;
     if (row) {
         document.querySelectorAll('#torrentTableBody tr').forEach(tr => tr.tabIndex = -1);
         row.tabIndex = 0;
@@ -576,7 +649,7 @@ function updateSelectionVisuals() {
         const check = tr.querySelector('.row-check');
         if (check) check.checked = isSelected;
     });
-    const allSelected = visibleTorrents.length > 0 && visibleTorrents.every(t => selectedHashes.has(t.hash));
+    const allSelected = visibleHashes.length > 0 && visibleHashes.every(h => selectedHashes.has(h));
     const selectAllCheck = els.selectAllCheck();
     if (selectAllCheck) { 
         selectAllCheck.checked = allSelected; 
@@ -625,11 +698,8 @@ function setFilter(f, event) {
         l.tabIndex = isActive ? 0 : -1;
     });
 
-    updateFilteredList();
-    const container = els.container();
-    if (container) container.scrollTop = 0;
-    renderVirtualRows();
-    if (visibleTorrents.length > 0) focusRow(visibleTorrents[0].hash, true);
+    // The worker replies with the first rows of the new filter; focus follows then.
+    listWorker.postMessage({type: 'filter', filter: f, end: wantedWindow().end});
 }
 
 window.fetchProfiles = async function() {
@@ -669,10 +739,13 @@ async function switchProfile(id, event) {
         lastFocusedHash = null; 
         lastUserActivity = 0; 
         currentProfileId = id; 
-        torrentsMap.clear(); 
+        listWorker.postMessage({type: 'reset'});
+        listLoaded = false;
         domRows.forEach(tr => tr.remove());
         domRows.clear();
-        visibleTorrents = [];
+        visibleHashes = [];
+        windowRows = [];
+        updateListSize();
         
         // Update Sidebar visual state immediately
         document.querySelectorAll('.sidebar-link[data-profile-id]').forEach(l => {
@@ -685,7 +758,8 @@ async function switchProfile(id, event) {
         lastProfileFetch = 0; // Force re-fetch next cycle
         if (window.fetchProfiles) window.fetchProfiles(); // Or just call it now
         
-        setTimeout(() => refreshData(true), 500); 
+        // Restart the stream so it begins with a full update for the new client.
+        setTimeout(() => startLiveUpdates(), 500); 
     }
 }
 
@@ -696,8 +770,8 @@ async function updateDetails() {
     if (selectedHashes.size === 0) { detailPane.innerHTML = '<p>Select a torrent.</p>'; return; }
     if (selectedHashes.size > 1) { detailPane.innerHTML = `<p>${selectedHashes.size} torrents selected.</p>`; return; }
     const hash = Array.from(selectedHashes)[0];
-    const t = torrentsMap.get(hash);
-    if (!t) return;
+    const t = await getTorrent(hash);
+    if (!t || !selectedHashes.has(hash)) return;
     detailPane.innerHTML = `<h3 class="fs-5">${t.name}</h3><p>Size: ${fmtSize(t.size)}<br>Hash: ${t.hash}<br>Path: ${t.save_path || 'N/A'}</p>`;
 }
 
@@ -709,7 +783,10 @@ async function doAction(action, deleteFiles = false) {
     const res = await fetch(`/api/v2/torrents/${action}`, { method: 'POST', body: formData });
     if (res.ok) { 
         hideContextMenu(); 
-        setTimeout(() => refreshData(true), 100); 
+        setTimeout(() => refreshData(), 100);
+    } else {
+        announceToSR(await res.text(), true);
+        refreshData();
     }
 }
 
@@ -759,13 +836,13 @@ function hideContextMenu() {
 }
 
 function toggleSelectAllBtn() {
-    const isAllSelected = visibleTorrents.length > 0 && visibleTorrents.every(t => selectedHashes.has(t.hash));
+    const isAllSelected = visibleHashes.length > 0 && visibleHashes.every(h => selectedHashes.has(h));
     if (isAllSelected) {
         selectedHashes.clear();
         announceToSR("Selection cleared");
     } else {
-        visibleTorrents.forEach(t => selectedHashes.add(t.hash));
-        announceToSR(`Selected all ${visibleTorrents.length} torrents`);
+        visibleHashes.forEach(h => selectedHashes.add(h));
+        announceToSR(`Selected all ${visibleHashes.length} torrents`);
     }
     updateSelectionVisuals();
     updateDetailsDebounced();
@@ -0,0 +1,269 @@
+// Torrent list pipeline for app.js, run off the main thread.
+// Fetching (live stream or polling), decoding, delta merging, filtering,
+// searching and sorting all happen here; the page is only sent the window of
+// rows it renders, plus the full hash order when that order changes.
+
+const torrents = new Map();    // hash -> row
+const lowerNames = new Map();  // hash -> lower-cased name (search index)
+const collator = new Intl.Collator(undefined);
+
+let filter = 'All';
+let searchTokens = [];
+let order = [];                // hashes that pass filter + search, sorted by name
+let orderDirty = true;
+let orderSent = false;
+let windowStart = 0;
+let windowEnd = 0;
+const changed = new Set();     // hashes updated since the last view post
+const removed = new Set();     // hashes dropped since the last view post
+
+let interval = 5000;
+let stream = null;
+let pollTimer = null;
+let streamFailures = 0;
+let generation = 0;            // bumped on stop/reset so late fetches are dropped
+const STREAM_MAX_FAILURES = 3;
+
+function isFinished(t) { return t.size > 0 && t.done >= t.size; }
+
+function matchesFilter(t) {
+    switch (filter) {
+        case 'All': return true;
+        case 'RSS': return false;
+        case 'Downloading': return t.state === 1 && !isFinished(t);
+        case 'Seeding': return t.state === 1 && isFinished(t);
+        case 'Finished': return isFinished(t);
+        case 'Stopped': return t.state === 0;
+        case 'Failed': {
+            const msg = (t.message || '').toLowerCase();
+            return !!msg && !msg.includes('success') && !msg.includes('ok');
+        }
+        default: return t.tracker_domain === filter;
+    }
+}
+
+function matchesSearch(hash) {
+    if (searchTokens.length === 0) return true;
+    const name = lowerNames.get(hash) || '';
+    return searchTokens.every(tok => name.includes(tok));
+}
+
+// Compact torrent lists ({fields, rows}) back into row objects; plain arrays pass through.
+function decodeColumns(data) {
+    if (!data || !Array.isArray(data.fields)) return data;
+    const fields = data.fields;
+    const n = fields.length;
+    return data.rows.map(values => {
+        const row = {};
+        for (let i = 0; i < n; i++) row[fields[i]] = values[i];
+        return row;
+    });
+}
+
+// --- Merge --------------------------------------------------------------
+
+function setRow(t) {
+    const prev = torrents.get(t.hash);
+    torrents.set(t.hash, t);
+    changed.add(t.hash);
+    removed.delete(t.hash);
+    if (!prev || prev.name !== t.name) {
+        lowerNames.set(t.hash, (t.name || '').toLowerCase());
+        orderDirty = true;
+    } else if (!orderDirty && matchesFilter(prev) !== matchesFilter(t)) {
+        orderDirty = true;
+    }
+}
+
+function removeRow(hash) {
+    if (torrents.delete(hash)) {
+        lowerNames.delete(hash);
+        removed.add(hash);
+        orderDirty = true;
+    }
+}
+
+function replaceAll(rows) {
+    const seen = new Set();
+    for (const t of rows) {
+        if (!t || !t.hash) continue;
+        seen.add(t.hash);
+        setRow(t);
+    }
+    for (const h of Array.from(torrents.keys())) {
+        if (!seen.has(h)) removeRow(h);
+    }
+}
+
+function applyDelta(msg) {
+    if (msg.full_update) {
+        replaceAll(Object.values(msg.torrents || {}));
+    } else {
+        (msg.torrents_removed || []).forEach(removeRow);
+        for (const [hash, delta] of Object.entries(msg.torrents || {})) {
+            const existing = torrents.get(hash);
+            setRow(existing ? Object.assign({}, existing, delta) : Object.assign({hash}, delta));
+        }
+    }
+    if (msg.stats || msg.trackers) postMessage({type: 'stats', stats: msg.stats, trackers: msg.trackers});
+}
+
+// --- View ---------------------------------------------------------------
+
+function rebuildOrder() {
+    const next = [];
+    for (const [h, t] of torrents) {
+        if (matchesFilter(t) && matchesSearch(h)) next.push(h);
+    }
+    const names = next.map(h => torrents.get(h).name || '');
+    const idx = next.map((_, i) => i);
+    idx.sort((a, b) => collator.compare(names[a], names[b]));
+    order = idx.map(i => next[i]);
+    orderDirty = false;
+    orderSent = false;
+}
+
+// Post the current window. Unless ``force``, only when the order or a row in
+// the window changed (a removal always changes the order); ``extra`` is merged
+// into the message (reply/reset flags).
+function postView(force = false, extra = null) {
+    if (orderDirty) rebuildOrder();
+    const end = Math.min(order.length, windowEnd + 1);
+    const hashes = order.slice(windowStart, end);
+    if (!force && orderSent && !hashes.some(h => changed.has(h))) {
+        changed.clear();
+        return;
+    }
+    const msg = {type: 'view', count: order.length, start: windowStart, rows: hashes.map(h => torrents.get(h))};
+    if (!orderSent) {
+        msg.hashes = order;
+        orderSent = true;
+    }
+    // Torrents that are gone, as opposed to hidden by the filter or search.
+    if (removed.size) {
+        msg.removed = Array.from(removed);
+        removed.clear();
+    }
+    changed.clear();
+    postMessage(extra ? Object.assign(msg, extra) : msg);
+}
+
+// --- Transport ----------------------------------------------------------
+
+function stopUpdates() {
+    generation++;
+    if (stream) { stream.close(); stream = null; }
+    if (pollTimer) { clearInterval(pollTimer); pollTimer = null; }
+}
+
+async function fetchJSON(url) {
+    const res = await fetch(url, {credentials: 'same-origin'});
+    if (res.status === 403) {
+        postMessage({type: 'auth'});
+        throw new Error('Unauthorized');
+    }
+    return res.json();
+}
+
+async function poll() {
+    const gen = generation;
+    try {
+        const [list, info] = await Promise.all([
+            fetchJSON('/api/v2/torrents/all?format=columns'),
+            // One row is enough; we only need the counters.
+            fetchJSON('/api/v2/torrents/info?limit=1&format=columns'),
+        ]);
+        if (gen !== generation) return;
+        const rows = decodeColumns(list);
+        replaceAll(Array.isArray(rows) ? rows : []);
+        postMessage({type: 'stats', stats: info.stats, trackers: info.trackers});
+        postView();
+    } catch (e) {
+        console.error('Refresh error', e);
+    }
+}
+
+function startPolling() {
+    poll();
+    pollTimer = setInterval(poll, interval);
+}
+
+// Prefer a pushed stream of deltas; fall back to polling when EventSource is
+// unavailable or the server keeps refusing/dropping the stream.
+function startUpdates() {
+    stopUpdates();
+    if (!self.EventSource || streamFailures >= STREAM_MAX_FAILURES) {
+        startPolling();
+        return;
+    }
+    const es = new EventSource(`/api/v2/sync/stream?interval=${interval}`);
+    stream = es;
+    es.onopen = () => { streamFailures = 0; };
+    es.onmessage = (e) => {
+        try {
+            applyDelta(JSON.parse(e.data));
+            postView();
+        } catch (err) {
+            console.error('Live update error', err);
+        }
+    };
+    es.onerror = () => {
+        if (stream !== es) return;
+        streamFailures++;
+        if (es.readyState === EventSource.CLOSED || streamFailures >= STREAM_MAX_FAILURES) {
+            stopUpdates();
+            if (streamFailures >= STREAM_MAX_FAILURES) {
+                console.warn('Live updates unavailable, falling back to polling');
+                startPolling();
+            } else {
+                setTimeout(startUpdates, 2000);
+            }
+        }
+    };
+}
+
+// --- Messages from app.js -------------------------------------------------
+
+onmessage = (e) => {
+    const msg = e.data;
+    switch (msg.type) {
+        case 'start':
+            interval = msg.interval || interval;
+            windowStart = Math.max(0, msg.start | 0);
+            windowEnd = Math.max(windowStart, msg.end | 0);
+            startUpdates();
+            break;
+        case 'refresh':
+            // The live stream pushes our own changes; only polling needs a nudge.
+            if (!stream) poll();
+            break;
+        case 'reset':
+            stopUpdates();
+            torrents.clear();
+            lowerNames.clear();
+            orderDirty = true;
+            break;
+        case 'window':
+            windowStart = Math.max(0, msg.start | 0);
+            windowEnd = Math.max(windowStart, msg.end | 0);
+            postView(true, {reply: true});
+            break;
+        case 'filter':
+            filter = msg.filter;
+            orderDirty = true;
+            windowStart = 0;
+            windowEnd = Math.max(0, msg.end | 0);
+            postView(true, {reset: true});
+            break;
+        case 'search':
+            searchTokens = (msg.text || '').toLowerCase().split(/\s+/).filter(Boolean);
+            orderDirty = true;
+            windowStart = 0;
+            windowEnd = Math.max(0, msg.end | 0);
+            postView(true, {reset: true});
+            break;
+        case 'row':
+            postMessage({type: 'row', id: msg.id, row: torrents.get(msg.hash) || null});
+            break;
+    }
+};